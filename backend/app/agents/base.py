@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from collections.abc import Generator
+from collections.abc import AsyncGenerator
 from dataclasses import dataclass, field
 
 from app.core.llm.base import BaseLLM
@@ -16,9 +16,9 @@ class BaseAgent(ABC):
         self.llm = llm
 
     @abstractmethod
-    def execute(self, input_text: str, context: dict | None = None) -> AgentResult:
+    async def execute(self, input_text: str, context: dict | None = None) -> AgentResult:
         ...
 
     @abstractmethod
-    def execute_stream(self, input_text: str, context: dict | None = None) -> Generator[dict, None, None]:
+    def execute_stream(self, input_text: str, context: dict | None = None) -> AsyncGenerator[dict, None]:
         ...
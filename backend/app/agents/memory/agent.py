@@ -1,18 +1,33 @@
+import hashlib
 import json
 import logging
 import re
-from collections.abc import Generator
+from collections.abc import AsyncGenerator
 from typing import Any
 
 from app.agents.base import AgentResult, BaseAgent
-from app.agents.memory.store import clear_memory, get_memory_summary, upsert_memory_summary
+from app.agents.memory.store import clear_memory, get_memory, get_memory_summary, upsert_memory_summary
 from app.core.llm.base import BaseLLM
+from app.core.llm.batch import defer_to_batch, register_batch_handler
 from app.core.llm.schemas import GenerateConfig
-from app.modules.admin.service import resolve_prompt
+from app.modules.admin.service import resolve_config, resolve_prompt
 
 logger = logging.getLogger(__name__)
 
 MAX_MESSAGES = 24
+# Messages hashed into the watermark; two (user + assistant) keeps repeated
+# short replies like "ok" from matching the wrong position.
+_WATERMARK_TAIL = 2
+_SUMMARY_CONFIG = GenerateConfig(temperature=0.2)
+BATCH_KIND = "memory_summary"
+
+
+async def _apply_batched_summary(context: dict, text: str) -> None:
+    """Write a summary answered by the provider batch API."""
+    await upsert_memory_summary(summary=text.strip(), **context)
+
+
+register_batch_handler(BATCH_KIND, _apply_batched_summary)
 
 
 class MemoryAgent(BaseAgent):
@@ -27,40 +42,91 @@ class MemoryAgent(BaseAgent):
             raw = re.sub(r"\s*```$", "", raw)
         return raw
 
-    def _summarize_messages(self, messages: list[dict[str, str]]) -> str:
+    @staticmethod
+    def _watermark(messages: list[dict[str, str]]) -> str | None:
+        tail = messages[-_WATERMARK_TAIL:]
+        if not tail:
+            return None
+        raw = json.dumps(tail, ensure_ascii=True, sort_keys=True)
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    @classmethod
+    def _messages_after_watermark(
+        cls,
+        messages: list[dict[str, str]],
+        watermark: str | None,
+    ) -> list[dict[str, str]] | None:
+        """Return the messages added after *watermark*, or None if it is not in the window."""
+        if not watermark:
+            return None
+        for end in range(len(messages), 0, -1):
+            if cls._watermark(messages[:end]) == watermark:
+                return messages[end:]
+        return None
+
+    @staticmethod
+    def _incremental_enabled() -> bool:
+        try:
+            mode = resolve_config("agents", "memory_mode")
+        except Exception:
+            return True
+        return str(mode or "incremental").strip().lower() != "full"
+
+    @staticmethod
+    def _batch_enabled() -> bool:
+        try:
+            return str(resolve_config("agents", "memory_batch")).strip().lower() == "true"
+        except Exception:
+            return False
+
+    @staticmethod
+    def _build_prompt_messages(messages: list[dict[str, str]]) -> list[dict]:
         payload = json.dumps(messages, ensure_ascii=True)
-        prompt_messages = [
+        return [
             {"role": "system", "content": resolve_prompt("memory_summarize_system")},
             {
                 "role": "user",
                 "content": resolve_prompt("memory_summarize_user").format(messages=payload),
             },
         ]
-        response = self.llm.generate(messages=prompt_messages, config=GenerateConfig(temperature=0.2))
+
+    @staticmethod
+    def _build_update_prompt_messages(summary: str, messages: list[dict[str, str]]) -> list[dict]:
+        payload = json.dumps(messages, ensure_ascii=True)
+        return [
+            {"role": "system", "content": resolve_prompt("memory_summarize_system")},
+            {
+                "role": "user",
+                "content": resolve_prompt("memory_update_user").format(summary=summary, messages=payload),
+            },
+        ]
+
+    async def _generate_summary(self, prompt_messages: list[dict]) -> str:
+        response = await self.llm.agenerate(messages=prompt_messages, config=_SUMMARY_CONFIG)
         return response.text.strip()
 
-    def _handle_get(self, payload: dict[str, Any]) -> AgentResult:
+    async def _handle_get(self, payload: dict[str, Any]) -> AgentResult:
         user_id = str(payload.get("user_id") or "").strip()
         agent = str(payload.get("agent") or "planner").strip()
         conversation_id = payload.get("conversation_id")
         if not user_id:
             return AgentResult(output="Error: user_id is required.", metadata={"error": "user_id"})
 
-        summary = get_memory_summary(user_id=user_id, agent=agent, conversation_id=conversation_id)
+        summary = await get_memory_summary(user_id=user_id, agent=agent, conversation_id=conversation_id)
         if not summary:
             return AgentResult(output="(no memory)", metadata={"count": 0})
         return AgentResult(output=summary, metadata={"count": 1})
 
-    def _handle_clear(self, payload: dict[str, Any]) -> AgentResult:
+    async def _handle_clear(self, payload: dict[str, Any]) -> AgentResult:
         user_id = str(payload.get("user_id") or "").strip()
         if not user_id:
             return AgentResult(output="Error: user_id is required.", metadata={"error": "user_id"})
         agent = payload.get("agent")
         conversation_id = payload.get("conversation_id")
-        deleted = clear_memory(user_id=user_id, agent=agent, conversation_id=conversation_id)
+        deleted = await clear_memory(user_id=user_id, agent=agent, conversation_id=conversation_id)
         return AgentResult(output=f"Cleared {deleted} memory entries.", metadata={"count": deleted})
 
-    def _handle_summarize(self, payload: dict[str, Any]) -> AgentResult:
+    async def _handle_summarize(self, payload: dict[str, Any]) -> AgentResult:
         user_id = str(payload.get("user_id") or "").strip()
         if not user_id:
             return AgentResult(output="Error: user_id is required.", metadata={"error": "user_id"})
@@ -71,28 +137,63 @@ class MemoryAgent(BaseAgent):
         if not isinstance(messages, list) or not messages:
             return AgentResult(output="Error: messages are required.", metadata={"error": "messages"})
 
-        trimmed = []
-        for item in messages[-MAX_MESSAGES:]:
+        window = []
+        for item in messages:
             if not isinstance(item, dict):
                 continue
             role = str(item.get("role") or "").strip()
             content = str(item.get("content") or "").strip()
             if role and content:
-                trimmed.append({"role": role, "content": content})
+                window.append({"role": role, "content": content})
 
-        if not trimmed:
+        if not window:
             return AgentResult(output="Error: messages are empty.", metadata={"error": "messages"})
 
-        summary = self._summarize_messages(trimmed)
-        upsert_memory_summary(
-            user_id=user_id,
-            summary=summary,
-            agent=agent,
-            conversation_id=conversation_id,
-        )
-        return AgentResult(output=summary, metadata={"count": 1})
-
-    def execute(self, input_text: str, context: dict | None = None) -> AgentResult:
+        new_messages = None
+        previous = None
+        if self._incremental_enabled():
+            previous = await get_memory(user_id=user_id, agent=agent, conversation_id=conversation_id)
+            if previous and previous.summary:
+                new_messages = self._messages_after_watermark(window, previous.summary_watermark)
+
+        if new_messages is not None and not new_messages:
+            return AgentResult(output=previous.summary, metadata={"count": 1, "mode": "unchanged"})
+
+        if new_messages is not None:
+            new_messages = new_messages[-MAX_MESSAGES:]
+            prompt_messages = self._build_update_prompt_messages(previous.summary, new_messages)
+            summarized = int(previous.summarized_messages or 0) + len(new_messages)
+            mode = "incremental"
+        else:
+            trimmed = window[-MAX_MESSAGES:]
+            prompt_messages = self._build_prompt_messages(trimmed)
+            summarized = len(trimmed)
+            mode = "full"
+
+        target = {
+            "user_id": user_id,
+            "agent": agent,
+            "conversation_id": conversation_id,
+            "watermark": self._watermark(window),
+            "summarized_messages": summarized,
+        }
+        if self._batch_enabled():
+            request_id = defer_to_batch(
+                "llm_memory",
+                BATCH_KIND,
+                prompt_messages,
+                _SUMMARY_CONFIG,
+                target,
+                dedupe_key=f"{user_id}:{conversation_id or ''}:{agent}",
+            )
+            if request_id:
+                return AgentResult(output="", metadata={"count": 0, "mode": mode, "batch_request": request_id})
+
+        summary = await self._generate_summary(prompt_messages)
+        await upsert_memory_summary(summary=summary, **target)
+        return AgentResult(output=summary, metadata={"count": 1, "mode": mode})
+
+    async def execute(self, input_text: str, context: dict | None = None) -> AgentResult:
         raw = self._strip_json_fence(input_text)
         try:
             payload = json.loads(raw)
@@ -104,14 +205,14 @@ class MemoryAgent(BaseAgent):
 
         action = str(payload.get("action") or "get").strip().lower()
         if action == "get":
-            return self._handle_get(payload)
+            return await self._handle_get(payload)
         if action == "summarize":
-            return self._handle_summarize(payload)
+            return await self._handle_summarize(payload)
         if action == "clear":
-            return self._handle_clear(payload)
+            return await self._handle_clear(payload)
         return AgentResult(output="Error: Unsupported action.", metadata={"error": "action"})
 
-    def execute_stream(self, input_text: str, context: dict | None = None) -> Generator[dict, None, None]:
+    async def execute_stream(self, input_text: str, context: dict | None = None) -> AsyncGenerator[dict, None]:
         yield {"type": "thinking", "content": "Memproses memori...\n"}
-        result = self.execute(input_text, context=context)
+        result = await self.execute(input_text, context=context)
         yield {"type": "_result", "data": result}
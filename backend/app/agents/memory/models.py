@@ -12,5 +12,9 @@ class AgentMemory(SQLModel, table=True):
     conversation_id: Optional[str] = Field(default=None, index=True)
     agent: str = Field(default="planner", index=True)
     summary: str
+    # Digest of the newest messages already folded into ``summary``; incremental
+    # updates only send the turns that come after it.
+    summary_watermark: Optional[str] = None
+    summarized_messages: int = 0
     created_at: float = Field(default_factory=time.time)
     updated_at: float = Field(default_factory=time.time)
@@ -0,0 +1,33 @@
+"""When to refresh a conversation's memory summary.
+
+Summarizing after every exchange wastes LLM calls on chatty users: the
+planner already sees the recent raw history, so the summary only has to
+catch up before those messages leave the history window. A summary is
+triggered when any of these holds:
+
+- ``turns``: ``every_n_turns`` exchanges happened since the last summary;
+- ``window``: one more exchange would push a not-yet-summarized message
+  out of the planner's history window (``history_limit`` messages);
+- ``idle``: the conversation has been quiet for ``idle_seconds`` (handled
+  by the worker's timer, not by ``decide``).
+"""
+
+from dataclasses import dataclass
+
+MESSAGES_PER_TURN = 2
+
+
+@dataclass(frozen=True)
+class SummaryPolicy:
+    every_n_turns: int = 4
+    idle_seconds: float = 120.0
+    history_limit: int = 15
+
+    def decide(self, turns_since_summary: int) -> str | None:
+        """Return the trigger that fires after this turn, or None to defer."""
+        if self.every_n_turns <= 1 or turns_since_summary >= self.every_n_turns:
+            return "turns"
+        pending_messages = turns_since_summary * MESSAGES_PER_TURN
+        if pending_messages + MESSAGES_PER_TURN > self.history_limit:
+            return "window"
+        return None
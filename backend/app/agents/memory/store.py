@@ -1,18 +1,19 @@
 import time
 from typing import Optional
 
-from sqlmodel import Session, select, delete
+from sqlmodel import select, delete
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.database import app_engine
+from app.core.database import app_async_engine
 from app.agents.memory.models import AgentMemory
 
 
-def get_memory_summary(
+async def get_memory(
     user_id: str,
     agent: str = "planner",
     conversation_id: Optional[str] = None,
-) -> Optional[str]:
-    with Session(app_engine) as session:
+) -> Optional[AgentMemory]:
+    async with AsyncSession(app_async_engine) as session:
         query = (
             select(AgentMemory)
             .where(AgentMemory.user_id == user_id)
@@ -21,18 +22,28 @@ def get_memory_summary(
         )
         if conversation_id:
             query = query.where(AgentMemory.conversation_id == conversation_id)
-        memory = session.exec(query).first()
-        return memory.summary if memory else None
+        return (await session.exec(query)).first()
+
+
+async def get_memory_summary(
+    user_id: str,
+    agent: str = "planner",
+    conversation_id: Optional[str] = None,
+) -> Optional[str]:
+    memory = await get_memory(user_id=user_id, agent=agent, conversation_id=conversation_id)
+    return memory.summary if memory else None
 
 
-def upsert_memory_summary(
+async def upsert_memory_summary(
     user_id: str,
     summary: str,
     agent: str = "planner",
     conversation_id: Optional[str] = None,
+    watermark: Optional[str] = None,
+    summarized_messages: int = 0,
 ) -> AgentMemory:
     now = time.time()
-    with Session(app_engine) as session:
+    async with AsyncSession(app_async_engine) as session:
         query = (
             select(AgentMemory)
             .where(AgentMemory.user_id == user_id)
@@ -41,9 +52,11 @@ def upsert_memory_summary(
         if conversation_id:
             query = query.where(AgentMemory.conversation_id == conversation_id)
 
-        memory = session.exec(query).first()
+        memory = (await session.exec(query)).first()
         if memory:
             memory.summary = summary
+            memory.summary_watermark = watermark
+            memory.summarized_messages = summarized_messages
             memory.updated_at = now
         else:
             memory = AgentMemory(
@@ -51,26 +64,28 @@ def upsert_memory_summary(
                 conversation_id=conversation_id,
                 agent=agent,
                 summary=summary,
+                summary_watermark=watermark,
+                summarized_messages=summarized_messages,
                 created_at=now,
                 updated_at=now,
             )
         session.add(memory)
-        session.commit()
-        session.refresh(memory)
+        await session.commit()
+        await session.refresh(memory)
         return memory
 
 
-def clear_memory(
+async def clear_memory(
     user_id: str,
     agent: Optional[str] = None,
     conversation_id: Optional[str] = None,
 ) -> int:
-    with Session(app_engine) as session:
+    async with AsyncSession(app_async_engine) as session:
         query = delete(AgentMemory).where(AgentMemory.user_id == user_id)
         if agent:
             query = query.where(AgentMemory.agent == agent)
         if conversation_id:
             query = query.where(AgentMemory.conversation_id == conversation_id)
-        result = session.exec(query)
-        session.commit()
+        result = await session.exec(query)
+        await session.commit()
         return result.rowcount or 0
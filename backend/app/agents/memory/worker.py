@@ -0,0 +1,239 @@
+"""Background worker pool for memory summarization.
+
+Summaries are queued after a reply is sent instead of running inside the
+request. Each submission first goes through the ``SummaryPolicy``: it is
+either dispatched right away or held until more turns arrive or the
+conversation goes idle. Dispatched jobs are keyed per conversation: while
+a job is waiting, a newer submission for the same conversation replaces
+its payload (the newer message window supersedes the older one), and a
+conversation is never summarized by two workers at once.
+"""
+
+import asyncio
+import json
+import logging
+from collections.abc import Awaitable, Callable
+
+from app.agents.base import AgentResult
+from app.agents.memory.policy import SummaryPolicy
+from app.agents.planner.agent import PlannerAgent
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+SummaryRunner = Callable[[dict], Awaitable[AgentResult]]
+
+
+async def _run_summary(payload: dict) -> AgentResult:
+    from app.agents.memory import create_memory_agent
+
+    memory_agent = create_memory_agent()
+    return await memory_agent.execute(json.dumps(payload, ensure_ascii=True))
+
+
+def _job_key(payload: dict) -> tuple[str, str, str]:
+    return (
+        str(payload.get("user_id") or ""),
+        str(payload.get("conversation_id") or ""),
+        str(payload.get("agent") or "planner"),
+    )
+
+
+class MemorySummaryWorker:
+    def __init__(
+        self,
+        concurrency: int = 2,
+        max_queue_size: int = 1000,
+        max_attempts: int = 3,
+        retry_backoff_seconds: float = 1.0,
+        policy: SummaryPolicy | None = None,
+        runner: SummaryRunner | None = None,
+    ):
+        self._concurrency = max(1, int(concurrency))
+        self._max_queue_size = max(1, int(max_queue_size))
+        self._max_attempts = max(1, int(max_attempts))
+        self._retry_backoff_seconds = max(0.0, float(retry_backoff_seconds))
+        self._runner = runner or _run_summary
+        # Default: summarize on every submission (no debouncing).
+        self._policy = policy or SummaryPolicy(every_n_turns=1)
+
+        self._queue: asyncio.Queue | None = None
+        self._workers: list[asyncio.Task] = []
+        self._pending: dict[tuple[str, str, str], dict] = {}
+        self._in_flight: set[tuple[str, str, str]] = set()
+        # Submissions held back by the policy: key -> [turns since summary, payload, idle timer].
+        self._deferred: dict[tuple[str, str, str], list] = {}
+        self._counters = {
+            "submitted": 0,
+            "deferred": 0,
+            "trigger_turns": 0,
+            "trigger_window": 0,
+            "trigger_idle": 0,
+            "coalesced": 0,
+            "dropped": 0,
+            "completed": 0,
+            "failed": 0,
+            "retried": 0,
+        }
+
+    @property
+    def running(self) -> bool:
+        return bool(self._workers)
+
+    def start(self) -> None:
+        if self._workers:
+            return
+        self._queue = asyncio.Queue(maxsize=self._max_queue_size)
+        self._workers = [
+            asyncio.create_task(self._work(), name=f"memory-summary-worker-{index}")
+            for index in range(self._concurrency)
+        ]
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        if not self._workers:
+            return
+        # Do not lose held-back summaries on shutdown.
+        for key in list(self._deferred):
+            self._flush_deferred(key, "idle")
+        if self._queue is not None:
+            try:
+                await asyncio.wait_for(self._queue.join(), timeout=drain_timeout)
+            except asyncio.TimeoutError:
+                logger.warning(
+                    "Memory summary queue not drained on shutdown (%d job(s) dropped).",
+                    self._queue.qsize(),
+                )
+        for task in self._workers:
+            task.cancel()
+        await asyncio.gather(*self._workers, return_exceptions=True)
+        self._workers = []
+        self._queue = None
+        self._pending.clear()
+        self._in_flight.clear()
+
+    def submit(self, payload: dict) -> bool:
+        """Register a finished turn. Returns False if its job had to be dropped."""
+        self.start()
+        key = _job_key(payload)
+        self._counters["submitted"] += 1
+
+        state = self._deferred.get(key)
+        if state is None:
+            state = self._deferred[key] = [0, None, None]
+        state[0] += 1
+        state[1] = payload
+        if state[2] is not None:
+            state[2].cancel()
+            state[2] = None
+
+        trigger = self._policy.decide(state[0])
+        if trigger is None:
+            self._counters["deferred"] += 1
+            state[2] = asyncio.get_running_loop().call_later(
+                self._policy.idle_seconds, self._flush_deferred, key, "idle"
+            )
+            return True
+        return self._flush_deferred(key, trigger)
+
+    def _flush_deferred(self, key: tuple[str, str, str], trigger: str) -> bool:
+        state = self._deferred.pop(key, None)
+        if state is None:
+            return True
+        if state[2] is not None:
+            state[2].cancel()
+        self._counters[f"trigger_{trigger}"] += 1
+        return self._dispatch(key, state[1])
+
+    def _dispatch(self, key: tuple[str, str, str], payload: dict) -> bool:
+        if key in self._pending:
+            self._pending[key] = payload
+            self._counters["coalesced"] += 1
+            return True
+
+        self._pending[key] = payload
+        if key in self._in_flight:
+            # Re-queued by the worker that currently owns this conversation.
+            return True
+        return self._enqueue(key)
+
+    def _enqueue(self, key: tuple[str, str, str]) -> bool:
+        try:
+            self._queue.put_nowait(key)
+        except asyncio.QueueFull:
+            self._pending.pop(key, None)
+            self._counters["dropped"] += 1
+            logger.warning("Memory summary queue full, dropping job for %s/%s", key[0], key[1])
+            return False
+        return True
+
+    async def _work(self) -> None:
+        while True:
+            key = await self._queue.get()
+            payload = self._pending.pop(key, None)
+            if payload is None:
+                self._queue.task_done()
+                continue
+
+            self._in_flight.add(key)
+            try:
+                await self._run_with_retries(payload)
+            finally:
+                self._in_flight.discard(key)
+                if key in self._pending:
+                    self._enqueue(key)
+                self._queue.task_done()
+
+    async def _run_with_retries(self, payload: dict) -> None:
+        for attempt in range(1, self._max_attempts + 1):
+            try:
+                result = await self._runner(payload)
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                if attempt >= self._max_attempts:
+                    self._counters["failed"] += 1
+                    logger.warning(
+                        "Memory summary failed after %d attempt(s) for %s: %s",
+                        attempt,
+                        payload.get("conversation_id"),
+                        exc,
+                    )
+                    return
+                self._counters["retried"] += 1
+                await asyncio.sleep(self._retry_backoff_seconds * (2 ** (attempt - 1)))
+                continue
+
+            if (result.metadata or {}).get("error"):
+                # Validation errors (missing user_id, empty window) will not fix themselves.
+                self._counters["failed"] += 1
+            else:
+                self._counters["completed"] += 1
+            return
+
+    def stats(self) -> dict:
+        return {
+            "running": self.running,
+            "workers": len(self._workers),
+            "queue_depth": self._queue.qsize() if self._queue is not None else 0,
+            "max_queue_size": self._max_queue_size,
+            "in_flight": len(self._in_flight),
+            "deferred_conversations": len(self._deferred),
+            **self._counters,
+        }
+
+
+memory_summary_worker = MemorySummaryWorker(
+    concurrency=settings.MEMORY_SUMMARY_WORKERS,
+    max_queue_size=settings.MEMORY_SUMMARY_QUEUE_SIZE,
+    max_attempts=settings.MEMORY_SUMMARY_MAX_ATTEMPTS,
+    retry_backoff_seconds=settings.MEMORY_SUMMARY_RETRY_BACKOFF_SECONDS,
+    policy=SummaryPolicy(
+        every_n_turns=settings.MEMORY_SUMMARY_EVERY_N_TURNS,
+        idle_seconds=settings.MEMORY_SUMMARY_IDLE_SECONDS,
+        history_limit=PlannerAgent._MAX_HISTORY,
+    ),
+)
+
+
+def enqueue_memory_summary(payload: dict) -> bool:
+    return memory_summary_worker.submit(payload)
@@ -1,11 +1,85 @@
+import json
+import logging
 import re
-from collections.abc import Generator
+from collections.abc import AsyncGenerator
 
 from app.agents.base import AgentResult, BaseAgent
+from app.agents.planner.fast_answers import FastAnswer, lookup_fast_answer
 from app.core.config import settings
 from app.core.llm.base import BaseLLM
 from app.core.llm.schemas import GenerateConfig
-from app.modules.admin.service import resolve_config, resolve_prompt
+from app.core.llm.tokens import count_tokens, fit_history_to_budget, message_tokens
+from app.modules.admin.service import cache_version, resolve_config, resolve_prompt
+
+logger = logging.getLogger(__name__)
+
+
+class ThinkTagStreamFilter:
+    """Drop ``<think>...</think>`` spans from text that arrives in chunks.
+
+    Mirrors ``PlannerAgent._strip_think_tags(text).strip()`` but works
+    incrementally: tags split across chunk boundaries are held back until
+    they can be classified, leading whitespace is dropped and trailing
+    whitespace is only emitted once more visible text follows it.
+    """
+
+    _OPEN = "<think>"
+    _CLOSE = "</think>"
+
+    def __init__(self):
+        self._buffer = ""
+        self._inside = False
+        self._started = False
+        self._pending_whitespace = ""
+
+    @staticmethod
+    def _partial_tag_length(text: str, tag: str) -> int:
+        for size in range(min(len(tag) - 1, len(text)), 0, -1):
+            if text.endswith(tag[:size]):
+                return size
+        return 0
+
+    def feed(self, chunk: str) -> str:
+        self._buffer += chunk or ""
+        visible: list[str] = []
+        while self._buffer:
+            if self._inside:
+                index = self._buffer.find(self._CLOSE)
+                if index == -1:
+                    keep = self._partial_tag_length(self._buffer, self._CLOSE)
+                    self._buffer = self._buffer[len(self._buffer) - keep:] if keep else ""
+                    break
+                self._buffer = self._buffer[index + len(self._CLOSE):]
+                self._inside = False
+                continue
+
+            index = self._buffer.find(self._OPEN)
+            if index == -1:
+                keep = self._partial_tag_length(self._buffer, self._OPEN)
+                visible.append(self._buffer[: len(self._buffer) - keep])
+                self._buffer = self._buffer[len(self._buffer) - keep:]
+                break
+            visible.append(self._buffer[:index])
+            self._buffer = self._buffer[index + len(self._OPEN):]
+            self._inside = True
+        return self._trim("".join(visible))
+
+    def flush(self) -> str:
+        # An unterminated <think> block is reasoning that got cut off — drop it.
+        rest = "" if self._inside else self._buffer
+        self._buffer = ""
+        return self._trim(rest, final=True)
+
+    def _trim(self, text: str, final: bool = False) -> str:
+        if not self._started:
+            text = text.lstrip()
+            if not text:
+                return ""
+            self._started = True
+        text = self._pending_whitespace + text
+        stripped = text.rstrip()
+        self._pending_whitespace = "" if final else text[len(stripped):]
+        return stripped
 
 
 class PlannerAgent(BaseAgent):
@@ -23,6 +97,18 @@ class PlannerAgent(BaseAgent):
     @staticmethod
     def _normalize_usage(raw: dict | None, prompt: str = "", output: str = "") -> dict:
         raw = raw or {}
+        if raw.get("cache_hit"):
+            # Served from the response cache: nothing billed, so no length estimate.
+            return {
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "total_tokens": 0,
+                "cached_input_tokens": 0,
+                "cache_write_tokens": 0,
+                "cache_hit": True,
+            }
         inp = int(raw.get("prompt_tokens") or raw.get("input_tokens") or max(1, len(prompt) // 4))
         out = int(raw.get("completion_tokens") or raw.get("output_tokens") or max(1, len(output) // 4))
         return {
@@ -31,8 +117,18 @@ class PlannerAgent(BaseAgent):
             "prompt_tokens": inp,
             "completion_tokens": out,
             "total_tokens": inp + out,
+            "cached_input_tokens": int(raw.get("cached_input_tokens") or 0),
+            "cache_write_tokens": int(raw.get("cache_write_tokens") or 0),
         }
 
+    @staticmethod
+    def _served_by(raw: dict | None, fallback: tuple[str, str]) -> tuple[str, str]:
+        """Provider/model that answered; hedged calls report it in usage."""
+        raw = raw or {}
+        if raw.get("provider") and raw.get("model"):
+            return str(raw["provider"]), str(raw["model"])
+        return fallback
+
     @staticmethod
     def _resolve_llm_identity() -> tuple[str, str]:
         provider, model = settings.CHATBOT_DEFAULT_LLM, settings.CHATBOT_DEFAULT_MODEL
@@ -60,33 +156,89 @@ class PlannerAgent(BaseAgent):
             rendered = rendered.replace(f"{{{key}}}", str(value))
         return rendered
 
-    def _build_system_prompt(self, memory_summary: str | None) -> str:
+    # (admin cache version, rendered prompt); shared by all planner instances.
+    _static_prompt: tuple[int, str] | None = None
+
+    @classmethod
+    def _render_static_prompt(cls) -> str:
         product_knowledge = str(resolve_prompt("product_knowledge") or "").strip()
         raw = str(resolve_prompt("sales_system") or "").strip()
-        system = self._safe_render_template(raw, {"product_knowledge": product_knowledge}).strip()
+        return cls._safe_render_template(raw, {"product_knowledge": product_knowledge}).strip()
+
+    @classmethod
+    def _static_system_prompt(cls) -> str:
+        """Rendered sales prompt, re-rendered only after an admin prompt edit."""
+        version = cache_version()
+        cached = cls._static_prompt
+        if cached is not None and cached[0] == version:
+            return cached[1]
+        system = cls._render_static_prompt()
+        cls._static_prompt = (version, system)
+        return system
+
+    def _build_system_messages(self, memory_summary: str | None) -> list[dict]:
+        """Static sales prompt first, then the per-conversation memory section.
+
+        Keeping the static prompt in its own leading message gives providers a
+        byte-identical prefix to cache across conversations.
+        """
+        messages = [{"role": "system", "content": self._static_system_prompt()}]
 
         if memory_summary:
-            system += f"\n\n## Konteks Sesi Sebelumnya\n{str(memory_summary)[:700]}"
+            messages.append(
+                {"role": "system", "content": f"## Konteks Sesi Sebelumnya\n{str(memory_summary)[:700]}"}
+            )
 
-        return system
+        return messages
 
     _MAX_HISTORY = 15
+    _DEFAULT_HISTORY_TOKEN_BUDGET = 2000
+
+    @staticmethod
+    def _model_history_token_budget(provider: str, model: str) -> str:
+        """Entry of ``history_token_budgets`` for "provider:model", then "provider"."""
+        try:
+            budgets = json.loads(resolve_config("llm_planner", "history_token_budgets") or "{}")
+        except ValueError:
+            return ""
+        if not isinstance(budgets, dict):
+            return ""
+        value = budgets.get(f"{provider}:{model}", budgets.get(provider))
+        return "" if value is None else str(value)
+
+    @staticmethod
+    def _history_token_budget(provider: str = "", model: str = "") -> int:
+        """History budget of the planner model; blank or invalid means the default, "0" means unlimited."""
+        raw = PlannerAgent._model_history_token_budget(provider, model).strip()
+        if not raw:
+            raw = str(resolve_config("llm_planner", "history_token_budget") or "").strip()
+        if not raw:
+            return PlannerAgent._DEFAULT_HISTORY_TOKEN_BUDGET
+        try:
+            return max(0, int(raw))
+        except ValueError:
+            return PlannerAgent._DEFAULT_HISTORY_TOKEN_BUDGET
 
     @staticmethod
     def _build_messages(
         input_text: str,
         history: list[dict] | None,
-        system_prompt: str,
+        system_messages: list[dict],
+        token_budget: int = 0,
     ) -> list[dict]:
-        """Last 15 messages passed to LLM. Older context handled by memory_summary in system prompt."""
-        normalized = [
-            {"role": m["role"], "content": str(m.get("content", ""))}
+        """Last 15 messages that fit *token_budget* (0 = no limit) passed to LLM.
+
+        Older context handled by memory_summary in system prompt.
+        """
+        candidates = [
+            m
             for m in (history or [])
             if m.get("role") in {"user", "assistant"} and str(m.get("content", "")).strip()
-        ]
+        ][-PlannerAgent._MAX_HISTORY:]
+        window = fit_history_to_budget(candidates, token_budget)
         return [
-            {"role": "system", "content": system_prompt},
-            *normalized[-PlannerAgent._MAX_HISTORY:],
+            *system_messages,
+            *({"role": m["role"], "content": str(m.get("content", ""))} for m in window),
             {"role": "user", "content": input_text},
         ]
 
@@ -94,32 +246,68 @@ class PlannerAgent(BaseAgent):
     def _llm_config() -> GenerateConfig:
         return GenerateConfig(temperature=0.4, max_tokens=300)
 
+    # ── Fast Answers ───────────────────────────────────────────────────────────
+
     @staticmethod
-    def _chunk_text(text: str, chunk_size: int = 70) -> list[str]:
-        return [text[i: i + chunk_size] for i in range(0, len(text), chunk_size)] if text else []
+    def _lookup_fast_answer(input_text: str, history: list[dict] | None) -> FastAnswer | None:
+        try:
+            return lookup_fast_answer(input_text, history)
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Fast answer lookup failed: %s", exc)
+            return None
+
+    def _fast_answer_metadata(self, entry: FastAnswer, messages: list[dict]) -> dict:
+        """Zero-usage metadata plus the estimated tokens of the LLM call it replaced."""
+        provider, model = self._resolve_llm_identity()
+        return {
+            "agent": "sales",
+            "model": {"provider": "fast_answer", "name": entry.intent},
+            "usage": {
+                "input_tokens": 0,
+                "output_tokens": 0,
+                "prompt_tokens": 0,
+                "completion_tokens": 0,
+                "total_tokens": 0,
+            },
+            "fast_answer": {
+                "intent": entry.intent,
+                "provider": provider,
+                "model": model,
+                "avoided_input_tokens": sum(message_tokens(m) for m in messages),
+                "avoided_output_tokens": count_tokens(entry.answer),
+            },
+        }
 
     # ── Execution ──────────────────────────────────────────────────────────────
 
-    def execute(
+    async def execute(
         self,
         input_text: str,
         context: dict | None = None,
         history: list[dict] | None = None,
     ) -> AgentResult:
         context = context or {}
-        system = self._build_system_prompt(context.get("memory_summary"))
-        messages = self._build_messages(input_text, history, system)
+        system_messages = self._build_system_messages(context.get("memory_summary"))
+        messages = self._build_messages(
+            input_text, history, system_messages, self._history_token_budget(*self._resolve_llm_identity())
+        )
         prompt_text = "\n".join(str(m.get("content", "")) for m in messages)
 
+        fast = self._lookup_fast_answer(input_text, history)
+        if fast is not None:
+            return AgentResult(output=fast.answer, metadata=self._fast_answer_metadata(fast, messages))
+
+        raw_usage: dict = {}
         try:
-            response = self.llm.generate(messages=messages, config=self._llm_config())
+            response = await self.llm.agenerate(messages=messages, config=self._llm_config())
             output = self._strip_think_tags(response.text).strip()
-            usage = self._normalize_usage(response.usage, prompt=prompt_text, output=output)
+            raw_usage = response.usage
+            usage = self._normalize_usage(raw_usage, prompt=prompt_text, output=output)
         except Exception:
             output = "Makasih udah cerita. Biar aku bantu lebih tepat, boleh aku tahu kondisi kulitmu sekarang?"
             usage = self._normalize_usage({}, prompt=prompt_text, output=output)
 
-        provider, model = self._resolve_llm_identity()
+        provider, model = self._served_by(raw_usage, self._resolve_llm_identity())
         return AgentResult(
             output=output,
             metadata={
@@ -129,29 +317,54 @@ class PlannerAgent(BaseAgent):
             },
         )
 
-    def execute_stream(
+    async def execute_stream(
         self,
         input_text: str,
         context: dict | None = None,
         history: list[dict] | None = None,
-    ) -> Generator[dict, None, None]:
+    ) -> AsyncGenerator[dict, None]:
         context = context or {}
-        system = self._build_system_prompt(context.get("memory_summary"))
-        messages = self._build_messages(input_text, history, system)
+        system_messages = self._build_system_messages(context.get("memory_summary"))
+        messages = self._build_messages(
+            input_text, history, system_messages, self._history_token_budget(*self._resolve_llm_identity())
+        )
         prompt_text = "\n".join(str(m.get("content", "")) for m in messages)
 
+        fast = self._lookup_fast_answer(input_text, history)
+        if fast is not None:
+            yield {"type": "content", "content": fast.answer}
+            yield {"type": "meta", "metadata": self._fast_answer_metadata(fast, messages)}
+            return
+
+        think_filter = ThinkTagStreamFilter()
+        raw_usage: dict = {}
+        output = ""
         try:
-            response = self.llm.generate(messages=messages, config=self._llm_config())
-            output = self._strip_think_tags(response.text).strip()
-            usage = self._normalize_usage(response.usage, prompt=prompt_text, output=output)
-        except Exception:
+            async for chunk in self.llm.agenerate_stream(
+                messages=messages,
+                config=self._llm_config(),
+                usage=raw_usage,
+            ):
+                visible = think_filter.feed(chunk)
+                if visible:
+                    output += visible
+                    yield {"type": "content", "content": visible}
+            tail = think_filter.flush()
+            if tail:
+                output += tail
+                yield {"type": "content", "content": tail}
+        except Exception as exc:  # noqa: BLE001
+            if output:
+                logger.warning("Planner stream interrupted after partial output: %s", exc)
+
+        if not output:
+            raw_usage = {}
             output = "Maaf, bisa cerita ulang sedikit masalah kulitmu biar aku bantu lebih tepat?"
-            usage = self._normalize_usage({}, prompt=prompt_text, output=output)
+            yield {"type": "content", "content": output}
 
-        for chunk in self._chunk_text(output):
-            yield {"type": "content", "content": chunk}
+        usage = self._normalize_usage(raw_usage, prompt=prompt_text, output=output)
 
-        provider, model = self._resolve_llm_identity()
+        provider, model = self._served_by(raw_usage, self._resolve_llm_identity())
         yield {
             "type": "meta",
             "metadata": {
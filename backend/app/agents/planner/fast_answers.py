@@ -0,0 +1,197 @@
+"""Vetted answers for high-frequency questions, served without an LLM call.
+
+Most early questions are the same handful (harga, cara pakai, BPOM, halal,
+ongkir). The ``fast_answers`` prompt holds one admin-editable entry per
+intent, one per line::
+
+    intent | keyword, keyword, ... | answer
+
+The planner checks the index before calling the model. A message is only
+answered from the index when it is short, falls in the first few user
+turns and matches exactly one intent; anything else (mixed questions,
+long stories, later turns) goes to the LLM as before.
+
+Answers quote product facts through ``{placeholders}`` filled from the
+``product_knowledge`` prompt's ``Label: value`` fields (``{harga}``,
+``{bpom}``, ``{halal_mui}``, ...), so they never drift from what the LLM
+is told. An entry with a placeholder the product data no longer provides
+is dropped and its questions go to the LLM. The index is rebuilt from both
+prompts whenever the admin cache version changes.
+"""
+
+import re
+import threading
+from dataclasses import dataclass
+
+from app.modules.admin.service import cache_version, resolve_config, resolve_prompt
+
+_DEFAULT_MAX_WORDS = 8
+_DEFAULT_MAX_TURN = 3
+
+
+@dataclass(frozen=True)
+class FastAnswer:
+    intent: str
+    keywords: tuple[str, ...]
+    answer: str
+
+
+def _normalize(text: str) -> str:
+    return re.sub(r"\s+", " ", str(text or "").strip().lower())
+
+
+def parse_fast_answers(content: str) -> list[FastAnswer]:
+    """Parse ``intent | keywords | answer`` lines; blank and ``#`` lines are skipped."""
+    entries: list[FastAnswer] = []
+    for line in str(content or "").splitlines():
+        line = line.strip()
+        if not line or line.startswith("#"):
+            continue
+        parts = [part.strip() for part in line.split("|", 2)]
+        if len(parts) != 3 or not all(parts):
+            continue
+        intent, raw_keywords, answer = parts
+        keywords = tuple(k for k in (_normalize(k) for k in raw_keywords.split(",")) if k)
+        if keywords:
+            entries.append(FastAnswer(intent=intent, keywords=keywords, answer=answer.replace("\\n", "\n")))
+    return entries
+
+
+_PLACEHOLDER = re.compile(r"\{([a-z0-9_]+)\}")
+
+
+def _fact_name(label: str) -> str:
+    return re.sub(r"[^a-z0-9]+", "_", label.strip().lower()).strip("_")
+
+
+def parse_product_facts(content: str) -> dict[str, str]:
+    """``Label: value`` fields of the product knowledge, keyed by snake_case label.
+
+    Fields may share a line (``Harga: Rp110.900 | Kemasan: 60 g``); a label
+    with nothing after the colon takes the next non-empty line.
+    """
+    facts: dict[str, str] = {}
+    pending: str | None = None
+    for line in str(content or "").splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        if pending is not None:
+            facts.setdefault(pending, line)
+            pending = None
+            continue
+        for field in line.split(" | "):
+            label, sep, value = field.partition(":")
+            name = _fact_name(label)
+            if not sep or not name or len(name) > 40:
+                continue
+            if value.strip():
+                facts.setdefault(name, value.strip())
+            else:
+                pending = name
+    return facts
+
+
+def render_fast_answers(entries: list[FastAnswer], facts: dict[str, str]) -> list[FastAnswer]:
+    """Fill each answer's ``{placeholders}`` from *facts*; entries with unknown ones are dropped."""
+    rendered: list[FastAnswer] = []
+    for entry in entries:
+        names = _PLACEHOLDER.findall(entry.answer)
+        if any(name not in facts for name in names):
+            continue
+        answer = _PLACEHOLDER.sub(lambda m: facts[m.group(1)], entry.answer)
+        rendered.append(FastAnswer(intent=entry.intent, keywords=entry.keywords, answer=answer))
+    return rendered
+
+
+class FastAnswerIndex:
+    def __init__(
+        self,
+        entries: list[FastAnswer],
+        max_words: int = _DEFAULT_MAX_WORDS,
+        max_turn: int = _DEFAULT_MAX_TURN,
+    ):
+        self.entries = entries
+        self.max_words = max_words
+        self.max_turn = max_turn
+        self._patterns = [
+            (entry, re.compile("|".join(rf"(?<!\w){re.escape(k)}(?!\w)" for k in entry.keywords)))
+            for entry in entries
+        ]
+
+    def match(self, text: str, history: list[dict] | None = None) -> FastAnswer | None:
+        normalized = _normalize(text)
+        if not normalized or len(normalized.split(" ")) > self.max_words:
+            return None
+        user_turn = 1 + sum(1 for m in (history or []) if m.get("role") == "user")
+        if user_turn > self.max_turn:
+            return None
+        matched = [entry for entry, pattern in self._patterns if pattern.search(normalized)]
+        # Questions touching several intents need a composed answer.
+        return matched[0] if len(matched) == 1 else None
+
+
+_lock = threading.Lock()
+# (admin cache version, index); rebuilt after an admin config/prompt edit.
+_index: tuple[int, FastAnswerIndex | None] | None = None
+_counters = {"lookups": 0, "hits": 0}
+_hits_by_intent: dict[str, int] = {}
+
+
+def _config_int(key: str, default: int) -> int:
+    try:
+        return int(resolve_config("fast_answer", key) or default)
+    except (TypeError, ValueError):
+        return default
+
+
+def _build_index() -> FastAnswerIndex | None:
+    if str(resolve_config("fast_answer", "enabled")).strip().lower() != "true":
+        return None
+    entries = render_fast_answers(
+        parse_fast_answers(resolve_prompt("fast_answers")),
+        parse_product_facts(resolve_prompt("product_knowledge")),
+    )
+    if not entries:
+        return None
+    return FastAnswerIndex(
+        entries,
+        max_words=_config_int("max_words", _DEFAULT_MAX_WORDS),
+        max_turn=_config_int("max_turn", _DEFAULT_MAX_TURN),
+    )
+
+
+def fast_answer_index() -> FastAnswerIndex | None:
+    """Current index, or None when fast answers are disabled or empty."""
+    global _index
+    version = cache_version()
+    cached = _index
+    if cached is not None and cached[0] == version:
+        return cached[1]
+    index = _build_index()
+    _index = (version, index)
+    return index
+
+
+def lookup_fast_answer(text: str, history: list[dict] | None = None) -> FastAnswer | None:
+    index = fast_answer_index()
+    if index is None:
+        return None
+    entry = index.match(text, history)
+    with _lock:
+        _counters["lookups"] += 1
+        if entry is not None:
+            _counters["hits"] += 1
+            _hits_by_intent[entry.intent] = _hits_by_intent.get(entry.intent, 0) + 1
+    return entry
+
+
+def fast_answer_stats() -> dict:
+    with _lock:
+        lookups, hits = _counters["lookups"], _counters["hits"]
+        return {
+            "lookups": lookups,
+            "hits": hits,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "hits_by_intent": dict(_hits_by_intent),
+        }
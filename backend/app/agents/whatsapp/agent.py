@@ -1,5 +1,5 @@
 import re
-from collections.abc import Generator
+from collections.abc import AsyncGenerator
 
 from app.agents.base import AgentResult, BaseAgent
 from app.channels.media import (
@@ -71,7 +71,7 @@ class WhatsAppPolisherAgent(BaseAgent):
     def _fallback_bubbles(draft: str) -> list[str]:
         return split_whatsapp_bubbles(format_whatsapp_reply_text(draft))
 
-    def execute(self, input_text: str, context: dict | None = None) -> AgentResult:
+    async def execute(self, input_text: str, context: dict | None = None) -> AgentResult:
         context = context or {}
         draft = format_whatsapp_reply_text(input_text)
         if not draft:
@@ -81,10 +81,8 @@ class WhatsAppPolisherAgent(BaseAgent):
         stage = str(context.get("stage") or "")
 
         try:
-            response = self.llm.generate(
-                messages=self._build_messages(draft=draft, user_text=user_text, stage=stage),
-                config=self._llm_config(),
-            )
+            messages = self._build_messages(draft=draft, user_text=user_text, stage=stage)
+            response = await self.llm.agenerate(messages=messages, config=self._llm_config())
             polished = self._strip_code_fence(response.text)
             polished = format_whatsapp_reply_text(polished)
             bubbles = split_whatsapp_bubbles(polished)
@@ -106,8 +104,8 @@ class WhatsAppPolisherAgent(BaseAgent):
                 metadata={"bubbles": bubbles, "used_llm": False},
             )
 
-    def execute_stream(self, input_text: str, context: dict | None = None) -> Generator[dict, None, None]:
-        result = self.execute(input_text=input_text, context=context)
+    async def execute_stream(self, input_text: str, context: dict | None = None) -> AsyncGenerator[dict, None]:
+        result = await self.execute(input_text=input_text, context=context)
         for bubble in result.metadata.get("bubbles", []):
             yield {"type": "content", "content": bubble}
         yield {"type": "meta", "metadata": result.metadata}
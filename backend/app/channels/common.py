@@ -1,12 +1,128 @@
+import asyncio
+import logging
+import time
+from collections.abc import Callable, Hashable
+
+from app.core.config import settings
 from app.modules.chatbot.repository import ChatRepository
 from app.modules.chatbot.schemas import ChatRequest
 from app.modules.chatbot.service import chat, save_messages
 
+logger = logging.getLogger(__name__)
+
 # Reading speed: ~200 wpm ≈ 1000 chars/min ≈ 17 chars/sec, capped 0.5–3.0s
 def natural_read_delay(text: str) -> float:
     return min(3.0, max(0.5, len(str(text or "")) / 17))
 
 
+def remaining_read_delay(text: str, received_at: float) -> float:
+    """Read delay still owed for *text* after time already spent since ``received_at`` (monotonic)."""
+    return max(0.0, natural_read_delay(text) - (time.monotonic() - received_at))
+
+
+class _Burst:
+    __slots__ = ("items", "on_flush", "started_at", "timer")
+
+    def __init__(self, on_flush: Callable[[list], bool | None]):
+        self.items: list = []
+        self.on_flush = on_flush
+        self.started_at = time.monotonic()
+        self.timer: asyncio.TimerHandle | None = None
+
+
+class InboundCoalescer:
+    """Merge a user's rapid-fire messages into one turn.
+
+    Chat users often type one thought as several short messages. Each
+    message (re)starts a ``window_seconds`` quiet timer for its
+    conversation; when it expires, or ``max_wait_seconds`` after the first
+    message, or once ``max_messages`` have piled up, the whole burst is
+    handed to the flush callback registered by its first message. A window
+    of 0 disables merging. A callback that returns False rejected the burst
+    (e.g. a full dispatch queue); that is logged and counted.
+    """
+
+    def __init__(self, window_seconds: float = 1.5, max_wait_seconds: float = 6.0, max_messages: int = 6):
+        self._window = max(0.0, float(window_seconds))
+        self._max_wait = max(self._window, float(max_wait_seconds))
+        self._max_messages = max(1, int(max_messages))
+        self._bursts: dict[Hashable, _Burst] = {}
+        self._counters = {
+            "messages": 0,
+            "turns": 0,
+            "merged_messages": 0,
+            "rejected_turns": 0,
+            "rejected_messages": 0,
+        }
+
+    def add(self, key: Hashable, item, on_flush: Callable[[list], bool | None]) -> bool:
+        """Add *item* to *key*'s burst; True if it opened a new burst (whose ``on_flush`` is used)."""
+        self._counters["messages"] += 1
+        burst = self._bursts.get(key)
+        opened = burst is None
+        if opened:
+            burst = self._bursts[key] = _Burst(on_flush)
+        burst.items.append(item)
+        if burst.timer is not None:
+            burst.timer.cancel()
+
+        if self._window <= 0 or len(burst.items) >= self._max_messages:
+            self._flush(key)
+            return opened
+        delay = min(self._window, max(0.0, burst.started_at + self._max_wait - time.monotonic()))
+        burst.timer = asyncio.get_running_loop().call_later(delay, self._flush, key)
+        return opened
+
+    async def collect(self, key: Hashable, item) -> list | None:
+        """Wait for *key*'s burst when *item* opens it; None if it joined one already open."""
+        future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+        def resolve(items: list) -> None:
+            if not future.done():
+                future.set_result(items)
+
+        if not self.add(key, item, resolve):
+            return None
+        return await future
+
+    def _flush(self, key: Hashable) -> None:
+        burst = self._bursts.pop(key, None)
+        if burst is None:
+            return
+        if burst.timer is not None:
+            burst.timer.cancel()
+        self._counters["turns"] += 1
+        self._counters["merged_messages"] += len(burst.items) - 1
+        try:
+            accepted = burst.on_flush(burst.items) is not False
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Inbound message flush failed for %s: %s", key, exc)
+            accepted = False
+        if not accepted:
+            self._counters["rejected_turns"] += 1
+            self._counters["rejected_messages"] += len(burst.items)
+            logger.warning("Inbound burst for %s was rejected, dropping %d message(s)", key, len(burst.items))
+
+    def flush_all(self) -> None:
+        for key in list(self._bursts):
+            self._flush(key)
+
+    def stats(self) -> dict:
+        return {
+            "window_seconds": self._window,
+            "open_bursts": len(self._bursts),
+            "waiting_messages": sum(len(burst.items) for burst in self._bursts.values()),
+            **self._counters,
+        }
+
+
+inbound_coalescer = InboundCoalescer(
+    window_seconds=settings.CHANNEL_COALESCE_WINDOW_SECONDS,
+    max_wait_seconds=settings.CHANNEL_COALESCE_MAX_WAIT_SECONDS,
+    max_messages=settings.CHANNEL_COALESCE_MAX_MESSAGES,
+)
+
+
 def _normalize_channel_user_id(channel: str, external_user_id: str) -> str:
     channel_key = (channel or "unknown").strip().lower()
     external_key = str(external_user_id or "").strip()
@@ -26,35 +142,41 @@ def _recent_history_from_conversation(conversation_payload: dict | None, max_mes
             continue
         if not content:
             continue
-        filtered.append({"role": role, "content": str(content)})
+        item = {"role": role, "content": str(content)}
+        if message.get("token_count") is not None:
+            item["token_count"] = message["token_count"]
+        filtered.append(item)
     if len(filtered) > max_messages:
         return filtered[-max_messages:]
     return filtered
 
 
-def process_incoming_text(
+async def process_incoming_text(
     channel: str,
     external_user_id: str,
-    text: str,
+    text: str | list[str],
     conversation_title: str,
 ) -> dict:
-    clean_text = str(text or "").strip()
+    """Run one turn; a list of texts is a merged burst answered as one message."""
+    texts = [text] if isinstance(text, str) else list(text or [])
+    user_messages = [clean for clean in (str(item or "").strip() for item in texts) if clean]
+    clean_text = "\n".join(user_messages)
     if not clean_text:
         return {"status": "ignored", "reason": "empty_message"}
 
     user_id = _normalize_channel_user_id(channel, external_user_id)
     repository = ChatRepository()
-    conversations = repository.list_conversations(user_id)
+    conversations = await repository.list_conversations(user_id)
     if conversations:
         conversation = conversations[0]
     else:
-        conversation = repository.create_conversation(user_id=user_id, title=conversation_title)
+        conversation = await repository.create_conversation(user_id=user_id, title=conversation_title)
 
     conversation_id = conversation["id"]
-    conversation_payload = repository.get_conversation(user_id=user_id, conversation_id=conversation_id)
+    conversation_payload = await repository.get_conversation(user_id=user_id, conversation_id=conversation_id)
     history = _recent_history_from_conversation(conversation_payload)
 
-    response = chat(
+    response = await chat(
         ChatRequest(
             message=clean_text,
             history=history,
@@ -64,13 +186,14 @@ def process_incoming_text(
     )
     metadata = response.usage if isinstance(response.usage, dict) else None
 
-    save_messages(
+    await save_messages(
         user_id=user_id,
         conversation_id=conversation_id,
         user_message=clean_text,
         assistant_content=response.response,
         assistant_thinking=None,
         assistant_metadata=metadata,
+        user_messages=user_messages if len(user_messages) > 1 else None,
     )
 
     return {
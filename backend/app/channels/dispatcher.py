@@ -0,0 +1,145 @@
+"""Per-sender ordered work queues for channel webhooks.
+
+Every sender gets its own FIFO lane, drained by one task at a time, so the
+messages of a conversation are handled strictly in arrival order. Lanes of
+different senders run in parallel, bounded by ``concurrency``, so one slow
+conversation (read delay, typing heartbeat, LLM call, bubble pacing) no
+longer holds up everybody else in the same webhook batch or worker.
+
+Backpressure: a sender may have at most ``max_per_sender`` messages
+waiting and the dispatcher at most ``max_pending`` overall; anything past
+that is rejected (and counted) instead of queueing without bound. Lanes
+live in memory only, so messages still waiting at shutdown are lost after
+``stop``'s drain timeout.
+"""
+
+import asyncio
+import logging
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+
+logger = logging.getLogger(__name__)
+
+DispatchHandler = Callable[[dict], Awaitable[None]]
+
+
+class SenderDispatcher:
+    def __init__(
+        self,
+        name: str,
+        handler: DispatchHandler,
+        concurrency: int = 32,
+        max_per_sender: int = 20,
+        max_pending: int = 2000,
+    ):
+        self.name = name
+        self._handler = handler
+        self._concurrency = max(1, int(concurrency))
+        self._max_per_sender = max(1, int(max_per_sender))
+        self._max_pending = max(1, int(max_pending))
+        self._slots: asyncio.Semaphore | None = None
+        # sender -> waiting (item, enqueued_at); a sender has a lane task while present here.
+        self._lanes: dict[str, deque[tuple[dict, float]]] = {}
+        self._tasks: dict[str, asyncio.Task] = {}
+        self._pending = 0
+        self._running = 0
+        self._counters = {
+            "submitted": 0,
+            "rejected_sender_full": 0,
+            "rejected_queue_full": 0,
+            "completed": 0,
+            "failed": 0,
+            "peak_pending": 0,
+            "peak_running": 0,
+        }
+        self._wait_total = 0.0
+        self._wait_max = 0.0
+
+    def start(self) -> None:
+        if self._slots is None:
+            self._slots = asyncio.Semaphore(self._concurrency)
+
+    async def stop(self, drain_timeout: float = 10.0) -> None:
+        tasks = list(self._tasks.values())
+        if tasks:
+            _, still_running = await asyncio.wait(tasks, timeout=drain_timeout)
+            if still_running:
+                logger.warning(
+                    "%s dispatcher not drained on shutdown (%d message(s) dropped).",
+                    self.name,
+                    self._pending + self._running,
+                )
+                for task in still_running:
+                    task.cancel()
+                await asyncio.gather(*still_running, return_exceptions=True)
+        self._lanes.clear()
+        self._tasks.clear()
+        self._pending = 0
+        self._running = 0
+        self._slots = None
+
+    def submit(self, sender: str, item: dict) -> bool:
+        """Queue *item* behind the sender's earlier messages; False if rejected."""
+        self.start()
+        lane = self._lanes.get(sender)
+        if lane is not None and len(lane) >= self._max_per_sender:
+            self._counters["rejected_sender_full"] += 1
+            logger.warning("%s dispatcher: lane for %s is full, dropping message", self.name, sender)
+            return False
+        if self._pending >= self._max_pending:
+            self._counters["rejected_queue_full"] += 1
+            logger.warning("%s dispatcher: queue full, dropping message from %s", self.name, sender)
+            return False
+
+        if lane is None:
+            lane = self._lanes[sender] = deque()
+        lane.append((item, time.monotonic()))
+        self._pending += 1
+        self._counters["submitted"] += 1
+        self._counters["peak_pending"] = max(self._counters["peak_pending"], self._pending)
+        if sender not in self._tasks:
+            self._tasks[sender] = asyncio.create_task(self._drain(sender), name=f"{self.name}-lane")
+        return True
+
+    async def _drain(self, sender: str) -> None:
+        lane = self._lanes[sender]
+        try:
+            while lane:
+                item, enqueued_at = lane[0]
+                async with self._slots:
+                    lane.popleft()
+                    self._pending -= 1
+                    self._running += 1
+                    self._counters["peak_running"] = max(self._counters["peak_running"], self._running)
+                    waited = time.monotonic() - enqueued_at
+                    self._wait_total += waited
+                    self._wait_max = max(self._wait_max, waited)
+                    try:
+                        await self._handler(item)
+                        self._counters["completed"] += 1
+                    except asyncio.CancelledError:
+                        raise
+                    except Exception as exc:  # noqa: BLE001
+                        self._counters["failed"] += 1
+                        logger.exception("%s dispatcher: handler failed for %s: %s", self.name, sender, exc)
+                    finally:
+                        self._running -= 1
+        finally:
+            self._lanes.pop(sender, None)
+            self._tasks.pop(sender, None)
+
+    def stats(self) -> dict:
+        started = self._counters["completed"] + self._counters["failed"] + self._running
+        return {
+            "concurrency": self._concurrency,
+            "active_senders": len(self._tasks),
+            "pending": self._pending,
+            "running": self._running,
+            "max_lane_depth": max((len(lane) for lane in self._lanes.values()), default=0),
+            "max_per_sender": self._max_per_sender,
+            "max_pending": self._max_pending,
+            **self._counters,
+            "queue_wait_seconds_avg": round(self._wait_total / started, 4) if started else 0.0,
+            "queue_wait_seconds_max": round(self._wait_max, 4),
+        }
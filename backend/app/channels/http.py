@@ -0,0 +1,112 @@
+"""Long-lived pooled HTTP clients for channel APIs.
+
+Every outbound WhatsApp call (read receipt, typing ping, bubble, image) and
+every Telegram call used to open its own ``httpx.AsyncClient``, paying a
+fresh TCP + TLS handshake each time. ``channel_http_client(name)`` returns
+one process-wide client per channel instead: a bounded keep-alive pool
+and, when the ``h2`` package is installed, HTTP/2 multiplexing over a
+single connection.
+
+Connection reuse is measured through httpcore's ``trace`` extension:
+``connections_opened`` and ``tls_handshakes`` count real handshakes, so
+``reuse_rate`` is the share of requests served on an already-open
+connection.
+"""
+
+import threading
+import time
+
+import httpx
+
+from app.core.config import settings
+from app.core.http import http2_enabled, pool_connection_stats
+
+_lock = threading.Lock()
+_clients: dict[str, "ChannelHttpClient"] = {}
+
+
+class ChannelHttpClient:
+    def __init__(self, name: str):
+        self.name = name
+        self.http2 = http2_enabled(settings.CHANNEL_HTTP2, "CHANNEL_HTTP2")
+        self._client: httpx.AsyncClient | None = None
+        self._counters = {
+            "requests": 0,
+            "errors": 0,
+            "connections_opened": 0,
+            "tls_handshakes": 0,
+        }
+        self._latency_total = 0.0
+
+    @property
+    def client(self) -> httpx.AsyncClient:
+        if self._client is None:
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                limits=httpx.Limits(
+                    max_connections=settings.CHANNEL_HTTP_MAX_CONNECTIONS,
+                    max_keepalive_connections=settings.CHANNEL_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+                    keepalive_expiry=settings.CHANNEL_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+                ),
+                timeout=httpx.Timeout(
+                    settings.CHANNEL_HTTP_TIMEOUT_SECONDS,
+                    connect=settings.CHANNEL_HTTP_CONNECT_TIMEOUT,
+                ),
+            )
+        return self._client
+
+    async def _trace(self, event: str, _info: dict) -> None:
+        if event == "connection.connect_tcp.complete":
+            self._counters["connections_opened"] += 1
+        elif event == "connection.start_tls.complete":
+            self._counters["tls_handshakes"] += 1
+
+    async def post(self, url: str, **kwargs) -> httpx.Response:
+        started = time.monotonic()
+        self._counters["requests"] += 1
+        try:
+            return await self.client.post(url, extensions={"trace": self._trace}, **kwargs)
+        except httpx.HTTPError:
+            self._counters["errors"] += 1
+            raise
+        finally:
+            self._latency_total += time.monotonic() - started
+
+    async def aclose(self) -> None:
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
+
+    def stats(self) -> dict:
+        requests = self._counters["requests"]
+        reused = max(0, requests - self._counters["connections_opened"])
+        return {
+            "channel": self.name,
+            "http2": self.http2,
+            **pool_connection_stats(self._client),
+            **self._counters,
+            "reused_requests": reused,
+            "reuse_rate": round(reused / requests, 4) if requests else 0.0,
+            "avg_request_seconds": round(self._latency_total / requests, 4) if requests else 0.0,
+        }
+
+
+def channel_http_client(name: str) -> ChannelHttpClient:
+    with _lock:
+        client = _clients.get(name)
+        if client is None:
+            client = _clients[name] = ChannelHttpClient(name)
+        return client
+
+
+def channel_http_stats() -> list[dict]:
+    with _lock:
+        clients = list(_clients.values())
+    return [client.stats() for client in clients]
+
+
+async def close_channel_http_clients() -> None:
+    with _lock:
+        clients = list(_clients.values())
+    for client in clients:
+        await client.aclose()
@@ -0,0 +1,174 @@
+"""Idempotency store for inbound channel messages.
+
+Webhook providers retry deliveries and Telegram also sends
+``edited_message`` updates for messages that were already answered; each
+would otherwise cost a full chat turn. ``claim(key)`` is an atomic
+check-and-set: it returns True the first time a key is seen within
+``ttl_seconds`` and False for every repeat. ``release(key)`` drops a claim
+whose message was never queued (e.g. a full dispatcher rejected it), so
+the provider's retry of the same message is processed instead of skipped.
+
+``CHANNEL_IDEMPOTENCY_BACKEND`` picks the backend:
+
+- ``memory``: an insertion-ordered dict per process. Every key gets the same
+  TTL, so the oldest key always expires first and expiry only ever pops from
+  the front: O(1) per claim, amortized.
+- ``postgres``: the shared ``channel_inbound_keys`` table (primary key plus an
+  ``expires_at`` index), so dedupe survives restarts and spans workers.
+  Expired rows are reclaimed on conflict and purged every
+  ``PURGE_EVERY`` claims.
+
+Store errors fail open (the message is processed): answering twice is
+better than not answering.
+"""
+
+import logging
+import time
+from collections import OrderedDict
+
+from sqlalchemy.dialects.postgresql import insert
+from sqlmodel import delete
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.channels.models import ChannelInboundKey
+from app.core.config import settings
+
+logger = logging.getLogger(__name__)
+
+
+class MemoryIdempotencyStore:
+    backend = "memory"
+
+    def __init__(self, ttl_seconds: float = 1800.0, max_entries: int = 100_000):
+        self._ttl_seconds = max(1.0, float(ttl_seconds))
+        self._max_entries = max(1, int(max_entries))
+        self._keys: OrderedDict[str, float] = OrderedDict()
+        self._counters = {"claimed": 0, "duplicates": 0, "released": 0, "expired": 0, "evicted": 0}
+
+    def _expire(self, now: float) -> None:
+        while self._keys:
+            key, expires_at = next(iter(self._keys.items()))
+            if expires_at > now:
+                return
+            del self._keys[key]
+            self._counters["expired"] += 1
+
+    async def claim(self, key: str) -> bool:
+        now = time.time()
+        self._expire(now)
+        if key in self._keys:
+            self._counters["duplicates"] += 1
+            return False
+        self._keys[key] = now + self._ttl_seconds
+        self._counters["claimed"] += 1
+        while len(self._keys) > self._max_entries:
+            self._keys.popitem(last=False)
+            self._counters["evicted"] += 1
+        return True
+
+    async def release(self, key: str) -> None:
+        if self._keys.pop(key, None) is not None:
+            self._counters["released"] += 1
+
+    def stats(self) -> dict:
+        return {
+            "backend": self.backend,
+            "ttl_seconds": self._ttl_seconds,
+            "entries": len(self._keys),
+            "max_entries": self._max_entries,
+            **self._counters,
+        }
+
+
+class PostgresIdempotencyStore:
+    backend = "postgres"
+    PURGE_EVERY = 500
+
+    def __init__(self, ttl_seconds: float = 1800.0, engine=None):
+        self._ttl_seconds = max(1.0, float(ttl_seconds))
+        self._engine = engine
+        self._since_purge = 0
+        self._counters = {"claimed": 0, "duplicates": 0, "released": 0, "purged": 0, "db_errors": 0}
+
+    def _get_engine(self):
+        if self._engine is None:
+            from app.core.database import app_async_engine
+
+            self._engine = app_async_engine
+        return self._engine
+
+    async def claim(self, key: str) -> bool:
+        now = time.time()
+        expires_at = now + self._ttl_seconds
+        # Inserts a new key, or takes over an expired one; a live key returns no row.
+        statement = (
+            insert(ChannelInboundKey)
+            .values(key=key, expires_at=expires_at)
+            .on_conflict_do_update(
+                index_elements=[ChannelInboundKey.key],
+                set_={"expires_at": expires_at},
+                where=ChannelInboundKey.expires_at <= now,
+            )
+            .returning(ChannelInboundKey.key)
+        )
+        try:
+            async with AsyncSession(self._get_engine()) as session:
+                claimed = (await session.exec(statement)).first() is not None
+                self._since_purge += 1
+                if self._since_purge >= self.PURGE_EVERY:
+                    self._since_purge = 0
+                    result = await session.exec(
+                        delete(ChannelInboundKey).where(ChannelInboundKey.expires_at <= now)
+                    )
+                    self._counters["purged"] += result.rowcount or 0
+                await session.commit()
+        except Exception as exc:  # noqa: BLE001
+            self._counters["db_errors"] += 1
+            logger.warning("Inbound idempotency check failed for %s, processing anyway: %s", key, exc)
+            return True
+        self._counters["claimed" if claimed else "duplicates"] += 1
+        return claimed
+
+    async def release(self, key: str) -> None:
+        try:
+            async with AsyncSession(self._get_engine()) as session:
+                result = await session.exec(delete(ChannelInboundKey).where(ChannelInboundKey.key == key))
+                await session.commit()
+        except Exception as exc:  # noqa: BLE001
+            self._counters["db_errors"] += 1
+            logger.warning("Could not release inbound idempotency key %s: %s", key, exc)
+            return
+        self._counters["released"] += result.rowcount or 0
+
+    def stats(self) -> dict:
+        return {"backend": self.backend, "ttl_seconds": self._ttl_seconds, **self._counters}
+
+
+def create_idempotency_store(backend: str | None = None):
+    backend = (backend or settings.CHANNEL_IDEMPOTENCY_BACKEND or "memory").strip().lower()
+    if backend == "postgres":
+        return PostgresIdempotencyStore(ttl_seconds=settings.CHANNEL_IDEMPOTENCY_TTL_SECONDS)
+    if backend != "memory":
+        logger.warning("Unknown CHANNEL_IDEMPOTENCY_BACKEND %r, using memory.", backend)
+    return MemoryIdempotencyStore(
+        ttl_seconds=settings.CHANNEL_IDEMPOTENCY_TTL_SECONDS,
+        max_entries=settings.CHANNEL_IDEMPOTENCY_MAX_ENTRIES,
+    )
+
+
+inbound_idempotency = create_idempotency_store()
+
+
+async def claim_inbound(channel: str, message_key: str) -> bool:
+    """True the first time *message_key* arrives on *channel*; messages without an id always pass."""
+    message_key = str(message_key or "").strip()
+    if not message_key:
+        return True
+    return await inbound_idempotency.claim(f"{channel}:{message_key}")
+
+
+async def release_inbound(channel: str, message_key: str) -> None:
+    """Forget a claimed *message_key* that was never queued, so a retry is processed."""
+    message_key = str(message_key or "").strip()
+    if message_key:
+        await inbound_idempotency.release(f"{channel}:{message_key}")
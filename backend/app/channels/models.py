@@ -0,0 +1,8 @@
+from sqlmodel import Field, SQLModel
+
+
+class ChannelInboundKey(SQLModel, table=True):
+    __tablename__ = "channel_inbound_keys"
+
+    key: str = Field(primary_key=True)  # "<channel>:<message id>"
+    expires_at: float = Field(index=True)
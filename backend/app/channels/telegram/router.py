@@ -10,5 +10,5 @@ router = APIRouter(tags=["Channels"], prefix="/v1/channels/telegram")
 async def telegram_webhook_endpoint(request: Request):
     payload = await request.json()
     secret_header = request.headers.get("X-Telegram-Bot-Api-Secret-Token")
-    return handle_webhook(payload=payload, secret_header=secret_header)
+    return await handle_webhook(payload=payload, secret_header=secret_header)
 
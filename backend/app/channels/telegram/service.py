@@ -1,46 +1,47 @@
+import asyncio
 import logging
-import threading
 import time
 
-import httpx
 from fastapi import HTTPException
 
-from app.channels.common import natural_read_delay, process_incoming_text
+from app.channels.common import inbound_coalescer, process_incoming_text, remaining_read_delay
+from app.channels.http import channel_http_client
+from app.channels.idempotency import claim_inbound
 from app.channels.media import (
     format_testimony_reply_text,
     get_testimony_images,
     looks_like_testimony_reply,
 )
+from app.channels.typing import TypingHeartbeat
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 
 
-def _telegram_api_request(method: str, payload: dict) -> None:
+async def _telegram_api_request(method: str, payload: dict) -> None:
     token = (settings.TELEGRAM_BOT_TOKEN or "").strip()
     if not token:
         logger.warning("TELEGRAM_BOT_TOKEN is empty, skip Telegram API call: %s", method)
         return
 
     url = f"https://api.telegram.org/bot{token}/{method}"
-    with httpx.Client(timeout=20.0) as client:
-        response = client.post(url, json=payload)
-        try:
-            body = response.json()
-        except ValueError:
-            body = {"raw": response.text}
-
-        if response.status_code >= 400:
-            raise RuntimeError(
-                f"Telegram API {method} failed ({response.status_code}): {body}"
-            )
+    response = await channel_http_client("telegram").post(url, json=payload)
+    try:
+        body = response.json()
+    except ValueError:
+        body = {"raw": response.text}
+
+    if response.status_code >= 400:
+        raise RuntimeError(
+            f"Telegram API {method} failed ({response.status_code}): {body}"
+        )
 
-        if not body.get("ok", False):
-            raise RuntimeError(f"Telegram API error on {method}: {body}")
+    if not body.get("ok", False):
+        raise RuntimeError(f"Telegram API error on {method}: {body}")
 
 
-def _send_telegram_message(chat_id: str, text: str) -> None:
-    _telegram_api_request(
+async def _send_telegram_message(chat_id: str, text: str) -> None:
+    await _telegram_api_request(
         method="sendMessage",
         payload={
             "chat_id": chat_id,
@@ -49,18 +50,18 @@ def _send_telegram_message(chat_id: str, text: str) -> None:
     )
 
 
-def _send_telegram_photo(chat_id: str, photo_url: str, caption: str | None = None) -> None:
+async def _send_telegram_photo(chat_id: str, photo_url: str, caption: str | None = None) -> None:
     payload: dict[str, str] = {
         "chat_id": chat_id,
         "photo": photo_url,
     }
     if caption:
         payload["caption"] = caption[:1024]
-    _telegram_api_request(method="sendPhoto", payload=payload)
+    await _telegram_api_request(method="sendPhoto", payload=payload)
 
 
-def _send_telegram_typing_action(chat_id: str) -> None:
-    _telegram_api_request(
+async def _send_telegram_typing_action(chat_id: str) -> None:
+    await _telegram_api_request(
         method="sendChatAction",
         payload={
             "chat_id": chat_id,
@@ -69,7 +70,7 @@ def _send_telegram_typing_action(chat_id: str) -> None:
     )
 
 
-class _TelegramTypingHeartbeat:
+class _TelegramTypingHeartbeat(TypingHeartbeat):
     """Keep Telegram typing indicator alive while response is being generated."""
 
     def __init__(
@@ -78,35 +79,13 @@ class _TelegramTypingHeartbeat:
         interval_seconds: float = 3.5,
         minimum_visible_seconds: float = 1.4,
     ):
-        self._chat_id = chat_id
-        self._interval_seconds = interval_seconds
-        self._minimum_visible_seconds = minimum_visible_seconds
-        self._stop_event = threading.Event()
-        self._thread = threading.Thread(target=self._run, daemon=True)
-        self._started_at = 0.0
-
-    def _run(self) -> None:
-        while not self._stop_event.is_set():
-            try:
-                _send_telegram_typing_action(self._chat_id)
-            except Exception as exc:  # noqa: BLE001
-                logger.warning("Failed to send Telegram typing action: %s", exc)
-            if self._stop_event.wait(self._interval_seconds):
-                return
-
-    def __enter__(self):
-        self._started_at = time.monotonic()
-        self._thread.start()
-        return self
-
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        elapsed = time.monotonic() - self._started_at
-        remaining = self._minimum_visible_seconds - elapsed
-        if remaining > 0:
-            time.sleep(remaining)
-        self._stop_event.set()
-        self._thread.join(timeout=1.0)
-        return False
+        super().__init__(
+            key=("telegram", chat_id),
+            label="Telegram",
+            send=lambda: _send_telegram_typing_action(chat_id),
+            interval_seconds=interval_seconds,
+            minimum_visible_seconds=minimum_visible_seconds,
+        )
 
 
 def _should_attach_testimony_media(stage: str, assistant_text: str) -> bool:
@@ -116,7 +95,7 @@ def _should_attach_testimony_media(stage: str, assistant_text: str) -> bool:
     return looks_like_testimony_reply(assistant_text)
 
 
-def _extract_text_message(payload: dict) -> tuple[str, str] | None:
+def _extract_text_message(payload: dict) -> tuple[str, str, str] | None:
     message = payload.get("message") or payload.get("edited_message")
     if not isinstance(message, dict):
         return None
@@ -126,10 +105,11 @@ def _extract_text_message(payload: dict) -> tuple[str, str] | None:
     chat_id = str(chat_obj.get("id") or "").strip()
     if not chat_id or not text:
         return None
-    return chat_id, text
+    message_id = str(message.get("message_id") or "").strip()
+    return chat_id, message_id, text
 
 
-def handle_webhook(payload: dict, secret_header: str | None = None) -> dict:
+async def handle_webhook(payload: dict, secret_header: str | None = None) -> dict:
     expected_secret = (settings.TELEGRAM_WEBHOOK_SECRET or "").strip()
     provided_secret = (secret_header or "").strip()
     if expected_secret and expected_secret != provided_secret:
@@ -139,13 +119,24 @@ def handle_webhook(payload: dict, secret_header: str | None = None) -> dict:
     if extracted is None:
         return {"status": "ignored", "detail": "No text message payload"}
 
-    chat_id, text = extracted
-    time.sleep(natural_read_delay(text))
-    with _TelegramTypingHeartbeat(chat_id=chat_id):
-        result = process_incoming_text(
+    chat_id, message_id, text = extracted
+    # Keyed by message, not update: webhook retries and later edits of an answered message are skipped.
+    if not await claim_inbound("telegram", f"{chat_id}:{message_id}" if message_id else ""):
+        logger.info("Skipping duplicate Telegram message id=%s chat=%s", message_id, chat_id)
+        return {"status": "ignored", "detail": "Duplicate Telegram message"}
+
+    received_at = time.monotonic()
+    # Quick follow-up messages are answered together by the request that opened the burst.
+    texts = await inbound_coalescer.collect(("telegram", chat_id), text)
+    if texts is None:
+        return {"status": "ok", "detail": "Merged into pending Telegram turn"}
+
+    await asyncio.sleep(remaining_read_delay("\n".join(texts), received_at))
+    async with _TelegramTypingHeartbeat(chat_id=chat_id):
+        result = await process_incoming_text(
             channel="telegram",
             external_user_id=chat_id,
-            text=text,
+            text=texts,
             conversation_title=f"Telegram {chat_id}",
         )
 
@@ -159,7 +150,7 @@ def handle_webhook(payload: dict, secret_header: str | None = None) -> dict:
             images = get_testimony_images(base_url=base_url) if base_url else []
             for image in images:
                 try:
-                    _send_telegram_photo(
+                    await _send_telegram_photo(
                         chat_id=chat_id,
                         photo_url=image.image_url,
                         caption=image.title,
@@ -177,7 +168,7 @@ def handle_webhook(payload: dict, secret_header: str | None = None) -> dict:
 
     if reply_text:
         try:
-            _send_telegram_message(chat_id=chat_id, text=reply_text)
+            await _send_telegram_message(chat_id=chat_id, text=reply_text)
         except Exception as exc:  # noqa: BLE001
             logger.exception("Failed to send Telegram reply: %s", exc)
 
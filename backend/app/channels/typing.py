@@ -0,0 +1,193 @@
+"""Shared scheduler for channel typing indicators.
+
+Typing indicators expire after a few seconds, so they have to be re-sent
+while a reply is being generated, polished and paced out in bubbles. One
+``TypingScheduler`` task keeps them alive for every active chat: a heap of
+due times, woken when a chat registers or unregisters. The cost is one
+task for the whole process instead of one per heartbeat, however many
+conversations are in flight.
+
+Heartbeats for the same chat share one entry: nested or overlapping
+heartbeats (e.g. a WhatsApp polish step inside a reply) are ref-counted
+and the chat is refreshed at the shortest requested interval, never twice
+in parallel. A send still in flight when its next refresh is due is
+skipped rather than stacked.
+"""
+
+import asyncio
+import contextlib
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import Awaitable, Callable, Hashable
+
+logger = logging.getLogger(__name__)
+
+TypingSender = Callable[[], Awaitable[object]]
+
+
+class _Chat:
+    __slots__ = ("label", "send", "intervals", "due", "fired_at", "generation", "sending")
+
+    def __init__(self, label: str, send: TypingSender):
+        self.label = label
+        self.send = send
+        self.intervals: list[float] = []
+        self.due = 0.0
+        self.fired_at = 0.0
+        self.generation = 0
+        self.sending = False
+
+    @property
+    def interval(self) -> float:
+        return min(self.intervals)
+
+
+class TypingScheduler:
+    def __init__(self):
+        self._chats: dict[Hashable, _Chat] = {}
+        self._heap: list[tuple[float, int, Hashable, int]] = []
+        self._seq = itertools.count()
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._sends: set[asyncio.Task] = set()
+        self._counters = {
+            "registrations": 0,
+            "shared": 0,
+            "sent": 0,
+            "send_errors": 0,
+            "skipped_in_flight": 0,
+        }
+
+    def _schedule(self, key: Hashable, chat: _Chat, due: float) -> None:
+        chat.due = due
+        chat.generation += 1
+        heapq.heappush(self._heap, (due, next(self._seq), key, chat.generation))
+
+    def register(self, key: Hashable, label: str, send: TypingSender, interval_seconds: float) -> None:
+        """Keep *key*'s indicator alive until a matching ``unregister``; sends right away if new."""
+        interval = max(0.05, float(interval_seconds))
+        self._counters["registrations"] += 1
+        now = time.monotonic()
+        chat = self._chats.get(key)
+        if chat is None:
+            chat = self._chats[key] = _Chat(label, send)
+            chat.intervals.append(interval)
+            self._schedule(key, chat, now)
+        else:
+            self._counters["shared"] += 1
+            chat.intervals.append(interval)
+            # A shorter interval must not wait out the longer one already scheduled.
+            if chat.fired_at + interval < chat.due:
+                self._schedule(key, chat, max(now, chat.fired_at + interval))
+
+        if self._task is None or self._task.done():
+            self._wake = asyncio.Event()
+            self._task = asyncio.create_task(self._run(), name="typing-scheduler")
+        else:
+            self._wake.set()
+
+    def unregister(self, key: Hashable, interval_seconds: float) -> None:
+        chat = self._chats.get(key)
+        if chat is None:
+            return
+        interval = max(0.05, float(interval_seconds))
+        with contextlib.suppress(ValueError):
+            chat.intervals.remove(interval)
+        if not chat.intervals:
+            del self._chats[key]
+        elif chat.fired_at + chat.interval != chat.due:
+            # Back to the interval of the heartbeats still open.
+            self._schedule(key, chat, chat.fired_at + chat.interval)
+        if self._wake is not None:
+            self._wake.set()
+
+    async def _run(self) -> None:
+        while self._chats:
+            now = time.monotonic()
+            while self._heap and self._heap[0][0] <= now:
+                _, _, key, generation = heapq.heappop(self._heap)
+                chat = self._chats.get(key)
+                if chat is None or chat.generation != generation:
+                    continue
+                chat.fired_at = now
+                self._fire(chat)
+                self._schedule(key, chat, now + chat.interval)
+            # Drop heap entries of chats that are gone so the heap stays small.
+            while self._heap and self._chats.get(self._heap[0][2]) is None:
+                heapq.heappop(self._heap)
+            timeout = max(0.0, self._heap[0][0] - time.monotonic()) if self._heap else None
+            self._wake.clear()
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), timeout=timeout)
+        self._heap.clear()
+
+    def _fire(self, chat: _Chat) -> None:
+        if chat.sending:
+            self._counters["skipped_in_flight"] += 1
+            return
+        chat.sending = True
+        task = asyncio.create_task(self._send(chat))
+        self._sends.add(task)
+        task.add_done_callback(self._sends.discard)
+
+    async def _send(self, chat: _Chat) -> None:
+        try:
+            await chat.send()
+            self._counters["sent"] += 1
+        except Exception as exc:  # noqa: BLE001
+            self._counters["send_errors"] += 1
+            logger.warning("Failed to send %s typing indicator: %s", chat.label, exc)
+        finally:
+            chat.sending = False
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None and not self._task.done(),
+            "active_chats": len(self._chats),
+            "sends_in_flight": len(self._sends),
+            **self._counters,
+        }
+
+
+typing_scheduler = TypingScheduler()
+
+
+class TypingHeartbeat:
+    """Keep a chat's typing indicator alive for the duration of the block.
+
+    The indicator stays up for at least ``minimum_visible_seconds`` so a
+    fast reply does not flash it for a split second.
+    """
+
+    def __init__(
+        self,
+        key: Hashable,
+        label: str,
+        send: TypingSender,
+        interval_seconds: float,
+        minimum_visible_seconds: float,
+        scheduler: TypingScheduler | None = None,
+    ):
+        self._key = key
+        self._label = label
+        self._send = send
+        self._interval_seconds = interval_seconds
+        self._minimum_visible_seconds = minimum_visible_seconds
+        self._scheduler = scheduler or typing_scheduler
+        self._started_at = 0.0
+
+    async def __aenter__(self):
+        self._started_at = time.monotonic()
+        self._scheduler.register(self._key, self._label, self._send, self._interval_seconds)
+        return self
+
+    async def __aexit__(self, exc_type, exc_val, exc_tb):
+        try:
+            remaining = self._minimum_visible_seconds - (time.monotonic() - self._started_at)
+            if remaining > 0:
+                await asyncio.sleep(remaining)
+        finally:
+            self._scheduler.unregister(self._key, self._interval_seconds)
+        return False
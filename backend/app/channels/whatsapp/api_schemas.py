@@ -4,5 +4,8 @@ from pydantic import BaseModel
 class WhatsappWebhookResponse(BaseModel):
     status: str
     processed_messages: int = 0
+    # Messages still held in a coalescing window, and messages a full dispatcher rejected.
+    coalescing_messages: int = 0
+    rejected_messages: int = 0
     detail: str | None = None
 
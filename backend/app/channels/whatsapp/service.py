@@ -1,24 +1,30 @@
+import asyncio
 import logging
-import threading
 import time
 
 import httpx
 
 from app.agents.whatsapp import create_whatsapp_polisher_agent
-from app.channels.common import natural_read_delay, process_incoming_text
+from app.channels.common import (
+    inbound_coalescer,
+    natural_read_delay,
+    process_incoming_text,
+    remaining_read_delay,
+)
+from app.channels.dispatcher import SenderDispatcher
+from app.channels.http import channel_http_client
+from app.channels.idempotency import claim_inbound, release_inbound
 from app.channels.media import (
     format_whatsapp_reply_text,
     get_testimony_images,
     looks_like_testimony_reply,
     split_whatsapp_bubbles,
 )
+from app.channels.typing import TypingHeartbeat
 from app.core.config import settings
 
 logger = logging.getLogger(__name__)
 _whatsapp_polisher_agent = None
-_processed_inbound_ids: dict[str, float] = {}
-_processed_inbound_ids_lock = threading.Lock()
-_PROCESSED_INBOUND_TTL_SECONDS = 30 * 60
 
 
 def _get_whatsapp_api_context() -> tuple[str, str, str] | None:
@@ -35,8 +41,8 @@ def _get_whatsapp_api_context() -> tuple[str, str, str] | None:
     return access_token, phone_number_id, api_version
 
 
-def count_incoming_text_messages(payload: dict) -> int:
-    count = 0
+def _iter_text_messages(payload: dict):
+    """(sender, message id, body) of every usable text message in a webhook payload."""
     for entry in (payload or {}).get("entry", []):
         for change in entry.get("changes", []):
             value = change.get("value") or {}
@@ -45,32 +51,17 @@ def count_incoming_text_messages(payload: dict) -> int:
                 if message.get("type") != "text":
                     continue
                 sender = str(message.get("from") or "").strip()
+                inbound_message_id = str(message.get("id") or "").strip()
                 body = str((message.get("text") or {}).get("body") or "").strip()
                 if sender and body:
-                    count += 1
-    return count
+                    yield sender, inbound_message_id, body
 
 
-def _register_inbound_message_once(message_id: str) -> bool:
-    inbound_id = str(message_id or "").strip()
-    if not inbound_id:
-        return True
-
-    now = time.time()
-    cutoff = now - _PROCESSED_INBOUND_TTL_SECONDS
-    with _processed_inbound_ids_lock:
-        stale_ids = [k for k, ts in _processed_inbound_ids.items() if ts < cutoff]
-        for stale_id in stale_ids:
-            _processed_inbound_ids.pop(stale_id, None)
-
-        if inbound_id in _processed_inbound_ids:
-            return False
-
-        _processed_inbound_ids[inbound_id] = now
-    return True
+def count_incoming_text_messages(payload: dict) -> int:
+    return sum(1 for _ in _iter_text_messages(payload))
 
 
-def _post_whatsapp_payload(payload: dict) -> None:
+async def _post_whatsapp_payload(payload: dict) -> None:
     context = _get_whatsapp_api_context()
     if context is None:
         return
@@ -78,25 +69,24 @@ def _post_whatsapp_payload(payload: dict) -> None:
     access_token, phone_number_id, api_version = context
     url = f"https://graph.facebook.com/{api_version}/{phone_number_id}/messages"
 
-    with httpx.Client(timeout=20.0) as client:
-        response = client.post(
-            url,
-            headers={
-                "Content-Type": "application/json",
-                "Authorization": f"Bearer {access_token}",
-            },
-            json=payload,
-        )
-        try:
-            response.raise_for_status()
-        except httpx.HTTPStatusError as exc:
-            raise RuntimeError(
-                f"WhatsApp API request failed ({response.status_code}): {response.text}"
-            ) from exc
+    response = await channel_http_client("whatsapp").post(
+        url,
+        headers={
+            "Content-Type": "application/json",
+            "Authorization": f"Bearer {access_token}",
+        },
+        json=payload,
+    )
+    try:
+        response.raise_for_status()
+    except httpx.HTTPStatusError as exc:
+        raise RuntimeError(
+            f"WhatsApp API request failed ({response.status_code}): {response.text}"
+        ) from exc
 
 
-def _send_whatsapp_message(recipient: str, text: str) -> None:
-    _post_whatsapp_payload(
+async def _send_whatsapp_message(recipient: str, text: str) -> None:
+    await _post_whatsapp_payload(
         {
             "messaging_product": "whatsapp",
             "to": recipient,
@@ -106,12 +96,12 @@ def _send_whatsapp_message(recipient: str, text: str) -> None:
     )
 
 
-def _send_whatsapp_image(recipient: str, image_url: str, caption: str | None = None) -> None:
+async def _send_whatsapp_image(recipient: str, image_url: str, caption: str | None = None) -> None:
     image_payload: dict[str, object] = {"link": image_url}
     if caption:
         image_payload["caption"] = caption
 
-    _post_whatsapp_payload(
+    await _post_whatsapp_payload(
         {
             "messaging_product": "whatsapp",
             "to": recipient,
@@ -121,11 +111,11 @@ def _send_whatsapp_image(recipient: str, image_url: str, caption: str | None = N
     )
 
 
-def _mark_whatsapp_read(message_id: str) -> None:
+async def _mark_whatsapp_read(message_id: str) -> None:
     """Mark message as read (double-tick) without showing typing."""
     if not message_id:
         return
-    _post_whatsapp_payload(
+    await _post_whatsapp_payload(
         {
             "messaging_product": "whatsapp",
             "status": "read",
@@ -134,10 +124,10 @@ def _mark_whatsapp_read(message_id: str) -> None:
     )
 
 
-def _send_whatsapp_typing_indicator(message_id: str) -> bool:
+async def _send_whatsapp_typing_indicator(message_id: str) -> bool:
     if not message_id:
         return False
-    _post_whatsapp_payload(
+    await _post_whatsapp_payload(
         {
             "messaging_product": "whatsapp",
             "status": "read",
@@ -148,7 +138,7 @@ def _send_whatsapp_typing_indicator(message_id: str) -> bool:
     return True
 
 
-class _WhatsAppTypingHeartbeat:
+class _WhatsAppTypingHeartbeat(TypingHeartbeat):
     """Keep WhatsApp typing indicator alive while response is being generated."""
 
     def __init__(
@@ -157,35 +147,13 @@ class _WhatsAppTypingHeartbeat:
         interval_seconds: float = 20.0,
         minimum_visible_seconds: float = 1.0,
     ):
-        self._message_id = message_id
-        self._interval_seconds = interval_seconds
-        self._minimum_visible_seconds = minimum_visible_seconds
-        self._stop_event = threading.Event()
-        self._thread = threading.Thread(target=self._run, daemon=True)
-        self._started_at = 0.0
-
-    def _run(self) -> None:
-        while not self._stop_event.is_set():
-            try:
-                _send_whatsapp_typing_indicator(self._message_id)
-            except Exception as exc:  # noqa: BLE001
-                logger.warning("Failed to send WhatsApp typing indicator: %s", exc)
-            if self._stop_event.wait(self._interval_seconds):
-                return
-
-    def __enter__(self):
-        self._started_at = time.monotonic()
-        self._thread.start()
-        return self
-
-    def __exit__(self, exc_type, exc_val, exc_tb):
-        elapsed = time.monotonic() - self._started_at
-        remaining = self._minimum_visible_seconds - elapsed
-        if remaining > 0:
-            time.sleep(remaining)
-        self._stop_event.set()
-        self._thread.join(timeout=2.0)
-        return False
+        super().__init__(
+            key=("whatsapp", message_id),
+            label="WhatsApp",
+            send=lambda: _send_whatsapp_typing_indicator(message_id),
+            interval_seconds=interval_seconds,
+            minimum_visible_seconds=minimum_visible_seconds,
+        )
 
 
 def _should_attach_testimony_media(stage: str, assistant_text: str) -> bool:
@@ -195,21 +163,21 @@ def _should_attach_testimony_media(stage: str, assistant_text: str) -> bool:
     return looks_like_testimony_reply(assistant_text)
 
 
-def _get_whatsapp_polisher():
+async def _get_whatsapp_polisher():
     global _whatsapp_polisher_agent
     if _whatsapp_polisher_agent is None:
         _whatsapp_polisher_agent = create_whatsapp_polisher_agent()
     return _whatsapp_polisher_agent
 
 
-def _build_whatsapp_bubbles(user_text: str, assistant_text: str, stage: str) -> list[str]:
+async def _build_whatsapp_bubbles(user_text: str, assistant_text: str, stage: str) -> list[str]:
     draft = format_whatsapp_reply_text(assistant_text)
     if not draft:
         return []
 
     try:
-        polisher = _get_whatsapp_polisher()
-        polished = polisher.execute(
+        polisher = await _get_whatsapp_polisher()
+        polished = await polisher.execute(
             draft,
             context={"user_text": user_text, "stage": stage},
         )
@@ -239,160 +207,234 @@ def _between_bubble_delay(text: str) -> float:
     return min(1.6, max(0.45, base * 0.18))
 
 
-def _send_whatsapp_bubbles(recipient: str, bubbles: list[str], inbound_message_id: str) -> None:
+async def _send_whatsapp_bubbles(recipient: str, bubbles: list[str], inbound_message_id: str) -> None:
     prepared = [str(bubble or "").strip() for bubble in bubbles if str(bubble or "").strip()]
     total = len(prepared)
     for index, body in enumerate(prepared):
         delay = _outbound_bubble_delay(body, first=index == 0)
         try:
-            with _WhatsAppTypingHeartbeat(
+            async with _WhatsAppTypingHeartbeat(
                 message_id=inbound_message_id,
                 interval_seconds=3.0,
                 minimum_visible_seconds=delay,
             ):
-                time.sleep(delay)
+                await asyncio.sleep(delay)
         except Exception as exc:  # noqa: BLE001
             logger.warning("Failed to keep typing heartbeat before WhatsApp bubble: %s", exc)
             try:
-                _send_whatsapp_typing_indicator(inbound_message_id)
+                await _send_whatsapp_typing_indicator(inbound_message_id)
             except Exception:
                 pass
-            time.sleep(delay)
+            await asyncio.sleep(delay)
 
         try:
-            _send_whatsapp_message(recipient=recipient, text=body)
+            await _send_whatsapp_message(recipient=recipient, text=body)
         except Exception as exc:  # noqa: BLE001
             logger.error("Failed to send WhatsApp bubble %d/%d: %s", index + 1, total, exc)
 
         # Small pause after each bubble so the next one does not look machine-burst.
         if index < total - 1:
-            time.sleep(_between_bubble_delay(body))
+            await asyncio.sleep(_between_bubble_delay(body))
 
 
-def handle_webhook(payload: dict) -> dict:
-    processed_messages = 0
-
-    for entry in payload.get("entry", []):
-        for change in entry.get("changes", []):
-            value = change.get("value") or {}
-            messages = value.get("messages") or []
+async def _handle_text_message(
+    sender: str,
+    inbound_message_id: str,
+    bodies: list[str],
+    received_at: float | None = None,
+) -> None:
+    """Answer one turn; *bodies* holds several messages when a burst was merged."""
+    body = "\n".join(bodies)
+    try:
+        # Reading the latest message marks the earlier ones of the burst read too.
+        await _mark_whatsapp_read(inbound_message_id)
+    except Exception as exc:  # noqa: BLE001
+        logger.warning("Failed to mark WhatsApp message as read: %s", exc)
+    if received_at is None:
+        await asyncio.sleep(natural_read_delay(body))
+    else:
+        await asyncio.sleep(remaining_read_delay(body, received_at))
+    async with _WhatsAppTypingHeartbeat(message_id=inbound_message_id):
+        result = await process_incoming_text(
+            channel="whatsapp",
+            external_user_id=sender,
+            text=bodies,
+            conversation_title=f"WhatsApp {sender}",
+        )
 
-            for message in messages:
-                if message.get("type") != "text":
-                    continue
+    metadata = result.get("assistant_metadata") or {}
+    stage = str(metadata.get("stage") or "").strip().lower()
+    raw_reply_text = str(result.get("reply_text") or "").strip()
+    final_text = format_whatsapp_reply_text(raw_reply_text)
 
-                sender = str(message.get("from") or "").strip()
-                inbound_message_id = str(message.get("id") or "").strip()
-                body = str((message.get("text") or {}).get("body") or "").strip()
-                if not sender or not body:
-                    continue
+    is_testimony = _should_attach_testimony_media(
+        stage=stage,
+        assistant_text=raw_reply_text,
+    ) and raw_reply_text
 
-                if not _register_inbound_message_once(inbound_message_id):
-                    logger.info(
-                        "Skipping duplicate WhatsApp inbound message id=%s from=%s",
-                        inbound_message_id,
-                        sender,
-                    )
-                    continue
+    bubbles: list[str] = []
+    if final_text:
+        try:
+            async with _WhatsAppTypingHeartbeat(
+                message_id=inbound_message_id,
+                interval_seconds=4.0,
+                minimum_visible_seconds=0.6,
+            ):
+                bubbles = await _build_whatsapp_bubbles(
+                    user_text=body,
+                    assistant_text=final_text,
+                    stage=stage,
+                )
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Failed to prepare WhatsApp bubbles: %s", exc)
+            bubbles = split_whatsapp_bubbles(final_text)
+        if not bubbles:
+            bubbles = split_whatsapp_bubbles(final_text)
+
+    if is_testimony:
+        # 1. Send LLM intro bubbles first so text arrives before images.
+        if bubbles:
+            try:
+                await _send_whatsapp_bubbles(
+                    recipient=sender,
+                    bubbles=bubbles,
+                    inbound_message_id=inbound_message_id,
+                )
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("Failed to send WhatsApp testimony intro bubbles: %s", exc)
 
+        # 2. Send images after the intro text.
+        try:
+            base_url = (settings.PUBLIC_BASE_URL or "").strip()
+            if not base_url:
+                logger.error(
+                    "PUBLIC_BASE_URL is not set — WhatsApp testimony images skipped"
+                )
+            images = get_testimony_images(base_url=base_url) if base_url else []
+            logger.info(
+                "Sending %d testimony image(s) to %s (base_url=%r)",
+                len(images),
+                sender,
+                base_url,
+            )
+            for image in images:
+                logger.info("Sending WhatsApp image: %s", image.image_url)
                 try:
-                    _mark_whatsapp_read(inbound_message_id)
-                except Exception as exc:  # noqa: BLE001
-                    logger.warning("Failed to mark WhatsApp message as read: %s", exc)
-                time.sleep(natural_read_delay(body))
-                with _WhatsAppTypingHeartbeat(message_id=inbound_message_id):
-                    result = process_incoming_text(
-                        channel="whatsapp",
-                        external_user_id=sender,
-                        text=body,
-                        conversation_title=f"WhatsApp {sender}",
+                    await _send_whatsapp_image(
+                        recipient=sender,
+                        image_url=image.image_url,
+                        caption=image.title,
+                    )
+                    logger.info("Sent WhatsApp image OK: %s", image.title)
+                except Exception as media_exc:  # noqa: BLE001
+                    logger.error(
+                        "Failed to send WhatsApp image %r (url=%s): %s",
+                        image.title,
+                        image.image_url,
+                        media_exc,
                     )
+        except Exception as exc:  # noqa: BLE001
+            logger.exception("Failed to send WhatsApp testimonial media: %s", exc)
+    else:
+        if bubbles:
+            try:
+                await _send_whatsapp_bubbles(
+                    recipient=sender,
+                    bubbles=bubbles,
+                    inbound_message_id=inbound_message_id,
+                )
+            except Exception as exc:  # noqa: BLE001
+                logger.exception("Failed to send WhatsApp bubble replies: %s", exc)
 
-                metadata = result.get("assistant_metadata") or {}
-                stage = str(metadata.get("stage") or "").strip().lower()
-                raw_reply_text = str(result.get("reply_text") or "").strip()
-                final_text = format_whatsapp_reply_text(raw_reply_text)
 
-                is_testimony = _should_attach_testimony_media(
-                    stage=stage,
-                    assistant_text=raw_reply_text,
-                ) and raw_reply_text
-
-                bubbles: list[str] = []
-                if final_text:
-                    try:
-                        with _WhatsAppTypingHeartbeat(
-                            message_id=inbound_message_id,
-                            interval_seconds=4.0,
-                            minimum_visible_seconds=0.6,
-                        ):
-                            bubbles = _build_whatsapp_bubbles(
-                                user_text=body,
-                                assistant_text=final_text,
-                                stage=stage,
-                            )
-                    except Exception as exc:  # noqa: BLE001
-                        logger.warning("Failed to prepare WhatsApp bubbles: %s", exc)
-                        bubbles = split_whatsapp_bubbles(final_text)
-                    if not bubbles:
-                        bubbles = split_whatsapp_bubbles(final_text)
-
-                if is_testimony:
-                    # 1. Send LLM intro bubbles first so text arrives before images.
-                    if bubbles:
-                        try:
-                            _send_whatsapp_bubbles(
-                                recipient=sender,
-                                bubbles=bubbles,
-                                inbound_message_id=inbound_message_id,
-                            )
-                        except Exception as exc:  # noqa: BLE001
-                            logger.exception("Failed to send WhatsApp testimony intro bubbles: %s", exc)
-
-                    # 2. Send images after the intro text.
-                    try:
-                        base_url = (settings.PUBLIC_BASE_URL or "").strip()
-                        if not base_url:
-                            logger.error(
-                                "PUBLIC_BASE_URL is not set — WhatsApp testimony images skipped"
-                            )
-                        images = get_testimony_images(base_url=base_url) if base_url else []
-                        logger.info(
-                            "Sending %d testimony image(s) to %s (base_url=%r)",
-                            len(images),
-                            sender,
-                            base_url,
-                        )
-                        for image in images:
-                            logger.info("Sending WhatsApp image: %s", image.image_url)
-                            try:
-                                _send_whatsapp_image(
-                                    recipient=sender,
-                                    image_url=image.image_url,
-                                    caption=image.title,
-                                )
-                                logger.info("Sent WhatsApp image OK: %s", image.title)
-                            except Exception as media_exc:  # noqa: BLE001
-                                logger.error(
-                                    "Failed to send WhatsApp image %r (url=%s): %s",
-                                    image.title,
-                                    image.image_url,
-                                    media_exc,
-                                )
-                    except Exception as exc:  # noqa: BLE001
-                        logger.exception("Failed to send WhatsApp testimonial media: %s", exc)
-                else:
-                    if bubbles:
-                        try:
-                            _send_whatsapp_bubbles(
-                                recipient=sender,
-                                bubbles=bubbles,
-                                inbound_message_id=inbound_message_id,
-                            )
-                        except Exception as exc:  # noqa: BLE001
-                            logger.exception("Failed to send WhatsApp bubble replies: %s", exc)
-
-                processed_messages += 1
+async def _handle_dispatched(item: dict) -> None:
+    await _handle_text_message(item["sender"], item["message_id"], item["bodies"], item["received_at"])
+
+
+whatsapp_dispatcher = SenderDispatcher(
+    "whatsapp",
+    _handle_dispatched,
+    concurrency=settings.WHATSAPP_DISPATCH_CONCURRENCY,
+    max_per_sender=settings.WHATSAPP_DISPATCH_MAX_PER_SENDER,
+    max_pending=settings.WHATSAPP_DISPATCH_MAX_PENDING,
+)
+
+
+async def _is_first_delivery(sender: str, inbound_message_id: str) -> bool:
+    if await claim_inbound("whatsapp", inbound_message_id):
+        return True
+    logger.info(
+        "Skipping duplicate WhatsApp inbound message id=%s from=%s",
+        inbound_message_id,
+        sender,
+    )
+    return False
+
+
+# Fire-and-forget tasks started from sync callbacks, referenced until they finish.
+_background_tasks: set[asyncio.Task] = set()
+
+
+def _spawn(coro) -> None:
+    task = asyncio.get_running_loop().create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
+
+def _dispatch_burst(items: list[dict]) -> bool:
+    """Submit a merged burst to its sender's lane; False if the dispatcher rejected it.
+
+    A rejected burst releases its inbound-id claims so Meta's retry of those
+    messages is processed rather than dropped as a duplicate.
+    """
+    queued = whatsapp_dispatcher.submit(
+        items[0]["sender"],
+        {
+            "sender": items[0]["sender"],
+            "message_id": items[-1]["message_id"],
+            "bodies": [item["body"] for item in items],
+            "received_at": items[0]["received_at"],
+        },
+    )
+    for item in items:
+        item["queued"] = queued
+    if not queued:
+        _spawn(_release_claims(items))
+    return queued
+
+
+async def _release_claims(items: list[dict]) -> None:
+    for item in items:
+        await release_inbound("whatsapp", item["message_id"])
+
+
+async def dispatch_webhook(payload: dict) -> dict[str, int]:
+    """Queue each text message for its sender.
+
+    Quick successive messages from one sender are merged into one turn by
+    ``inbound_coalescer`` before they reach the sender's lane. Returns how
+    many messages were queued, are still waiting in a coalescing window,
+    and were rejected by a full dispatcher.
+    """
+    counts = {"queued": 0, "coalescing": 0, "rejected": 0}
+    for sender, inbound_message_id, body in _iter_text_messages(payload):
+        if not await _is_first_delivery(sender, inbound_message_id):
+            continue
+        item = {"sender": sender, "message_id": inbound_message_id, "body": body, "received_at": time.monotonic()}
+        inbound_coalescer.add(("whatsapp", sender), item, _dispatch_burst)
+        queued = item.get("queued")
+        counts["coalescing" if queued is None else "queued" if queued else "rejected"] += 1
+    return counts
+
+
+async def handle_webhook(payload: dict) -> dict:
+    """Process a webhook payload inline, one message after another."""
+    processed_messages = 0
+    for sender, inbound_message_id, body in _iter_text_messages(payload):
+        if not await _is_first_delivery(sender, inbound_message_id):
+            continue
+        await _handle_text_message(sender, inbound_message_id, [body])
+        processed_messages += 1
 
     return {
         "status": "ok",
@@ -26,6 +26,88 @@ class Settings(BaseSettings):
     WHATSAPP_PHONE_NUMBER_ID: str = ""
     WHATSAPP_API_VERSION: str = "v22.0"
 
+    # Shared keep-alive HTTP clients for channel APIs (Graph API, Telegram Bot API)
+    CHANNEL_HTTP2: bool = True
+    CHANNEL_HTTP_MAX_CONNECTIONS: int = 50
+    CHANNEL_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    CHANNEL_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 120.0
+    CHANNEL_HTTP_CONNECT_TIMEOUT: float = 5.0
+    CHANNEL_HTTP_TIMEOUT_SECONDS: float = 20.0
+
+    # WhatsApp webhook dispatch: one ordered lane per sender, bounded parallelism across senders
+    WHATSAPP_DISPATCH_CONCURRENCY: int = 32
+    WHATSAPP_DISPATCH_MAX_PER_SENDER: int = 20
+    WHATSAPP_DISPATCH_MAX_PENDING: int = 2000
+
+    # Merge a user's quick successive channel messages into one turn (window 0 = off)
+    CHANNEL_COALESCE_WINDOW_SECONDS: float = 1.5
+    CHANNEL_COALESCE_MAX_WAIT_SECONDS: float = 6.0
+    CHANNEL_COALESCE_MAX_MESSAGES: int = 6
+
+    # Inbound message dedupe across webhook retries ("memory" per process, or "postgres" shared)
+    CHANNEL_IDEMPOTENCY_BACKEND: str = "memory"
+    CHANNEL_IDEMPOTENCY_TTL_SECONDS: float = 1800.0
+    CHANNEL_IDEMPOTENCY_MAX_ENTRIES: int = 100000
+
+    # Background memory summarization
+    MEMORY_SUMMARY_WORKERS: int = 2
+    MEMORY_SUMMARY_QUEUE_SIZE: int = 1000
+    MEMORY_SUMMARY_MAX_ATTEMPTS: int = 3
+    MEMORY_SUMMARY_RETRY_BACKOFF_SECONDS: float = 1.0
+    MEMORY_SUMMARY_EVERY_N_TURNS: int = 4
+    MEMORY_SUMMARY_IDLE_SECONDS: float = 120.0
+
+    # Shared HTTP transport for LLM provider clients
+    LLM_HTTP_MAX_CONNECTIONS: int = 100
+    LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = 20
+    LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS: float = 120.0
+    LLM_HTTP_CONNECT_TIMEOUT: float = 5.0
+    LLM_HTTP_READ_TIMEOUT: float = 120.0
+    LLM_HTTP2: bool = True
+
+    # LLM response cache (opt-in per config group via config:<group>:response_cache)
+    LLM_RESPONSE_CACHE_MAX_ENTRIES: int = 2048
+    LLM_RESPONSE_CACHE_TTL_SECONDS: float = 3600.0
+    LLM_RESPONSE_CACHE_DB: bool = False
+
+    # Per provider/model circuit breaker and adaptive call timeouts
+    LLM_BREAKER_ENABLED: bool = True
+    LLM_BREAKER_WINDOW: int = 20
+    LLM_BREAKER_MIN_CALLS: int = 5
+    LLM_BREAKER_FAILURE_RATE: float = 0.5
+    LLM_BREAKER_CONSECUTIVE_FAILURES: int = 3
+    LLM_BREAKER_OPEN_SECONDS: float = 30.0
+    LLM_TIMEOUT_LATENCY_MULTIPLIER: float = 3.0
+    LLM_MIN_CALL_TIMEOUT: float = 5.0
+
+    # Client-side LLM rate limits per provider/model (0 = unlimited).
+    # LLM_RATE_LIMITS overrides per "provider:model" or "provider", e.g.
+    # {"openai:gpt-5-mini": {"rpm": 500, "tpm": 200000}}.
+    LLM_RATE_LIMIT_RPM: int = 0
+    LLM_RATE_LIMIT_TPM: int = 0
+    LLM_RATE_LIMITS: dict[str, dict[str, int]] = {}
+
+    # Batch-API offload for deferred LLM work (see app/core/llm/batch.py)
+    LLM_BATCH_BASE_URL: str = ""
+    LLM_BATCH_FLUSH_SECONDS: float = 300.0
+    LLM_BATCH_MAX_REQUESTS: int = 1000
+    LLM_BATCH_POLL_SECONDS: float = 60.0
+
+    # Offer the offline "fake"/"replay" load-test providers (never enable in production)
+    LLM_LOAD_TEST_MODE: bool = False
+
+    # Offline "fake" LLM provider (medians in ms; sigma of the log-normal jitter)
+    LLM_FAKE_TTFT_MS: float = 600.0
+    LLM_FAKE_TOKEN_MS: float = 20.0
+    LLM_FAKE_OUTPUT_TOKENS: int = 60
+    LLM_FAKE_ERROR_RATE: float = 0.0
+    LLM_FAKE_LATENCY_SIGMA: float = 0.35
+    LLM_FAKE_SEED: int = 0
+
+    # "replay" LLM provider: record real transcripts once, then replay them
+    LLM_REPLAY_MODE: str = "replay"
+    LLM_REPLAY_DIR: str = "benchmarks/transcripts"
+
     # Application DB (chat history persistence)
     APP_DATABASE_URL: str = ""
     POSTGRES_HOST: str = "localhost"
@@ -1,8 +1,10 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 import logging
 import time
 
+from sqlalchemy.ext.asyncio import create_async_engine
 from sqlmodel import SQLModel, Session, create_engine, text
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
 
@@ -13,6 +15,8 @@ DB_STARTUP_RETRY_DELAY_SECONDS = 1.0
 app_database_url = settings.app_database_url
 
 app_engine = create_engine(app_database_url)
+# Async engine for the request path (chat turns, channel webhooks, billing).
+app_async_engine = create_async_engine(app_database_url)
 
 
 def _safe_url(value) -> str:
@@ -53,9 +57,27 @@ def get_db() -> Generator[Session, None, None]:
         yield session
 
 
+async def get_async_db() -> AsyncGenerator[AsyncSession, None]:
+    async with AsyncSession(app_async_engine) as session:
+        yield session
+
+
 _ADDITIVE_MIGRATIONS = [
     # Add llm_metadata column to existing chat_messages rows (idempotent).
     "ALTER TABLE chat_messages ADD COLUMN IF NOT EXISTS llm_metadata TEXT",
+    # Incremental memory summarization watermark.
+    "ALTER TABLE agent_memory_entries ADD COLUMN IF NOT EXISTS summary_watermark TEXT",
+    "ALTER TABLE agent_memory_entries ADD COLUMN IF NOT EXISTS summarized_messages INTEGER NOT NULL DEFAULT 0",
+    # Per-message token counts for token-budgeted history windows.
+    "ALTER TABLE chat_messages ADD COLUMN IF NOT EXISTS token_count INTEGER",
+    # Provider prompt-cache accounting on billing events.
+    "ALTER TABLE llm_usage_events ADD COLUMN IF NOT EXISTS cached_input_tokens INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE llm_usage_events ADD COLUMN IF NOT EXISTS cache_write_tokens INTEGER NOT NULL DEFAULT 0",
+    "ALTER TABLE llm_usage_events ADD COLUMN IF NOT EXISTS cache_savings_usd DOUBLE PRECISION NOT NULL DEFAULT 0",
+    # Fast-answer (no LLM call) savings on billing events.
+    "ALTER TABLE llm_usage_events ADD COLUMN IF NOT EXISTS fast_answer_savings_usd DOUBLE PRECISION NOT NULL DEFAULT 0",
+    # Producing agent; every event recorded before this column was a planner turn.
+    "ALTER TABLE llm_usage_events ADD COLUMN IF NOT EXISTS agent VARCHAR NOT NULL DEFAULT 'sales'",
 ]
 
 
@@ -80,6 +102,8 @@ def init_app_database() -> None:
         ConversationMessage,
     )
     from app.agents.memory.models import AgentMemory
+    from app.core.llm.models import LLMResponseCacheEntry
+    from app.channels.models import ChannelInboundKey
 
     _ = (
         AdminConfig,
@@ -89,12 +113,15 @@ def init_app_database() -> None:
         ConversationHistory,
         LLMUsageEvent,
         AgentMemory,
+        LLMResponseCacheEntry,
+        ChannelInboundKey,
     )
     SQLModel.metadata.create_all(app_engine)
     _run_migrations()
     logger.info("Application tables are ready on %s", _safe_url(app_engine.url))
 
 
-def close_app_database() -> None:
+async def close_app_database() -> None:
+    await app_async_engine.dispose()
     app_engine.dispose()
     logger.info("Application database engine disposed.")
@@ -0,0 +1,29 @@
+"""Helpers shared by the pooled HTTP clients (LLM providers and channel APIs)."""
+
+import importlib.util
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def http2_enabled(enabled: bool, setting_name: str) -> bool:
+    """Whether to negotiate HTTP/2: the setting is on and ``h2`` is installed."""
+    if not enabled:
+        return False
+    if importlib.util.find_spec("h2") is None:
+        logger.info("%s is on but the 'h2' package is missing; using HTTP/1.1 keep-alive.", setting_name)
+        return False
+    return True
+
+
+def pool_connection_stats(*clients) -> dict:
+    """Open and idle connection counts across the pools of *clients* (httpx clients or None)."""
+    connections: list = []
+    for client in clients:
+        # httpx does not expose pool state publicly; read httpcore's pool defensively.
+        pool = getattr(getattr(client, "_transport", None), "_pool", None)
+        connections.extend(getattr(pool, "connections", None) or [])
+    return {
+        "open_connections": len(connections),
+        "idle_connections": sum(1 for conn in connections if getattr(conn, "is_idle", lambda: False)()),
+    }
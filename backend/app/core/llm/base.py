@@ -1,5 +1,5 @@
 from abc import ABC, abstractmethod
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 
 from app.core.llm.schemas import GenerateConfig, LLMResponse
 
@@ -11,6 +11,31 @@ class BaseLLM(ABC):
         pass
 
     @abstractmethod
-    def generate_stream(self, messages: list[dict], config: GenerateConfig | None = None) -> Generator[str, None, None]:
-        """Stream response chunks from the LLM."""
+    def generate_stream(
+        self,
+        messages: list[dict],
+        config: GenerateConfig | None = None,
+        usage: dict | None = None,
+    ) -> Generator[str, None, None]:
+        """Stream response chunks from the LLM.
+
+        If *usage* is given it is filled with token counts (same keys as
+        ``LLMResponse.usage``) once the provider reports them, normally at the
+        end of the stream.
+        """
+        pass
+
+    @abstractmethod
+    async def agenerate(self, messages: list[dict], config: GenerateConfig | None = None) -> LLMResponse:
+        """Async counterpart of ``generate`` backed by the provider's async client."""
+        pass
+
+    @abstractmethod
+    def agenerate_stream(
+        self,
+        messages: list[dict],
+        config: GenerateConfig | None = None,
+        usage: dict | None = None,
+    ) -> AsyncGenerator[str, None]:
+        """Async counterpart of ``generate_stream``; fills *usage* the same way."""
         pass
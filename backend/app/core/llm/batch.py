@@ -0,0 +1,332 @@
+"""Batch-API offload for LLM work that can wait.
+
+Provider batch endpoints answer within hours instead of seconds, at about
+half the price. ``LLMBatchQueue`` collects deferred requests, writes one
+JSONL batch file per provider/model every ``LLM_BATCH_FLUSH_SECONDS`` (or
+once ``LLM_BATCH_MAX_REQUESTS`` are waiting), submits it, polls every
+``LLM_BATCH_POLL_SECONDS`` and hands each answer to the result handler
+registered for the request's ``kind``.
+
+Requests carry a ``dedupe_key``; a newer request for the same key
+supersedes the older one, and a superseded answer is discarded when it
+arrives, so results never land out of order. Batches live in memory only:
+a restart drops outstanding work, which callers must tolerate (memory
+summaries are simply recomputed on the next turn).
+
+Only the OpenAI Batch API is supported; ``defer_to_batch`` returns None
+for other providers so callers fall back to a live call. Point
+``LLM_BATCH_BASE_URL`` at ``benchmarks/batch_api_stub.py`` to run the
+whole cycle offline.
+"""
+
+import asyncio
+import contextlib
+import io
+import itertools
+import json
+import logging
+import time
+import uuid
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass, field
+
+from app.core.config import settings
+from app.core.llm.schemas import GenerateConfig
+
+logger = logging.getLogger(__name__)
+
+BatchHandler = Callable[[dict, str], Awaitable[None]]
+
+BATCH_PROVIDERS = {"openai"}
+
+_handlers: dict[str, BatchHandler] = {}
+
+
+def register_batch_handler(kind: str, handler: BatchHandler) -> None:
+    """Route answers of *kind* requests to ``handler(context, text)``."""
+    _handlers[kind] = handler
+
+
+@dataclass
+class BatchItem:
+    custom_id: str
+    kind: str
+    provider: str
+    model: str
+    messages: list[dict]
+    config: GenerateConfig
+    context: dict
+    dedupe_key: str
+    created_at: float = field(default_factory=time.time)
+
+
+class OpenAIBatchBackend:
+    """Submit and collect batches through the OpenAI files + batches API."""
+
+    def __init__(self, provider_llm):
+        # An OpenAIProvider: reuses its async client and request-body builder.
+        self._llm = provider_llm
+
+    async def submit(self, items: list[BatchItem]) -> str:
+        lines = [
+            json.dumps(
+                {
+                    "custom_id": item.custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": self._llm._build_params(item.messages, item.config),
+                },
+                ensure_ascii=True,
+            )
+            for item in items
+        ]
+        client = self._llm._async_client
+        upload = await client.files.create(
+            file=("batch.jsonl", io.BytesIO("\n".join(lines).encode("utf-8"))),
+            purpose="batch",
+        )
+        batch = await client.batches.create(
+            input_file_id=upload.id,
+            endpoint="/v1/chat/completions",
+            completion_window="24h",
+        )
+        return batch.id
+
+    async def poll(self, batch_id: str) -> dict[str, str | None] | None:
+        """``{custom_id: text or None on error}`` once finished, else None."""
+        client = self._llm._async_client
+        batch = await client.batches.retrieve(batch_id)
+        if batch.status in {"validating", "in_progress", "finalizing"}:
+            return None
+        results: dict[str, str | None] = {}
+        if batch.output_file_id:
+            content = await client.files.content(batch.output_file_id)
+            for line in content.text.splitlines():
+                if not line.strip():
+                    continue
+                record = json.loads(line)
+                response = record.get("response") or {}
+                if response.get("status_code") == 200:
+                    results[record["custom_id"]] = response["body"]["choices"][0]["message"]["content"]
+                else:
+                    results[record["custom_id"]] = None
+        return results
+
+
+def _default_backend(provider: str, model: str) -> OpenAIBatchBackend:
+    from app.core.llm.providers.openai import OpenAIProvider
+    from app.core.llm.service import _resolve_api_key
+
+    return OpenAIBatchBackend(
+        OpenAIProvider(
+            api_key=_resolve_api_key(provider),
+            model=model,
+            base_url=settings.LLM_BATCH_BASE_URL or None,
+        )
+    )
+
+
+class LLMBatchQueue:
+    def __init__(
+        self,
+        flush_seconds: float = 300.0,
+        max_requests: int = 1000,
+        poll_seconds: float = 60.0,
+        backend_factory: Callable[[str, str], OpenAIBatchBackend] = _default_backend,
+    ):
+        self._flush_seconds = max(0.0, float(flush_seconds))
+        self._max_requests = max(1, int(max_requests))
+        self._poll_seconds = max(0.01, float(poll_seconds))
+        self._backend_factory = backend_factory
+        self._backends: dict[tuple[str, str], OpenAIBatchBackend] = {}
+        self._pending: dict[str, BatchItem] = {}
+        self._latest: dict[str, str] = {}
+        self._submitted: dict[str, tuple[OpenAIBatchBackend, dict[str, BatchItem]]] = {}
+        self._oldest_pending_at: float | None = None
+        self._seq = itertools.count()
+        self._wake: asyncio.Event | None = None
+        self._task: asyncio.Task | None = None
+        self._counters = {
+            "deferred": 0,
+            "superseded": 0,
+            "batches_submitted": 0,
+            "submit_errors": 0,
+            "completed": 0,
+            "failed": 0,
+            "discarded": 0,
+        }
+
+    def start(self) -> None:
+        if self._task is not None:
+            return
+        self._wake = asyncio.Event()
+        self._task = asyncio.create_task(self._run(), name="llm-batch-queue")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        if self._pending or self._submitted:
+            logger.warning(
+                "LLM batch queue stopped with %d unsent and %d submitted request(s) outstanding.",
+                len(self._pending),
+                sum(len(items) for _, items in self._submitted.values()),
+            )
+
+    def submit(
+        self,
+        kind: str,
+        provider: str,
+        model: str,
+        messages: list[dict],
+        config: GenerateConfig,
+        context: dict,
+        dedupe_key: str | None = None,
+    ) -> str:
+        self.start()
+        custom_id = f"{kind}-{next(self._seq)}-{uuid.uuid4().hex[:8]}"
+        dedupe_key = dedupe_key or custom_id
+        previous = self._latest.get(dedupe_key)
+        if previous is not None:
+            self._counters["superseded"] += 1
+            self._pending.pop(previous, None)
+        self._latest[dedupe_key] = custom_id
+        self._pending[custom_id] = BatchItem(
+            custom_id=custom_id,
+            kind=kind,
+            provider=provider,
+            model=model,
+            messages=messages,
+            config=config,
+            context=context,
+            dedupe_key=dedupe_key,
+        )
+        self._counters["deferred"] += 1
+        if self._oldest_pending_at is None:
+            self._oldest_pending_at = time.monotonic()
+        if len(self._pending) >= self._max_requests and self._wake is not None:
+            self._wake.set()
+        return custom_id
+
+    def _flush_due(self) -> bool:
+        if not self._pending:
+            return False
+        if len(self._pending) >= self._max_requests:
+            return True
+        return time.monotonic() - (self._oldest_pending_at or 0.0) >= self._flush_seconds
+
+    async def _run(self) -> None:
+        while True:
+            with contextlib.suppress(asyncio.TimeoutError):
+                await asyncio.wait_for(self._wake.wait(), timeout=self._poll_seconds)
+            self._wake.clear()
+            try:
+                if self._flush_due():
+                    await self.flush()
+                await self.poll_once()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("LLM batch queue cycle failed: %s", exc)
+
+    def _backend(self, provider: str, model: str) -> OpenAIBatchBackend:
+        key = (provider, model)
+        if key not in self._backends:
+            self._backends[key] = self._backend_factory(provider, model)
+        return self._backends[key]
+
+    async def flush(self) -> list[str]:
+        """Submit everything waiting, one batch per provider/model."""
+        pending, self._pending = self._pending, {}
+        self._oldest_pending_at = None
+        groups: dict[tuple[str, str], list[BatchItem]] = {}
+        for item in pending.values():
+            groups.setdefault((item.provider, item.model), []).append(item)
+
+        batch_ids: list[str] = []
+        for (provider, model), items in groups.items():
+            backend = self._backend(provider, model)
+            try:
+                batch_id = await backend.submit(items)
+            except Exception as exc:  # noqa: BLE001
+                self._counters["submit_errors"] += 1
+                logger.warning("LLM batch submit failed for %s:%s: %s", provider, model, exc)
+                # Keep them for the next cycle unless something newer replaced them.
+                for item in items:
+                    if self._latest.get(item.dedupe_key) == item.custom_id:
+                        self._pending[item.custom_id] = item
+                if self._pending and self._oldest_pending_at is None:
+                    self._oldest_pending_at = time.monotonic()
+                continue
+            self._submitted[batch_id] = (backend, {item.custom_id: item for item in items})
+            self._counters["batches_submitted"] += 1
+            batch_ids.append(batch_id)
+        return batch_ids
+
+    async def poll_once(self) -> int:
+        """Collect finished batches; returns how many answers were applied."""
+        applied = 0
+        for batch_id, (backend, items) in list(self._submitted.items()):
+            results = await backend.poll(batch_id)
+            if results is None:
+                continue
+            del self._submitted[batch_id]
+            for custom_id, item in items.items():
+                applied += await self._apply(item, results.get(custom_id))
+        return applied
+
+    async def _apply(self, item: BatchItem, text: str | None) -> int:
+        if self._latest.get(item.dedupe_key) != item.custom_id:
+            self._counters["discarded"] += 1
+            return 0
+        del self._latest[item.dedupe_key]
+        handler = _handlers.get(item.kind)
+        if text is None or handler is None:
+            self._counters["failed"] += 1
+            return 0
+        try:
+            await handler(item.context, text)
+        except Exception as exc:  # noqa: BLE001
+            self._counters["failed"] += 1
+            logger.warning("LLM batch result handler %s failed: %s", item.kind, exc)
+            return 0
+        self._counters["completed"] += 1
+        return 1
+
+    def stats(self) -> dict:
+        return {
+            "running": self._task is not None,
+            "pending_requests": len(self._pending),
+            "batches_in_flight": len(self._submitted),
+            "requests_in_flight": sum(len(items) for _, items in self._submitted.values()),
+            **self._counters,
+        }
+
+
+llm_batch_queue = LLMBatchQueue(
+    flush_seconds=settings.LLM_BATCH_FLUSH_SECONDS,
+    max_requests=settings.LLM_BATCH_MAX_REQUESTS,
+    poll_seconds=settings.LLM_BATCH_POLL_SECONDS,
+)
+
+
+def defer_to_batch(
+    config_group: str,
+    kind: str,
+    messages: list[dict],
+    config: GenerateConfig,
+    context: dict,
+    dedupe_key: str | None = None,
+) -> str | None:
+    """Queue a request for the group's provider/model; None if it has no batch API."""
+    from app.core.llm.service import PROVIDER_ALIASES, _resolve
+
+    provider = _resolve(config_group, "provider", "CHATBOT_DEFAULT_LLM")
+    provider = PROVIDER_ALIASES.get(provider, provider)
+    if provider not in BATCH_PROVIDERS:
+        return None
+    model = _resolve(config_group, "model", "CHATBOT_DEFAULT_MODEL")
+    return llm_batch_queue.submit(kind, provider, model, messages, config, context, dedupe_key)
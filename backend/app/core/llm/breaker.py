@@ -0,0 +1,296 @@
+"""Circuit breaker and adaptive timeouts per LLM provider/model.
+
+Every provider instance from ``create_llm`` is wrapped in ``BreakerLLM``.
+Its breaker tracks the outcome of the last ``LLM_BREAKER_WINDOW`` calls
+and opens when either of these holds:
+
+- ``LLM_BREAKER_CONSECUTIVE_FAILURES`` calls in a row failed;
+- at least ``LLM_BREAKER_MIN_CALLS`` calls were seen and their failure rate
+  reached ``LLM_BREAKER_FAILURE_RATE``.
+
+While open, calls fail at once with ``CircuitOpenError``, so a hedged
+caller fails over and the planner sends its fallback reply without
+waiting on a dead provider. After ``LLM_BREAKER_OPEN_SECONDS`` one probe
+call is let through (half-open). Success closes the breaker; failure
+opens it again.
+
+Breakers are kept per provider/model *and* call class. Background work
+(``llm_memory`` summaries: long prompts, slow reads) gets its own breaker
+and latency history, so a run of slow or failed summaries neither opens
+the breaker nor stretches the timeout of customer-facing replies.
+
+Async calls get a per-call timeout of ``LLM_TIMEOUT_LATENCY_MULTIPLIER``
+times the observed p99 latency, clamped to
+``[LLM_MIN_CALL_TIMEOUT, LLM_HTTP_READ_TIMEOUT]``. For streams the timeout
+applies to the wait for each chunk, using time-to-first-chunk latencies.
+"""
+
+import asyncio
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncGenerator, Generator
+
+from app.core.config import settings
+from app.core.llm.base import BaseLLM
+from app.core.llm.hedging import LatencyTracker
+from app.core.llm.ratelimit import GROUP_PRIORITIES, PRIORITY_BACKGROUND
+from app.core.llm.schemas import GenerateConfig, LLMResponse
+
+CLOSED = "closed"
+OPEN = "open"
+HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(RuntimeError):
+    """Raised instead of calling a provider whose breaker is open."""
+
+
+class CircuitBreaker:
+    def __init__(
+        self,
+        name: str,
+        window: int = settings.LLM_BREAKER_WINDOW,
+        min_calls: int = settings.LLM_BREAKER_MIN_CALLS,
+        failure_rate: float = settings.LLM_BREAKER_FAILURE_RATE,
+        consecutive_failures: int = settings.LLM_BREAKER_CONSECUTIVE_FAILURES,
+        open_seconds: float = settings.LLM_BREAKER_OPEN_SECONDS,
+    ):
+        self.name = name
+        self._min_calls = max(1, min_calls)
+        self._failure_rate = failure_rate
+        self._consecutive_limit = max(1, consecutive_failures)
+        self._open_seconds = open_seconds
+        self._lock = threading.Lock()
+        self._outcomes: deque[bool] = deque(maxlen=max(1, window))
+        self._latency = LatencyTracker(window=max(1, window) * 5, min_samples=self._min_calls)
+        self._state = CLOSED
+        self._opened_at = 0.0
+        self._consecutive = 0
+        self._probing = False
+        self._counters = {"successes": 0, "failures": 0, "timeouts": 0, "rejected": 0, "opened": 0}
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            return self._current_state()
+
+    def _current_state(self) -> str:
+        if self._state == OPEN and time.monotonic() - self._opened_at >= self._open_seconds:
+            self._state = HALF_OPEN
+        return self._state
+
+    def allow(self) -> None:
+        """Admit a call or raise ``CircuitOpenError``."""
+        with self._lock:
+            state = self._current_state()
+            if state == CLOSED:
+                return
+            if state == HALF_OPEN and not self._probing:
+                self._probing = True
+                return
+            self._counters["rejected"] += 1
+        raise CircuitOpenError(f"LLM circuit for {self.name} is open")
+
+    def record_success(self, seconds: float, kind: str = "call") -> None:
+        self._latency.record(kind, seconds)
+        with self._lock:
+            self._counters["successes"] += 1
+            self._outcomes.append(True)
+            self._consecutive = 0
+            if self._state != CLOSED:
+                self._state = CLOSED
+                self._outcomes.clear()
+            self._probing = False
+
+    def record_failure(self, timed_out: bool = False) -> None:
+        with self._lock:
+            self._counters["failures"] += 1
+            if timed_out:
+                self._counters["timeouts"] += 1
+            self._outcomes.append(False)
+            self._consecutive += 1
+            failures = self._outcomes.count(False)
+            if (
+                self._state != CLOSED
+                or self._consecutive >= self._consecutive_limit
+                or (
+                    len(self._outcomes) >= self._min_calls
+                    and failures / len(self._outcomes) >= self._failure_rate
+                )
+            ):
+                self._trip()
+            self._probing = False
+
+    def release(self) -> None:
+        """End a call without an outcome (e.g. the caller cancelled it)."""
+        with self._lock:
+            self._probing = False
+
+    def _trip(self) -> None:
+        if self._state != OPEN:
+            self._counters["opened"] += 1
+        self._state = OPEN
+        self._opened_at = time.monotonic()
+
+    def reset(self) -> None:
+        with self._lock:
+            self._state = CLOSED
+            self._outcomes.clear()
+            self._consecutive = 0
+            self._probing = False
+
+    def call_timeout(self, kind: str = "call") -> float:
+        ceiling = float(settings.LLM_HTTP_READ_TIMEOUT)
+        p99 = self._latency.percentile(kind, q=0.99)
+        if p99 is None:
+            return ceiling
+        return min(ceiling, max(float(settings.LLM_MIN_CALL_TIMEOUT), p99 * settings.LLM_TIMEOUT_LATENCY_MULTIPLIER))
+
+    def stats(self) -> dict:
+        with self._lock:
+            state = self._current_state()
+            outcomes = list(self._outcomes)
+            counters = dict(self._counters)
+            retry_in = max(0.0, self._open_seconds - (time.monotonic() - self._opened_at)) if state == OPEN else 0.0
+        return {
+            "name": self.name,
+            "state": state,
+            "window_calls": len(outcomes),
+            "window_failure_rate": round(outcomes.count(False) / len(outcomes), 4) if outcomes else 0.0,
+            "retry_in_seconds": round(retry_in, 2),
+            "call_timeout_seconds": round(self.call_timeout(), 2),
+            "stream_timeout_seconds": round(self.call_timeout("stream"), 2),
+            **counters,
+        }
+
+
+INTERACTIVE = "interactive"
+BACKGROUND = "background"
+
+_lock = threading.Lock()
+_breakers: dict[tuple[str, str, str], CircuitBreaker] = {}
+
+
+def call_class(config_group: str) -> str:
+    """Breaker class of a config group: background work or customer-facing calls."""
+    if GROUP_PRIORITIES.get(config_group) == PRIORITY_BACKGROUND:
+        return BACKGROUND
+    return INTERACTIVE
+
+
+def breaker_for(provider: str, model: str, kind: str = INTERACTIVE) -> CircuitBreaker:
+    with _lock:
+        breaker = _breakers.get((provider, model, kind))
+        if breaker is None:
+            breaker = _breakers[(provider, model, kind)] = CircuitBreaker(f"{provider}:{model}:{kind}")
+        return breaker
+
+
+def breaker_stats() -> list[dict]:
+    with _lock:
+        breakers = list(_breakers.values())
+    return [breaker.stats() for breaker in breakers]
+
+
+def reset_breaker(provider: str, model: str) -> bool:
+    """Reset every call class of *provider*/*model*; False if none exist."""
+    with _lock:
+        breakers = [b for (p, m, _), b in _breakers.items() if (p, m) == (provider, model)]
+    for breaker in breakers:
+        breaker.reset()
+    return bool(breakers)
+
+
+class BreakerLLM(BaseLLM):
+    """Guard a provider with its circuit breaker and adaptive timeouts."""
+
+    def __init__(self, inner: BaseLLM, breaker: CircuitBreaker):
+        self.inner = inner
+        self.breaker = breaker
+
+    def generate(self, messages: list[dict], config: GenerateConfig | None = None) -> LLMResponse:
+        self.breaker.allow()
+        started = time.monotonic()
+        try:
+            response = self.inner.generate(messages, config)
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success(time.monotonic() - started)
+        return response
+
+    def generate_stream(
+        self,
+        messages: list[dict],
+        config: GenerateConfig | None = None,
+        usage: dict | None = None,
+    ) -> Generator[str, None, None]:
+        self.breaker.allow()
+        started = time.monotonic()
+        first_chunk_at: float | None = None
+        try:
+            for chunk in self.inner.generate_stream(messages, config, usage):
+                if first_chunk_at is None:
+                    first_chunk_at = time.monotonic()
+                yield chunk
+        except GeneratorExit:
+            self.breaker.release()
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success((first_chunk_at or time.monotonic()) - started, kind="stream")
+
+    async def agenerate(self, messages: list[dict], config: GenerateConfig | None = None) -> LLMResponse:
+        self.breaker.allow()
+        started = time.monotonic()
+        try:
+            response = await asyncio.wait_for(
+                self.inner.agenerate(messages, config),
+                timeout=self.breaker.call_timeout(),
+            )
+        except asyncio.CancelledError:
+            self.breaker.release()
+            raise
+        except asyncio.TimeoutError:
+            self.breaker.record_failure(timed_out=True)
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        self.breaker.record_success(time.monotonic() - started)
+        return response
+
+    async def agenerate_stream(
+        self,
+        messages: list[dict],
+        config: GenerateConfig | None = None,
+        usage: dict | None = None,
+    ) -> AsyncGenerator[str, None]:
+        self.breaker.allow()
+        timeout = self.breaker.call_timeout("stream")
+        started = time.monotonic()
+        first_chunk_at: float | None = None
+        stream = self.inner.agenerate_stream(messages, config, usage)
+        try:
+            while True:
+                try:
+                    chunk = await asyncio.wait_for(stream.__anext__(), timeout=timeout)
+                except StopAsyncIteration:
+                    break
+                if first_chunk_at is None:
+                    first_chunk_at = time.monotonic()
+                yield chunk
+        except (GeneratorExit, asyncio.CancelledError):
+            self.breaker.release()
+            raise
+        except asyncio.TimeoutError:
+            self.breaker.record_failure(timed_out=True)
+            raise
+        except Exception:
+            self.breaker.record_failure()
+            raise
+        finally:
+            await stream.aclose()
+        self.breaker.record_success((first_chunk_at or time.monotonic()) - started, kind="stream")
@@ -0,0 +1,243 @@
+"""Content-addressed cache for deterministic LLM calls.
+
+Responses are keyed by a sha256 of provider, model, messages and
+``GenerateConfig``, so a retried webhook that re-polishes the same draft or
+a re-summarized unchanged window is answered without a provider call.
+Entries live in a process-local LRU with TTL and, when
+``LLM_RESPONSE_CACHE_DB`` is on, in the shared ``llm_response_cache``
+table so other workers can reuse them. Expired rows are purged every
+``PURGE_EVERY`` stores.
+
+Caching is opt-in per config group (``config:<group>:response_cache``) and
+only covers ``generate``/``agenerate``; streams always go to the provider.
+A cache hit reports zero token usage marked ``cache_hit`` (see
+``cache_hit_usage``) so callers and billing record it at no cost.
+"""
+
+import asyncio
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from collections.abc import AsyncGenerator, Generator
+
+from sqlmodel import delete, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from app.core.config import settings
+from app.core.llm.base import BaseLLM
+from app.core.llm.models import LLMResponseCacheEntry
+from app.core.llm.schemas import GenerateConfig, LLMResponse
+
+logger = logging.getLogger(__name__)
+
+
+def response_cache_key(provider: str, model: str, messages: list[dict], config: GenerateConfig) -> str:
+    raw = json.dumps(
+        {
+            "provider": provider,
+            "model": model,
+            "messages": [{"role": m.get("role"), "content": m.get("content")} for m in messages],
+            "config": config.model_dump(),
+        },
+        ensure_ascii=True,
+        sort_keys=True,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+def cache_hit_usage() -> dict:
+    """Usage of a response served from the cache: no provider tokens were billed."""
+    return {
+        "cache_hit": True,
+        "prompt_tokens": 0,
+        "completion_tokens": 0,
+        "input_tokens": 0,
+        "output_tokens": 0,
+        "total_tokens": 0,
+    }
+
+
+class ResponseCache:
+    PURGE_EVERY = 500
+
+    def __init__(self, max_entries: int = 2048, ttl_seconds: float = 3600.0, use_db: bool = False):
+        self._max_entries = max(1, int(max_entries))
+        self._ttl_seconds = max(1.0, float(ttl_seconds))
+        self._use_db = use_db
+        self._lock = threading.Lock()
+        self._entries: OrderedDict[str, tuple[float, str]] = OrderedDict()
+        self._tasks: set[asyncio.Task] = set()
+        self._since_purge = 0
+        self._counters = {
+            "hits": 0,
+            "db_hits": 0,
+            "misses": 0,
+            "stores": 0,
+            "evictions": 0,
+            "expired": 0,
+            "purged": 0,
+            "db_errors": 0,
+        }
+
+    def get(self, key: str) -> str | None:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires_at, text = entry
+            if expires_at <= time.time():
+                del self._entries[key]
+                self._counters["expired"] += 1
+                return None
+            self._entries.move_to_end(key)
+            self._counters["hits"] += 1
+            return text
+
+    def put(self, key: str, text: str, expires_at: float | None = None) -> None:
+        with self._lock:
+            self._entries[key] = (expires_at or time.time() + self._ttl_seconds, text)
+            self._entries.move_to_end(key)
+            self._counters["stores"] += 1
+            while len(self._entries) > self._max_entries:
+                self._entries.popitem(last=False)
+                self._counters["evictions"] += 1
+
+    def record_miss(self) -> None:
+        with self._lock:
+            self._counters["misses"] += 1
+
+    async def aget(self, key: str) -> str | None:
+        text = self.get(key)
+        if text is not None or not self._use_db:
+            return text
+        try:
+            from app.core.database import app_async_engine
+
+            async with AsyncSession(app_async_engine) as session:
+                entry = (
+                    await session.exec(
+                        select(LLMResponseCacheEntry)
+                        .where(LLMResponseCacheEntry.key == key)
+                        .where(LLMResponseCacheEntry.expires_at > time.time())
+                    )
+                ).first()
+        except Exception as exc:  # noqa: BLE001
+            self._counters["db_errors"] += 1
+            logger.warning("LLM response cache lookup failed: %s", exc)
+            return None
+        if entry is None:
+            return None
+        self._counters["db_hits"] += 1
+        self.put(key, entry.text, expires_at=entry.expires_at)
+        return entry.text
+
+    def store(self, key: str, text: str, provider: str, model: str) -> None:
+        """Cache *text* locally now and, with the DB tier on, persist it in the background."""
+        expires_at = time.time() + self._ttl_seconds
+        self.put(key, text, expires_at=expires_at)
+        if not self._use_db:
+            return
+        task = asyncio.get_running_loop().create_task(self._db_store(key, text, provider, model, expires_at))
+        self._tasks.add(task)
+        task.add_done_callback(self._tasks.discard)
+
+    async def _db_store(self, key: str, text: str, provider: str, model: str, expires_at: float) -> None:
+        try:
+            from app.core.database import app_async_engine
+
+            async with AsyncSession(app_async_engine) as session:
+                await session.merge(
+                    LLMResponseCacheEntry(
+                        key=key,
+                        provider=provider,
+                        model=model,
+                        text=text,
+                        expires_at=expires_at,
+                    )
+                )
+                self._since_purge += 1
+                if self._since_purge >= self.PURGE_EVERY:
+                    self._since_purge = 0
+                    result = await session.exec(
+                        delete(LLMResponseCacheEntry).where(LLMResponseCacheEntry.expires_at <= time.time())
+                    )
+                    self._counters["purged"] += result.rowcount or 0
+                await session.commit()
+        except Exception as exc:  # noqa: BLE001
+            self._counters["db_errors"] += 1
+            logger.warning("LLM response cache store failed: %s", exc)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            lookups = self._counters["hits"] + self._counters["db_hits"] + self._counters["misses"]
+            return {
+                "entries": len(self._entries),
+                "max_entries": self._max_entries,
+                "ttl_seconds": self._ttl_seconds,
+                "db_tier": self._use_db,
+                "hit_rate": round((lookups - self._counters["misses"]) / lookups, 4) if lookups else 0.0,
+                **self._counters,
+            }
+
+
+response_cache = ResponseCache(
+    max_entries=settings.LLM_RESPONSE_CACHE_MAX_ENTRIES,
+    ttl_seconds=settings.LLM_RESPONSE_CACHE_TTL_SECONDS,
+    use_db=settings.LLM_RESPONSE_CACHE_DB,
+)
+
+
+class CachedLLM(BaseLLM):
+    """Wrap a provider so identical blocking calls are served from ``response_cache``."""
+
+    def __init__(self, inner: BaseLLM, provider: str, model: str, cache: ResponseCache = response_cache):
+        self.inner = inner
+        self._provider = provider
+        self._model = model
+        self._cache = cache
+
+    def _key(self, messages: list[dict], config: GenerateConfig | None) -> str:
+        return response_cache_key(self._provider, self._model, messages, config or GenerateConfig())
+
+    def generate(self, messages: list[dict], config: GenerateConfig | None = None) -> LLMResponse:
+        key = self._key(messages, config)
+        text = self._cache.get(key)
+        if text is not None:
+            return LLMResponse(text=text, usage=cache_hit_usage())
+        self._cache.record_miss()
+        response = self.inner.generate(messages, config)
+        self._cache.put(key, response.text)
+        return response
+
+    def generate_stream(
+        self,
+        messages: list[dict],
+        config: GenerateConfig | None = None,
+        usage: dict | None = None,
+    ) -> Generator[str, None, None]:
+        return self.inner.generate_stream(messages, config, usage)
+
+    async def agenerate(self, messages: list[dict], config: GenerateConfig | None = None) -> LLMResponse:
+        key = self._key(messages, config)
+        text = await self._cache.aget(key)
+        if text is not None:
+            return LLMResponse(text=text, usage=cache_hit_usage())
+        self._cache.record_miss()
+        response = await self.inner.agenerate(messages, config)
+        self._cache.store(key, response.text, self._provider, self._model)
+        return response
+
+    def agenerate_stream(
+        self,
+        messages: list[dict],
+        config: GenerateConfig | None = None,
+        usage: dict | None = None,
+    ) -> AsyncGenerator[str, None]:
+        return self.inner.agenerate_stream(messages, config, usage)
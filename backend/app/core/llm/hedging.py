@@ -0,0 +1,318 @@
+"""Hedged requests and failover across two LLM providers.
+
+``HedgedLLM`` sends a call to the primary provider and, if it has not
+answered after the hedge delay, sends the same call to a secondary
+provider/model. Whichever answers first wins and the other call is
+cancelled. A primary error before the delay fails over to the secondary
+at once. For streams the race is on the first chunk; after that the
+winning stream is relayed as-is.
+
+The hedge delay is the primary's live p95 latency (time to first chunk
+for streams), clamped to ``[_MIN_HEDGE_DELAY_SECONDS, max_delay]``. The
+upper clamp matters during an incident: p95 climbs with the outage, so
+an unclamped threshold would hedge later exactly when it is needed. A
+call that loses the race is recorded with its elapsed time when it is
+cancelled, a censored sample (it would have taken at least that long),
+so a degrading primary keeps pulling its p95 up while the hedge wins.
+
+Enable per config group with ``config:<group>:hedge_provider`` and
+``hedge_model``; ``hedge_after_ms`` sets ``max_delay``.
+"""
+
+import asyncio
+import contextlib
+import logging
+import math
+import threading
+import time
+from collections import deque
+from collections.abc import AsyncGenerator, Generator
+
+from app.core.llm.base import BaseLLM
+from app.core.llm.schemas import GenerateConfig, LLMResponse
+
+logger = logging.getLogger(__name__)
+
+_MIN_HEDGE_DELAY_SECONDS = 0.25
+_MIN_SAMPLES = 20
+_WINDOW = 200
+
+
+class LatencyTracker:
+    """Rolling latency samples per ``provider:model[:stream]`` key."""
+
+    def __init__(self, window: int = _WINDOW, min_samples: int = _MIN_SAMPLES):
+        self._window = window
+        self._min_samples = min_samples
+        self._lock = threading.Lock()
+        self._samples: dict[str, deque[float]] = {}
+
+    def record(self, key: str, seconds: float) -> None:
+        with self._lock:
+            samples = self._samples.get(key)
+            if samples is None:
+                samples = self._samples[key] = deque(maxlen=self._window)
+            samples.append(seconds)
+
+    def percentile(self, key: str, q: float = 0.95) -> float | None:
+        """The *q* latency of *key*, or None until ``min_samples`` were seen."""
+        with self._lock:
+            samples = sorted(self._samples.get(key) or ())
+        if len(samples) < self._min_samples:
+            return None
+        return samples[min(len(samples) - 1, math.ceil(q * len(samples)) - 1)]
+
+    def stats(self) -> dict:
+        with self._lock:
+            keys = list(self._samples)
+        return {
+            key: {"samples": len(self._samples[key]), "p95_seconds": self.percentile(key)}
+            for key in keys
+        }
+
+
+latency_tracker = LatencyTracker()
+
+_counters_lock = threading.Lock()
+_counters = {"calls": 0, "hedged": 0, "secondary_wins": 0, "failovers": 0, "errors": 0}
+
+
+def _count(name: str) -> None:
+    with _counters_lock:
+        _counters[name] += 1
+
+
+def hedging_stats() -> dict:
+    with _counters_lock:
+        counters = dict(_counters)
+    return {**counters, "latency": latency_tracker.stats()}
+
+
+async def _first_chunk(stream: AsyncGenerator[str, None]) -> tuple[bool, str]:
+    try:
+        return True, await stream.__anext__()
+    except StopAsyncIteration:
+        return False, ""
+
+
+async def _cancel(task: asyncio.Task, stream: AsyncGenerator[str, None] | None = None) -> None:
+    task.cancel()
+    with contextlib.suppress(BaseException):
+        await task
+    if stream is not None:
+        with contextlib.suppress(Exception):
+            await stream.aclose()
+
+
+class _Racer:
+    def __init__(self, llm: BaseLLM, identity: tuple[str, str], label: str):
+        self.llm = llm
+        self.identity = identity
+        self.label = label
+        self.usage: dict = {}
+        self.stream: AsyncGenerator[str, None] | None = None
+        self.task: asyncio.Task | None = None
+        self.started_at = 0.0
+
+    @property
+    def key(self) -> str:
+        return f"{self.identity[0]}:{self.identity[1]}"
+
+    def lost_race(self) -> bool:
+        """Still running, or answered too, when another racer won."""
+        task = self.task
+        if task is None:
+            return False
+        return not task.done() or (not task.cancelled() and task.exception() is None)
+
+
+class HedgedLLM(BaseLLM):
+    def __init__(
+        self,
+        primary: BaseLLM,
+        secondary: BaseLLM,
+        primary_identity: tuple[str, str],
+        secondary_identity: tuple[str, str],
+        max_delay: float = 3.0,
+        tracker: LatencyTracker = latency_tracker,
+    ):
+        self.primary = primary
+        self.secondary = secondary
+        self._primary_identity = primary_identity
+        self._secondary_identity = secondary_identity
+        self._max_delay = max(_MIN_HEDGE_DELAY_SECONDS, float(max_delay))
+        self._tracker = tracker
+
+    def _hedge_delay(self, key: str) -> float:
+        p95 = self._tracker.percentile(key)
+        if p95 is None:
+            return self._max_delay
+        return min(self._max_delay, max(_MIN_HEDGE_DELAY_SECONDS, p95))
+
+    @staticmethod
+    def _tag(usage: dict, identity: tuple[str, str]) -> dict:
+        # Lets callers bill the provider that actually answered.
+        return {**usage, "provider": identity[0], "model": identity[1]}
+
+    def _racers(self) -> tuple[_Racer, _Racer]:
+        return (
+            _Racer(self.primary, self._primary_identity, "primary"),
+            _Racer(self.secondary, self._secondary_identity, "secondary"),
+        )
+
+    # ── Blocking calls: failover only ─────────────────────────────────────────
+
+    def generate(self, messages: list[dict], config: GenerateConfig | None = None) -> LLMResponse:
+        _count("calls")
+        try:
+            response = self.primary.generate(messages, config)
+            return LLMResponse(text=response.text, usage=self._tag(response.usage, self._primary_identity))
+        except Exception as exc:  # noqa: BLE001
+            logger.warning("Primary LLM %s failed, failing over: %s", self._primary_identity, exc)
+            _count("failovers")
+        response = self.secondary.generate(messages, config)
+        return LLMResponse(text=response.text, usage=self._tag(response.usage, self._secondary_identity))
+
+    def generate_stream(
+        self,
+        messages: list[dict],
+        config: GenerateConfig | None = None,
+        usage: dict | None = None,
+    ) -> Generator[str, None, None]:
+        _count("calls")
+        started = False
+        inner_usage: dict = {}
+        try:
+            for chunk in self.primary.generate_stream(messages, config, inner_usage):
+                started = True
+                yield chunk
+            if usage is not None:
+                usage.update(self._tag(inner_usage, self._primary_identity))
+            return
+        except Exception as exc:  # noqa: BLE001
+            if started:
+                raise
+            logger.warning("Primary LLM %s failed, failing over: %s", self._primary_identity, exc)
+            _count("failovers")
+        inner_usage = {}
+        yield from self.secondary.generate_stream(messages, config, inner_usage)
+        if usage is not None:
+            usage.update(self._tag(inner_usage, self._secondary_identity))
+
+    # ── Async calls: hedged ───────────────────────────────────────────────────
+
+    async def agenerate(self, messages: list[dict], config: GenerateConfig | None = None) -> LLMResponse:
+        _count("calls")
+        primary, secondary = self._racers()
+        loop = asyncio.get_running_loop()
+
+        def launch(racer: _Racer) -> asyncio.Task:
+            racer.started_at = loop.time()
+            racer.task = asyncio.ensure_future(racer.llm.agenerate(messages, config))
+            return racer.task
+
+        by_task = {launch(primary): primary}
+        winner: _Racer | None = None
+        try:
+            done, _ = await asyncio.wait(by_task, timeout=self._hedge_delay(primary.key))
+            if not done:
+                _count("hedged")
+                by_task[launch(secondary)] = secondary
+            elif primary.task.exception() is not None:
+                logger.warning(
+                    "Primary LLM %s failed, failing over: %s", primary.identity, primary.task.exception()
+                )
+                _count("failovers")
+                by_task = {launch(secondary): secondary}
+
+            errors: list[BaseException] = []
+            pending = set(by_task)
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    racer = by_task[task]
+                    if task.exception() is not None:
+                        errors.append(task.exception())
+                        continue
+                    winner = racer
+                    self._tracker.record(racer.key, loop.time() - racer.started_at)
+                    if racer is secondary:
+                        _count("secondary_wins")
+                    response = task.result()
+                    return LLMResponse(text=response.text, usage=self._tag(response.usage, racer.identity))
+            _count("errors")
+            raise errors[-1]
+        finally:
+            for task, racer in by_task.items():
+                if winner is not None and racer is not winner and racer.lost_race():
+                    self._tracker.record(racer.key, loop.time() - racer.started_at)
+                if not task.done():
+                    await _cancel(task)
+
+    async def agenerate_stream(
+        self,
+        messages: list[dict],
+        config: GenerateConfig | None = None,
+        usage: dict | None = None,
+    ) -> AsyncGenerator[str, None]:
+        _count("calls")
+        primary, secondary = self._racers()
+        loop = asyncio.get_running_loop()
+
+        def launch(racer: _Racer) -> asyncio.Task:
+            racer.started_at = loop.time()
+            racer.stream = racer.llm.agenerate_stream(messages, config, racer.usage)
+            racer.task = asyncio.ensure_future(_first_chunk(racer.stream))
+            return racer.task
+
+        by_task = {launch(primary): primary}
+        winner: _Racer | None = None
+        has_chunk, first = False, ""
+        try:
+            stream_key = f"{primary.key}:stream"
+            done, _ = await asyncio.wait(by_task, timeout=self._hedge_delay(stream_key))
+            if not done:
+                _count("hedged")
+                by_task[launch(secondary)] = secondary
+            elif primary.task.exception() is not None:
+                logger.warning(
+                    "Primary LLM %s failed, failing over: %s", primary.identity, primary.task.exception()
+                )
+                _count("failovers")
+                by_task = {launch(secondary): secondary}
+
+            errors: list[BaseException] = []
+            pending = set(by_task)
+            while pending and winner is None:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        errors.append(task.exception())
+                        continue
+                    winner = by_task[task]
+                    has_chunk, first = task.result()
+                    break
+            if winner is None:
+                _count("errors")
+                raise errors[-1]
+        finally:
+            for task, racer in by_task.items():
+                if racer is winner:
+                    continue
+                if winner is not None and racer.lost_race():
+                    self._tracker.record(f"{racer.key}:stream", loop.time() - racer.started_at)
+                await _cancel(task, racer.stream)
+
+        self._tracker.record(f"{winner.key}:stream", loop.time() - winner.started_at)
+        if winner is secondary:
+            _count("secondary_wins")
+        try:
+            if has_chunk:
+                yield first
+                async for chunk in winner.stream:
+                    yield chunk
+        finally:
+            with contextlib.suppress(Exception):
+                await winner.stream.aclose()
+        if usage is not None:
+            usage.update(self._tag(winner.usage, winner.identity))
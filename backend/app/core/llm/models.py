@@ -0,0 +1,14 @@
+import time
+
+from sqlmodel import Field, SQLModel
+
+
+class LLMResponseCacheEntry(SQLModel, table=True):
+    __tablename__ = "llm_response_cache"
+
+    key: str = Field(primary_key=True)  # sha256 of provider, model, messages and config
+    provider: str
+    model: str
+    text: str
+    created_at: float = Field(default_factory=time.time)
+    expires_at: float = Field(index=True)
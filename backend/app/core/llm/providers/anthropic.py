@@ -1,17 +1,22 @@
-from collections.abc import Generator
+from collections.abc import AsyncGenerator, Generator
 
-from anthropic import Anthropic
+import anthropic
+from anthropic import Anthropic, AsyncAnthropic
 
 from app.core.llm.base import BaseLLM
 from app.core.llm.schemas import GenerateConfig, LLMResponse
+from app.core.llm.transport import http_timeout, shared_http_clients
 
 
 class AnthropicProvider(BaseLLM):
     def __init__(self, api_key: str, model: str):
-        self._client = Anthropic(api_key=api_key)
+        http_client, async_http_client = shared_http_clients("anthropic", api_key, anthropic)
+        timeout = http_timeout(anthropic)
+        self._client = Anthropic(api_key=api_key, timeout=timeout, http_client=http_client)
+        self._async_client = AsyncAnthropic(api_key=api_key, timeout=timeout, http_client=async_http_client)
         self._model = model
 
-    def _split_messages(self, messages: list[dict]) -> tuple[str | None, list[dict]]:
+    def _split_messages(self, messages: list[dict]) -> tuple[list[str], list[dict]]:
         system_parts: list[str] = []
         history: list[dict] = []
 
@@ -27,8 +32,18 @@ class AnthropicProvider(BaseLLM):
             else:
                 history.append({"role": "user", "content": str(content)})
 
-        system_text = "\n\n".join(system_parts) if system_parts else None
-        return system_text, history
+        return system_parts, history
+
+    @staticmethod
+    def _system_blocks(system_parts: list[str]) -> list[dict]:
+        """One text block per system message; the first (static) one is a cache breakpoint.
+
+        Later system messages carry per-conversation context and stay outside
+        the cached prefix.
+        """
+        blocks = [{"type": "text", "text": part} for part in system_parts]
+        blocks[0]["cache_control"] = {"type": "ephemeral"}
+        return blocks
 
     def _build_params(self, config: GenerateConfig) -> dict:
         params: dict = {
@@ -40,17 +55,32 @@ class AnthropicProvider(BaseLLM):
             params["stop_sequences"] = config.stop
         return params
 
-    def generate(self, messages: list[dict], config: GenerateConfig | None = None) -> LLMResponse:
-        config = config or GenerateConfig()
-        system_text, history = self._split_messages(messages)
-
-        response = self._client.messages.create(
-            model=self._model,
-            messages=history,
-            system=system_text,
-            **self._build_params(config),
-        )
+    def _request_params(self, messages: list[dict], config: GenerateConfig | None) -> dict:
+        system_parts, history = self._split_messages(messages)
+        params = {
+            "model": self._model,
+            "messages": history,
+            **self._build_params(config or GenerateConfig()),
+        }
+        if system_parts:
+            params["system"] = self._system_blocks(system_parts)
+        return params
 
+    @staticmethod
+    def _usage_dict(input_tokens: int, output_tokens: int, cache_read: int, cache_write: int) -> dict:
+        # Anthropic reports cache reads/writes separately from input_tokens;
+        # fold them in so prompt_tokens means the whole prompt, as for OpenAI.
+        prompt_tokens = input_tokens + cache_read + cache_write
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": output_tokens,
+            "total_tokens": prompt_tokens + output_tokens,
+            "cached_input_tokens": cache_read,
+            "cache_write_tokens": cache_write,
+        }
+
+    @staticmethod
+    def _to_response(response) -> LLMResponse:
         text_parts = []
         for block in response.content:
             if getattr(block, "text", None):
@@ -58,31 +88,81 @@ class AnthropicProvider(BaseLLM):
 
         usage = {}
         if getattr(response, "usage", None):
-            usage = {
-                "prompt_tokens": response.usage.input_tokens,
-                "completion_tokens": response.usage.output_tokens,
-                "total_tokens": response.usage.input_tokens + response.usage.output_tokens,
-            }
+            usage = AnthropicProvider._usage_dict(
+                response.usage.input_tokens or 0,
+                response.usage.output_tokens or 0,
+                getattr(response.usage, "cache_read_input_tokens", None) or 0,
+                getattr(response.usage, "cache_creation_input_tokens", None) or 0,
+            )
 
         return LLMResponse(text="".join(text_parts), usage=usage)
 
+    @staticmethod
+    def _stream_event_text(event, counts: dict[str, int]) -> str:
+        """Return the text delta of a stream event and track token counts in *counts*."""
+        if event.type == "message_start":
+            message_usage = getattr(event.message, "usage", None)
+            if message_usage is not None:
+                counts["input"] = message_usage.input_tokens or 0
+                counts["output"] = message_usage.output_tokens or 0
+                counts["cache_read"] = getattr(message_usage, "cache_read_input_tokens", None) or 0
+                counts["cache_write"] = getattr(message_usage, "cache_creation_input_tokens", None) or 0
+        elif event.type == "message_delta":
+            delta_usage = getattr(event, "usage", None)
+            if delta_usage is not None:
+                counts["output"] = delta_usage.output_tokens or counts["output"]
+        elif event.type == "content_block_delta":
+            return getattr(event.delta, "text", "") or ""
+        return ""
+
+    @staticmethod
+    def _fill_stream_usage(usage: dict | None, counts: dict[str, int]) -> None:
+        if usage is None or not (counts["input"] or counts["output"]):
+            return
+        usage.update(
+            AnthropicProvider._usage_dict(
+                counts["input"], counts["output"], counts["cache_read"], counts["cache_write"]
+            )
+        )
+
+    def generate(self, messages: list[dict], config: GenerateConfig | None = None) -> LLMResponse:
+        response = self._client.messages.create(**self._request_params(messages, config))
+        return self._to_response(response)
+
     def generate_stream(
         self,
         messages: list[dict],
         config: GenerateConfig | None = None,
+        usage: dict | None = None,
     ) -> Generator[str, None, None]:
-        config = config or GenerateConfig()
-        system_text, history = self._split_messages(messages)
-
         stream = self._client.messages.create(
-            model=self._model,
-            messages=history,
-            system=system_text,
+            **self._request_params(messages, config),
             stream=True,
-            **self._build_params(config),
         )
+        counts = {"input": 0, "output": 0, "cache_read": 0, "cache_write": 0}
         for event in stream:
-            if event.type == "content_block_delta":
-                text = getattr(event.delta, "text", "")
-                if text:
-                    yield text
+            text = self._stream_event_text(event, counts)
+            if text:
+                yield text
+        self._fill_stream_usage(usage, counts)
+
+    async def agenerate(self, messages: list[dict], config: GenerateConfig | None = None) -> LLMResponse:
+        response = await self._async_client.messages.create(**self._request_params(messages, config))
+        return self._to_response(response)
+
+    async def agenerate_stream(
+        self,
+        messages: list[dict],
+        config: GenerateConfig | None = None,
+        usage: dict | None = None,
+    ) -> AsyncGenerator[str, None]:
+        stream = await self._async_client.messages.create(
+            **self._request_params(messages, config),
+            stream=True,
+        )
+        counts = {"input": 0, "output": 0, "cache_read": 0, "cache_write": 0}
+        async for event in stream:
+            text = self._stream_event_text(event, counts)
+            if text:
+                yield text
+        self._fill_stream_usage(usage, counts)
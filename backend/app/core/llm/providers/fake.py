@@ -0,0 +1,177 @@
+"""Deterministic fake provider for offline load tests.
+
+Nothing leaves the process and nothing is billed. The model name picks a
+latency/length/error profile: one of ``FAKE_PRESETS`` or a spec such as
+``ttft_ms=400,token_ms=25,tokens=60,error_rate=0.02,sigma=0.4``; keys
+left out fall back to the ``LLM_FAKE_*`` settings.
+
+Time to first token and each inter-token delay are drawn from log-normal
+distributions with the given medians and ``sigma`` (0 = fixed delays).
+The random stream is seeded from ``LLM_FAKE_SEED`` and the request, so the
+same conversation produces the same text, timing and injected errors on
+every run.
+"""
+
+import asyncio
+import hashlib
+import json
+import math
+import random
+import time
+from collections.abc import AsyncGenerator, Generator
+from dataclasses import dataclass, replace
+
+from app.core.config import settings
+from app.core.llm.base import BaseLLM
+from app.core.llm.schemas import GenerateConfig, LLMResponse
+
+_WORDS = (
+    "kak", "kulit", "jerawat", "cocok", "pakai", "rutin", "lembut", "bersih", "minyak", "pori",
+    "aman", "bantu", "sabun", "scrub", "pagi", "malam", "hasil", "coba", "yuk", "ya",
+)
+
+
+class FakeProviderError(RuntimeError):
+    """Injected provider failure."""
+
+
+@dataclass(frozen=True)
+class FakeProfile:
+    ttft_ms: float
+    token_ms: float
+    tokens: int
+    error_rate: float
+    sigma: float
+
+
+def _default_profile() -> FakeProfile:
+    return FakeProfile(
+        ttft_ms=settings.LLM_FAKE_TTFT_MS,
+        token_ms=settings.LLM_FAKE_TOKEN_MS,
+        tokens=settings.LLM_FAKE_OUTPUT_TOKENS,
+        error_rate=settings.LLM_FAKE_ERROR_RATE,
+        sigma=settings.LLM_FAKE_LATENCY_SIGMA,
+    )
+
+
+FAKE_PRESETS: dict[str, dict[str, float]] = {
+    "default": {},
+    "instant": {"ttft_ms": 0, "token_ms": 0, "sigma": 0},
+    "fast": {"ttft_ms": 150, "token_ms": 8},
+    "slow": {"ttft_ms": 2500, "token_ms": 60},
+    "flaky": {"error_rate": 0.2},
+}
+
+
+def parse_profile(model: str) -> FakeProfile:
+    profile = _default_profile()
+    spec = str(model or "default").strip()
+    if spec in FAKE_PRESETS:
+        return replace(profile, **FAKE_PRESETS[spec])
+    overrides: dict[str, float] = {}
+    for part in spec.split(","):
+        key, sep, value = part.partition("=")
+        key = key.strip()
+        if not sep or key not in FakeProfile.__dataclass_fields__:
+            raise ValueError(f"Invalid fake model spec '{spec}'")
+        overrides[key] = int(value) if key == "tokens" else float(value)
+    return replace(profile, **overrides)
+
+
+class _Script:
+    """Text, delays and fate of one fake call, fixed by the request."""
+
+    def __init__(self, profile: FakeProfile, model: str, messages: list[dict], config: GenerateConfig):
+        raw = json.dumps(
+            [settings.LLM_FAKE_SEED, model, messages, config.model_dump()],
+            ensure_ascii=True,
+            sort_keys=True,
+            default=str,
+        )
+        rng = random.Random(hashlib.sha256(raw.encode("utf-8")).hexdigest())
+        tokens = profile.tokens
+        if config.max_tokens is not None:
+            tokens = min(tokens, config.max_tokens)
+        self.fail = rng.random() < profile.error_rate
+        self.ttft = self._delay(rng, profile.ttft_ms, profile.sigma)
+        self.chunks = [("" if i == 0 else " ") + rng.choice(_WORDS) for i in range(max(1, tokens))]
+        self.delays = [self._delay(rng, profile.token_ms, profile.sigma) for _ in self.chunks[1:]]
+        prompt = sum(len(str(m.get("content", ""))) for m in messages)
+        self.usage = {
+            "prompt_tokens": max(1, prompt // 4),
+            "completion_tokens": len(self.chunks),
+            "total_tokens": max(1, prompt // 4) + len(self.chunks),
+        }
+
+    @staticmethod
+    def _delay(rng: random.Random, median_ms: float, sigma: float) -> float:
+        if median_ms <= 0:
+            return 0.0
+        return median_ms / 1000.0 * (math.exp(rng.gauss(0.0, sigma)) if sigma > 0 else 1.0)
+
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+    @property
+    def total_delay(self) -> float:
+        return self.ttft + sum(self.delays)
+
+
+class FakeProvider(BaseLLM):
+    def __init__(self, api_key: str = "", model: str = "default"):
+        self._model = model
+        self._profile = parse_profile(model)
+
+    def _script(self, messages: list[dict], config: GenerateConfig | None) -> _Script:
+        return _Script(self._profile, self._model, messages, config or GenerateConfig())
+
+    def generate(self, messages: list[dict], config: GenerateConfig | None = None) -> LLMResponse:
+        script = self._script(messages, config)
+        time.sleep(script.ttft)
+        if script.fail:
+            raise FakeProviderError("fake provider: injected error")
+        time.sleep(sum(script.delays))
+        return LLMResponse(text=script.text, usage=dict(script.usage))
+
+    def generate_stream(
+        self,
+        messages: list[dict],
+        config: GenerateConfig | None = None,
+        usage: dict | None = None,
+    ) -> Generator[str, None, None]:
+        script = self._script(messages, config)
+        time.sleep(script.ttft)
+        if script.fail:
+            raise FakeProviderError("fake provider: injected error")
+        for index, chunk in enumerate(script.chunks):
+            if index:
+                time.sleep(script.delays[index - 1])
+            yield chunk
+        if usage is not None:
+            usage.update(script.usage)
+
+    async def agenerate(self, messages: list[dict], config: GenerateConfig | None = None) -> LLMResponse:
+        script = self._script(messages, config)
+        await asyncio.sleep(script.ttft)
+        if script.fail:
+            raise FakeProviderError("fake provider: injected error")
+        await asyncio.sleep(sum(script.delays))
+        return LLMResponse(text=script.text, usage=dict(script.usage))
+
+    async def agenerate_stream(
+        self,
+        messages: list[dict],
+        config: GenerateConfig | None = None,
+        usage: dict | None = None,
+    ) -> AsyncGenerator[str, None]:
+        script = self._script(messages, config)
+        await asyncio.sleep(script.ttft)
+        if script.fail:
+            raise FakeProviderError("fake provider: injected error")
+        for index, chunk in enumerate(script.chunks):
+            if index:
+                await asyncio.sleep(script.delays[index - 1])
+            yield chunk
+        if usage is not None:
+            usage.update(script.usage)
@@ -1,4 +1,6 @@
-from collections.abc import Generator
+import hashlib
+from collections import OrderedDict
+from collections.abc import AsyncGenerator, Generator
 
 import google.generativeai as genai
 
@@ -7,27 +9,86 @@ from app.core.llm.schemas import GenerateConfig, LLMResponse
 
 
 class GoogleProvider(BaseLLM):
+    # GenerativeModel objects kept per provider instance, keyed by the static system prompt.
+    _MAX_CACHED_MODELS = 64
+
     def __init__(self, api_key: str, model: str):
         genai.configure(api_key=api_key)
         self._model = model
+        self._models: OrderedDict[str, genai.GenerativeModel] = OrderedDict()
+
+    def _get_model(self, system_instruction: str | None) -> genai.GenerativeModel:
+        key = hashlib.sha256((system_instruction or "").encode("utf-8")).hexdigest()
+        model = self._models.get(key)
+        if model is not None:
+            self._models.move_to_end(key)
+            return model
+        model = genai.GenerativeModel(self._model, system_instruction=system_instruction)
+        self._models[key] = model
+        if len(self._models) > self._MAX_CACHED_MODELS:
+            self._models.popitem(last=False)
+        return model
+
+    @staticmethod
+    def _usage_dict(usage_metadata) -> dict:
+        if usage_metadata is None:
+            return {}
+        prompt_tokens = getattr(usage_metadata, "prompt_token_count", 0) or 0
+        completion_tokens = getattr(usage_metadata, "candidates_token_count", 0) or 0
+        if not (prompt_tokens or completion_tokens):
+            return {}
+        return {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": getattr(usage_metadata, "total_token_count", 0) or prompt_tokens + completion_tokens,
+            "cached_input_tokens": getattr(usage_metadata, "cached_content_token_count", 0) or 0,
+        }
+
+    @staticmethod
+    def _response_text(response) -> str:
+        # ``.text`` raises ValueError on chunks without text parts (e.g. the final usage chunk).
+        try:
+            return response.text or ""
+        except (AttributeError, ValueError):
+            return ""
+
+    def _stream_chunk_text(self, chunk, usage: dict | None) -> str:
+        if usage is not None:
+            chunk_usage = self._usage_dict(getattr(chunk, "usage_metadata", None))
+            if chunk_usage:
+                # Counts are cumulative; the last chunk carries the final totals.
+                usage.update(chunk_usage)
+        return self._response_text(chunk)
 
     def _split_messages(self, messages: list[dict]) -> tuple[str | None, list[dict]]:
-        system_parts: list[str] = []
+        # Only the first system message becomes the (cached) system instruction;
+        # later ones, e.g. the per-conversation memory summary, are sent as content
+        # so they do not mint a new GenerativeModel for every conversation.
+        system_instruction: str | None = None
+        context_parts: list[str] = []
         history: list[dict] = []
 
         for message in messages:
             role = message.get("role")
             content = message.get("content", "")
             if role == "system":
-                if content:
-                    system_parts.append(str(content))
+                if not content:
+                    continue
+                if system_instruction is None:
+                    system_instruction = str(content)
+                else:
+                    context_parts.append(str(content))
                 continue
             if role == "assistant":
                 history.append({"role": "model", "parts": [str(content)]})
             else:
                 history.append({"role": "user", "parts": [str(content)]})
 
-        system_instruction = "\n\n".join(system_parts) if system_parts else None
+        if context_parts:
+            if history and history[0]["role"] == "user":
+                history[0]["parts"] = context_parts + history[0]["parts"]
+            else:
+                history.insert(0, {"role": "user", "parts": context_parts})
         return system_instruction, history
 
     def _build_config(self, config: GenerateConfig) -> genai.types.GenerationConfig:
@@ -44,28 +105,63 @@ class GoogleProvider(BaseLLM):
     def generate(self, messages: list[dict], config: GenerateConfig | None = None) -> LLMResponse:
         config = config or GenerateConfig()
         system_instruction, history = self._split_messages(messages)
-        model = genai.GenerativeModel(self._model, system_instruction=system_instruction)
+        model = self._get_model(system_instruction)
         response = model.generate_content(
             history or "",
             generation_config=self._build_config(config),
         )
-        text = getattr(response, "text", "") or ""
-        return LLMResponse(text=text, usage={})
+        return LLMResponse(
+            text=self._response_text(response),
+            usage=self._usage_dict(getattr(response, "usage_metadata", None)),
+        )
 
     def generate_stream(
         self,
         messages: list[dict],
         config: GenerateConfig | None = None,
+        usage: dict | None = None,
     ) -> Generator[str, None, None]:
         config = config or GenerateConfig()
         system_instruction, history = self._split_messages(messages)
-        model = genai.GenerativeModel(self._model, system_instruction=system_instruction)
+        model = self._get_model(system_instruction)
         stream = model.generate_content(
             history or "",
             generation_config=self._build_config(config),
             stream=True,
         )
         for chunk in stream:
-            text = getattr(chunk, "text", "")
+            text = self._stream_chunk_text(chunk, usage)
+            if text:
+                yield text
+
+    async def agenerate(self, messages: list[dict], config: GenerateConfig | None = None) -> LLMResponse:
+        config = config or GenerateConfig()
+        system_instruction, history = self._split_messages(messages)
+        model = self._get_model(system_instruction)
+        response = await model.generate_content_async(
+            history or "",
+            generation_config=self._build_config(config),
+        )
+        return LLMResponse(
+            text=self._response_text(response),
+            usage=self._usage_dict(getattr(response, "usage_metadata", None)),
+        )
+
+    async def agenerate_stream(
+        self,
+        messages: list[dict],
+        config: GenerateConfig | None = None,
+        usage: dict | None = None,
+    ) -> AsyncGenerator[str, None]:
+        config = config or GenerateConfig()
+        system_instruction, history = self._split_messages(messages)
+        model = self._get_model(system_instruction)
+        stream = await model.generate_content_async(
+            history or "",
+            generation_config=self._build_config(config),
+            stream=True,
+        )
+        async for chunk in stream:
+            text = self._stream_chunk_text(chunk, usage)
             if text:
                 yield text
@@ -1,12 +1,18 @@
-from collections.abc import Generator
+import hashlib
+from collections.abc import AsyncGenerator, Generator
 
-from openai import OpenAI
+import openai
+from openai import AsyncOpenAI, OpenAI
 
 from app.core.llm.base import BaseLLM
 from app.core.llm.schemas import GenerateConfig, LLMResponse
+from app.core.llm.transport import http_timeout, shared_http_clients
 
 
 class OpenAICompatibleProvider(BaseLLM):
+    # Pool name for the shared HTTP transport; subclasses on other hosts override it.
+    transport_name = "openai"
+
     def __init__(
         self,
         api_key: str,
@@ -14,14 +20,16 @@ class OpenAICompatibleProvider(BaseLLM):
         base_url: str | None = None,
         default_headers: dict | None = None,
     ):
+        client_kwargs: dict = {
+            "api_key": api_key,
+            "default_headers": default_headers or None,
+            "timeout": http_timeout(openai),
+        }
         if base_url:
-            self._client = OpenAI(
-                api_key=api_key,
-                base_url=base_url,
-                default_headers=default_headers or None,
-            )
-        else:
-            self._client = OpenAI(api_key=api_key, default_headers=default_headers or None)
+            client_kwargs["base_url"] = base_url
+        http_client, async_http_client = shared_http_clients(self.transport_name, api_key, openai)
+        self._client = OpenAI(**client_kwargs, http_client=http_client)
+        self._async_client = AsyncOpenAI(**client_kwargs, http_client=async_http_client)
         self._model = model
 
     def _build_params(self, messages: list[dict], config: GenerateConfig) -> dict:
@@ -39,32 +47,91 @@ class OpenAICompatibleProvider(BaseLLM):
                 params["max_tokens"] = config.max_tokens
         if config.stop is not None:
             params["stop"] = config.stop
+        cache_key = self._prompt_cache_key(messages)
+        if cache_key:
+            params["prompt_cache_key"] = cache_key
         return params
 
+    @staticmethod
+    def _prompt_cache_key(messages: list[dict]) -> str | None:
+        """Route requests sharing the leading system prompt to the same prefix cache."""
+        if not messages or messages[0].get("role") != "system":
+            return None
+        content = str(messages[0].get("content") or "")
+        return "sys-" + hashlib.sha256(content.encode("utf-8")).hexdigest()[:24]
+
+    @staticmethod
+    def _usage_dict(usage) -> dict:
+        details = getattr(usage, "prompt_tokens_details", None)
+        return {
+            "prompt_tokens": usage.prompt_tokens,
+            "completion_tokens": usage.completion_tokens,
+            "total_tokens": usage.total_tokens,
+            "cached_input_tokens": (getattr(details, "cached_tokens", None) or 0) if details else 0,
+        }
+
+    def _to_response(self, response) -> LLMResponse:
+        return LLMResponse(
+            text=response.choices[0].message.content,
+            usage=self._usage_dict(response.usage),
+        )
+
+    def _chunk_delta(self, chunk, usage: dict | None) -> str | None:
+        if usage is not None and getattr(chunk, "usage", None):
+            usage.update(self._usage_dict(chunk.usage))
+        if not chunk.choices:
+            return None
+        return chunk.choices[0].delta.content
+
     def generate(self, messages: list[dict], config: GenerateConfig | None = None) -> LLMResponse:
         config = config or GenerateConfig()
 
         response = self._client.chat.completions.create(
             **self._build_params(messages, config),
         )
-        return LLMResponse(
-            text=response.choices[0].message.content,
-            usage={
-                "prompt_tokens": response.usage.prompt_tokens,
-                "completion_tokens": response.usage.completion_tokens,
-                "total_tokens": response.usage.total_tokens,
-            },
-        )
+        return self._to_response(response)
 
-    def generate_stream(self, messages: list[dict], config: GenerateConfig | None = None) -> Generator[str, None, None]:
+    def generate_stream(
+        self,
+        messages: list[dict],
+        config: GenerateConfig | None = None,
+        usage: dict | None = None,
+    ) -> Generator[str, None, None]:
         config = config or GenerateConfig()
 
         stream = self._client.chat.completions.create(
             **self._build_params(messages, config),
             stream=True,
+            stream_options={"include_usage": True},
         )
         for chunk in stream:
-            delta = chunk.choices[0].delta.content
+            delta = self._chunk_delta(chunk, usage)
+            if delta:
+                yield delta
+
+    async def agenerate(self, messages: list[dict], config: GenerateConfig | None = None) -> LLMResponse:
+        config = config or GenerateConfig()
+
+        response = await self._async_client.chat.completions.create(
+            **self._build_params(messages, config),
+        )
+        return self._to_response(response)
+
+    async def agenerate_stream(
+        self,
+        messages: list[dict],
+        config: GenerateConfig | None = None,
+        usage: dict | None = None,
+    ) -> AsyncGenerator[str, None]:
+        config = config or GenerateConfig()
+
+        stream = await self._async_client.chat.completions.create(
+            **self._build_params(messages, config),
+            stream=True,
+            stream_options={"include_usage": True},
+        )
+        async for chunk in stream:
+            delta = self._chunk_delta(chunk, usage)
             if delta:
                 yield delta
 
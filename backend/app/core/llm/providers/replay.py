@@ -0,0 +1,188 @@
+"""Record/replay provider for reproducible offline benchmarks.
+
+The model name is the real ``provider:model`` to stand in for. With
+``LLM_REPLAY_MODE=record`` calls go to that provider and every response is
+appended to ``LLM_REPLAY_DIR/<provider>__<model>.jsonl`` together with its
+timing (chunk offsets for streams, total latency otherwise). With
+``LLM_REPLAY_MODE=replay`` (the default) the transcript is served back with
+the original timing and no network access; a request that was never
+recorded raises ``ReplayMissError``.
+
+Requests are matched by a hash of model, messages and ``GenerateConfig``,
+so a benchmark replays exactly when it sends the same conversations.
+"""
+
+import asyncio
+import hashlib
+import json
+import threading
+import time
+from collections.abc import AsyncGenerator, Generator
+from pathlib import Path
+
+from app.core.config import settings
+from app.core.llm.base import BaseLLM
+from app.core.llm.schemas import GenerateConfig, LLMResponse
+
+
+class ReplayMissError(LookupError):
+    """No recorded transcript matches the request."""
+
+
+def transcript_key(model: str, messages: list[dict], config: GenerateConfig) -> str:
+    raw = json.dumps(
+        {
+            "model": model,
+            "messages": [{"role": m.get("role"), "content": m.get("content")} for m in messages],
+            "config": config.model_dump(),
+        },
+        ensure_ascii=True,
+        sort_keys=True,
+    )
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _Recording:
+    """Chunks with their offsets from the start of the call."""
+
+    def __init__(self, record: dict):
+        self.chunks: list[str] = record.get("chunks") or [record.get("text", "")]
+        self.offsets: list[float] = record.get("offsets") or [float(record.get("latency", 0.0))]
+        self.usage: dict = record.get("usage") or {}
+
+    @property
+    def text(self) -> str:
+        return "".join(self.chunks)
+
+    def gaps(self) -> list[float]:
+        previous = 0.0
+        gaps = []
+        for offset in self.offsets:
+            gaps.append(max(0.0, offset - previous))
+            previous = offset
+        return gaps
+
+
+class ReplayProvider(BaseLLM):
+    def __init__(self, api_key: str = "", model: str = ""):
+        target_provider, sep, target_model = str(model).partition(":")
+        if not sep or not target_model:
+            raise ValueError(f"Replay model must be 'provider:model', got '{model}'")
+        self._target = (target_provider, target_model)
+        self._model = model
+        self._mode = settings.LLM_REPLAY_MODE.strip().lower()
+        safe_name = f"{target_provider}__{target_model}".replace("/", "_")
+        self._path = Path(settings.LLM_REPLAY_DIR) / f"{safe_name}.jsonl"
+        self._lock = threading.Lock()
+        self._records: dict[str, dict] = {}
+        if self._path.exists():
+            for line in self._path.read_text(encoding="utf-8").splitlines():
+                if line.strip():
+                    record = json.loads(line)
+                    self._records[record["key"]] = record
+        self._inner: BaseLLM | None = None
+
+    # ── Recording ──────────────────────────────────────────────────────────────
+
+    def _real(self) -> BaseLLM:
+        if self._inner is None:
+            from app.core.llm.service import _provider_instance, _resolve_api_key
+
+            provider, model = self._target
+            self._inner = _provider_instance(provider, model, _resolve_api_key(provider), use_cache=True)
+        return self._inner
+
+    def _save(self, key: str, record: dict) -> None:
+        record = {"key": key, **record}
+        with self._lock:
+            self._records[key] = record
+            self._path.parent.mkdir(parents=True, exist_ok=True)
+            with self._path.open("a", encoding="utf-8") as handle:
+                handle.write(json.dumps(record, ensure_ascii=False) + "\n")
+
+    @property
+    def recording(self) -> bool:
+        return self._mode == "record"
+
+    # ── Replay ─────────────────────────────────────────────────────────────────
+
+    def _lookup(self, key: str) -> _Recording:
+        record = self._records.get(key)
+        if record is None:
+            raise ReplayMissError(f"No recorded transcript for request {key[:12]} in {self._path}")
+        return _Recording(record)
+
+    def _key(self, messages: list[dict], config: GenerateConfig | None) -> str:
+        return transcript_key(self._model, messages, config or GenerateConfig())
+
+    def generate(self, messages: list[dict], config: GenerateConfig | None = None) -> LLMResponse:
+        key = self._key(messages, config)
+        if self.recording:
+            started = time.monotonic()
+            response = self._real().generate(messages, config)
+            self._save(key, {"text": response.text, "latency": time.monotonic() - started, "usage": response.usage})
+            return response
+        recording = self._lookup(key)
+        time.sleep(sum(recording.gaps()))
+        return LLMResponse(text=recording.text, usage=dict(recording.usage))
+
+    def generate_stream(
+        self,
+        messages: list[dict],
+        config: GenerateConfig | None = None,
+        usage: dict | None = None,
+    ) -> Generator[str, None, None]:
+        key = self._key(messages, config)
+        if self.recording:
+            started = time.monotonic()
+            chunks, offsets, inner_usage = [], [], {}
+            for chunk in self._real().generate_stream(messages, config, inner_usage):
+                chunks.append(chunk)
+                offsets.append(time.monotonic() - started)
+                yield chunk
+            self._save(key, {"chunks": chunks, "offsets": offsets, "usage": inner_usage})
+            if usage is not None:
+                usage.update(inner_usage)
+            return
+        recording = self._lookup(key)
+        for chunk, gap in zip(recording.chunks, recording.gaps()):
+            time.sleep(gap)
+            yield chunk
+        if usage is not None:
+            usage.update(recording.usage)
+
+    async def agenerate(self, messages: list[dict], config: GenerateConfig | None = None) -> LLMResponse:
+        key = self._key(messages, config)
+        if self.recording:
+            started = time.monotonic()
+            response = await self._real().agenerate(messages, config)
+            self._save(key, {"text": response.text, "latency": time.monotonic() - started, "usage": response.usage})
+            return response
+        recording = self._lookup(key)
+        await asyncio.sleep(sum(recording.gaps()))
+        return LLMResponse(text=recording.text, usage=dict(recording.usage))
+
+    async def agenerate_stream(
+        self,
+        messages: list[dict],
+        config: GenerateConfig | None = None,
+        usage: dict | None = None,
+    ) -> AsyncGenerator[str, None]:
+        key = self._key(messages, config)
+        if self.recording:
+            started = time.monotonic()
+            chunks, offsets, inner_usage = [], [], {}
+            async for chunk in self._real().agenerate_stream(messages, config, inner_usage):
+                chunks.append(chunk)
+                offsets.append(time.monotonic() - started)
+                yield chunk
+            self._save(key, {"chunks": chunks, "offsets": offsets, "usage": inner_usage})
+            if usage is not None:
+                usage.update(inner_usage)
+            return
+        recording = self._lookup(key)
+        for chunk, gap in zip(recording.chunks, recording.gaps()):
+            await asyncio.sleep(gap)
+            yield chunk
+        if usage is not None:
+            usage.update(recording.usage)
@@ -1,13 +1,12 @@
-from openai import OpenAI
+from app.core.llm.providers.openai import OpenAICompatibleProvider
+from app.core.llm.schemas import GenerateConfig
 
-from app.core.llm.base import BaseLLM
-from app.core.llm.schemas import GenerateConfig, LLMResponse
 
+class XaiProvider(OpenAICompatibleProvider):
+    transport_name = "xai"
 
-class XaiProvider(BaseLLM):
     def __init__(self, api_key: str, model: str):
-        self._client = OpenAI(api_key=api_key, base_url="https://api.x.ai/v1")
-        self._model = model
+        super().__init__(api_key=api_key, model=model, base_url="https://api.x.ai/v1")
 
     def _build_params(self, messages: list[dict], config: GenerateConfig) -> dict:
         params = {
@@ -21,30 +20,3 @@ class XaiProvider(BaseLLM):
         if config.stop is not None:
             params["stop"] = config.stop
         return params
-
-    def generate(self, messages: list[dict], config: GenerateConfig | None = None) -> LLMResponse:
-        config = config or GenerateConfig()
-
-        response = self._client.chat.completions.create(
-            **self._build_params(messages, config),
-        )
-        return LLMResponse(
-            text=response.choices[0].message.content,
-            usage={
-                "prompt_tokens": response.usage.prompt_tokens,
-                "completion_tokens": response.usage.completion_tokens,
-                "total_tokens": response.usage.total_tokens,
-            },
-        )
-
-    def generate_stream(self, messages: list[dict], config: GenerateConfig | None = None):
-        config = config or GenerateConfig()
-
-        stream = self._client.chat.completions.create(
-            **self._build_params(messages, config),
-            stream=True,
-        )
-        for chunk in stream:
-            delta = chunk.choices[0].delta.content
-            if delta:
-                yield delta
@@ -0,0 +1,282 @@
+"""Client-side, priority-aware rate limiting of LLM calls.
+
+Each provider/model with a configured budget gets one ``RateLimiter`` that
+holds two token buckets: requests per minute and tokens per minute. A call
+reserves one request plus its estimated tokens (prompt + ``max_tokens``)
+before it is sent; the estimate is corrected from reported usage after.
+Buckets hold one minute of budget, so short bursts pass straight through.
+
+When a bucket is empty, callers queue by priority class and FIFO within a
+class, so under pressure the customer-facing planner reply goes first,
+the WhatsApp polisher next, and background memory summaries last.
+
+Budgets come from ``LLM_RATE_LIMITS`` (``{"provider:model": {"rpm": ..,
+"tpm": ..}}``, a bare ``"provider"`` key applies to all its models) with
+``LLM_RATE_LIMIT_RPM``/``LLM_RATE_LIMIT_TPM`` as the default; 0 disables
+that bucket.
+"""
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from collections.abc import AsyncGenerator, Generator
+
+from app.core.config import settings
+from app.core.llm.base import BaseLLM
+from app.core.llm.schemas import GenerateConfig, LLMResponse
+from app.core.llm.tokens import count_tokens
+
+PRIORITY_REPLY = 0
+PRIORITY_POLISH = 1
+PRIORITY_BACKGROUND = 2
+
+PRIORITY_NAMES = {PRIORITY_REPLY: "reply", PRIORITY_POLISH: "polish", PRIORITY_BACKGROUND: "background"}
+
+GROUP_PRIORITIES = {
+    "llm_planner": PRIORITY_REPLY,
+    "llm_whatsapp": PRIORITY_POLISH,
+    "llm_memory": PRIORITY_BACKGROUND,
+}
+
+
+class TokenBucket:
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = self.capacity / 60.0
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def delay_for(self, amount: float) -> float:
+        """Seconds until *amount* is available (0 if it is now)."""
+        self._refill()
+        amount = min(amount, self.capacity)
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float) -> None:
+        # May go negative when usage is corrected upward; refills pay it back.
+        self.level -= amount
+
+
+class _Waiter:
+    __slots__ = ("priority", "seq", "event")
+
+    def __init__(self, priority: int, seq: int):
+        self.priority = priority
+        self.seq = seq
+        self.event = asyncio.Event()
+
+    def __lt__(self, other: "_Waiter") -> bool:
+        return (self.priority, self.seq) < (other.priority, other.seq)
+
+
+class RateLimiter:
+    def __init__(self, name: str, rpm: int = 0, tpm: int = 0):
+        self.name = name
+        self._requests = TokenBucket(rpm) if rpm > 0 else None
+        self._tokens = TokenBucket(tpm) if tpm > 0 else None
+        self._queue: list[_Waiter] = []
+        self._seq = itertools.count()
+        self._lock = threading.Lock()
+        self._waits = {
+            name: {"granted": 0, "queued": 0, "wait_seconds_total": 0.0, "wait_seconds_max": 0.0}
+            for name in PRIORITY_NAMES.values()
+        }
+
+    def _delay(self, tokens: int) -> float:
+        delay = 0.0
+        if self._requests is not None:
+            delay = max(delay, self._requests.delay_for(1))
+        if self._tokens is not None:
+            delay = max(delay, self._tokens.delay_for(tokens))
+        return delay
+
+    def _take(self, tokens: int) -> None:
+        if self._requests is not None:
+            self._requests.take(1)
+        if self._tokens is not None:
+            self._tokens.take(tokens)
+
+    def _wake_head(self) -> None:
+        if self._queue:
+            self._queue[0].event.set()
+
+    async def acquire(self, tokens: int, priority: int = PRIORITY_BACKGROUND) -> float:
+        """Wait for budget for one request of *tokens*; returns seconds waited."""
+        started = time.monotonic()
+        stats = self._waits[PRIORITY_NAMES.get(priority, "background")]
+        with self._lock:
+            if not self._queue and self._delay(tokens) <= 0:
+                self._take(tokens)
+                stats["granted"] += 1
+                return 0.0
+            waiter = _Waiter(priority, next(self._seq))
+            heapq.heappush(self._queue, waiter)
+            stats["queued"] += 1
+            self._wake_head()
+        try:
+            while True:
+                delay = None
+                with self._lock:
+                    if self._queue[0] is waiter:
+                        delay = self._delay(tokens)
+                        if delay <= 0:
+                            self._take(tokens)
+                            break
+                waiter.event.clear()
+                try:
+                    await asyncio.wait_for(waiter.event.wait(), timeout=delay)
+                except asyncio.TimeoutError:
+                    pass
+        finally:
+            with self._lock:
+                self._queue.remove(waiter)
+                heapq.heapify(self._queue)
+                self._wake_head()
+        waited = time.monotonic() - started
+        with self._lock:
+            stats["granted"] += 1
+            stats["wait_seconds_total"] += waited
+            stats["wait_seconds_max"] = max(stats["wait_seconds_max"], waited)
+        return waited
+
+    def settle(self, reserved_tokens: int, actual_tokens: int) -> None:
+        """Correct the token bucket once the provider reports real usage."""
+        if self._tokens is None or actual_tokens <= 0:
+            return
+        with self._lock:
+            self._tokens.take(actual_tokens - reserved_tokens)
+
+    def refund(self, reserved_tokens: int) -> None:
+        """Return the token reservation of a call that failed before reporting usage."""
+        if self._tokens is None or reserved_tokens <= 0:
+            return
+        with self._lock:
+            self._tokens.level = min(self._tokens.capacity, self._tokens.level + reserved_tokens)
+            self._wake_head()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "name": self.name,
+                "queued_now": len(self._queue),
+                "requests_available": round(self._requests.level, 2) if self._requests else None,
+                "tokens_available": round(self._tokens.level, 2) if self._tokens else None,
+                "by_priority": {
+                    name: {
+                        **waits,
+                        "wait_seconds_avg": (
+                            round(waits["wait_seconds_total"] / waits["queued"], 4) if waits["queued"] else 0.0
+                        ),
+                    }
+                    for name, waits in self._waits.items()
+                },
+            }
+
+
+_limiters_lock = threading.Lock()
+_limiters: dict[tuple[str, str], RateLimiter | None] = {}
+
+
+def _budget(provider: str, model: str) -> tuple[int, int]:
+    limits = settings.LLM_RATE_LIMITS or {}
+    entry = limits.get(f"{provider}:{model}") or limits.get(provider) or {}
+    rpm = int(entry.get("rpm", settings.LLM_RATE_LIMIT_RPM) or 0)
+    tpm = int(entry.get("tpm", settings.LLM_RATE_LIMIT_TPM) or 0)
+    return rpm, tpm
+
+
+def limiter_for(provider: str, model: str) -> RateLimiter | None:
+    """Shared limiter for *provider*/*model*, or None when it has no budget."""
+    key = (provider, model)
+    with _limiters_lock:
+        if key not in _limiters:
+            rpm, tpm = _budget(provider, model)
+            _limiters[key] = RateLimiter(f"{provider}:{model}", rpm, tpm) if rpm or tpm else None
+        return _limiters[key]
+
+
+def rate_limit_stats() -> list[dict]:
+    with _limiters_lock:
+        limiters = [limiter for limiter in _limiters.values() if limiter is not None]
+    return [limiter.stats() for limiter in limiters]
+
+
+def estimate_tokens(messages: list[dict], config: GenerateConfig | None) -> int:
+    prompt = sum(count_tokens(str(m.get("content", ""))) for m in messages)
+    return prompt + int((config.max_tokens if config else None) or 0)
+
+
+def _usage_total(usage: dict | None) -> int:
+    usage = usage or {}
+    total = usage.get("total_tokens")
+    if total:
+        return int(total)
+    return int(usage.get("prompt_tokens") or 0) + int(usage.get("completion_tokens") or 0)
+
+
+class RateLimitedLLM(BaseLLM):
+    """Queue async calls on the provider/model limiter at *priority*.
+
+    Blocking calls are not queued (they cannot wait without blocking the
+    thread) but their usage is still charged to the buckets.
+    """
+
+    def __init__(self, inner: BaseLLM, limiter: RateLimiter, priority: int = PRIORITY_BACKGROUND):
+        self.inner = inner
+        self.limiter = limiter
+        self.priority = priority
+
+    def generate(self, messages: list[dict], config: GenerateConfig | None = None) -> LLMResponse:
+        response = self.inner.generate(messages, config)
+        self.limiter.settle(0, _usage_total(response.usage))
+        return response
+
+    def generate_stream(
+        self,
+        messages: list[dict],
+        config: GenerateConfig | None = None,
+        usage: dict | None = None,
+    ) -> Generator[str, None, None]:
+        return self.inner.generate_stream(messages, config, usage)
+
+    async def agenerate(self, messages: list[dict], config: GenerateConfig | None = None) -> LLMResponse:
+        reserved = estimate_tokens(messages, config)
+        await self.limiter.acquire(reserved, self.priority)
+        try:
+            response = await self.inner.agenerate(messages, config)
+        except Exception:
+            # Cancellation (e.g. a losing hedge) is not refunded: the request was sent.
+            self.limiter.refund(reserved)
+            raise
+        self.limiter.settle(reserved, _usage_total(response.usage))
+        return response
+
+    async def agenerate_stream(
+        self,
+        messages: list[dict],
+        config: GenerateConfig | None = None,
+        usage: dict | None = None,
+    ) -> AsyncGenerator[str, None]:
+        reserved = estimate_tokens(messages, config)
+        await self.limiter.acquire(reserved, self.priority)
+        inner_usage = usage if usage is not None else {}
+        try:
+            async for chunk in self.inner.agenerate_stream(messages, config, inner_usage):
+                yield chunk
+        except Exception:
+            used = _usage_total(inner_usage)
+            if used:
+                self.limiter.settle(reserved, used)
+            else:
+                self.limiter.refund(reserved)
+            raise
+        self.limiter.settle(reserved, _usage_total(inner_usage))
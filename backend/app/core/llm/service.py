@@ -1,9 +1,11 @@
+import logging
 from importlib import import_module
 from typing import Dict, Tuple
 
 from app.core.config import settings
 from app.core.llm.base import BaseLLM
 
+logger = logging.getLogger(__name__)
 
 PROVIDER_ALIASES = {
     "grok": "xai",
@@ -15,8 +17,14 @@ LLM_REGISTRY = {
     "xai": ("app.core.llm.providers.xai", "XaiProvider"),
     "google": ("app.core.llm.providers.google", "GoogleProvider"),
     "anthropic": ("app.core.llm.providers.anthropic", "AnthropicProvider"),
+    # Offline providers for load tests (no API key, nothing billed upstream);
+    # only offered and constructed with LLM_LOAD_TEST_MODE (see LOAD_TEST_PROVIDERS).
+    "fake": ("app.core.llm.providers.fake", "FakeProvider"),
+    "replay": ("app.core.llm.providers.replay", "ReplayProvider"),
 }
 
+LOAD_TEST_PROVIDERS = {"fake", "replay"}
+
 PROVIDER_CONFIG: Dict[str, dict[str, str]] = {
     "openai": {
         "api_key_attr": "OPENAI_API_KEY",
@@ -30,6 +38,12 @@ PROVIDER_CONFIG: Dict[str, dict[str, str]] = {
     "anthropic": {
         "api_key_attr": "ANTHROPIC_API_KEY",
     },
+    "fake": {
+        "api_key_attr": "",
+    },
+    "replay": {
+        "api_key_attr": "",
+    },
 }
 
 LLM_MODEL_REGISTRY: Dict[str, list[str]] = {
@@ -110,17 +124,25 @@ LLM_MODEL_REGISTRY: Dict[str, list[str]] = {
         "claude-3-5-sonnet-latest",
         "claude-3-5-haiku-latest",
     ],
+    # Presets; any "ttft_ms=..,token_ms=..,tokens=..,error_rate=..,sigma=.." spec also works.
+    "fake": ["default", "instant", "fast", "slow", "flaky"],
+    # "<provider>:<model>" of the recorded transcript.
+    "replay": ["openai:gpt-5-mini", "anthropic:claude-sonnet-4-20250514", "google:gemini-2.5-flash"],
 }
 
 
+def _provider_enabled(provider: str) -> bool:
+    return provider not in LOAD_TEST_PROVIDERS or settings.LLM_LOAD_TEST_MODE
+
+
 def list_llm_options() -> dict[str, object]:
-    providers = list(LLM_REGISTRY.keys())
+    providers = [provider for provider in LLM_REGISTRY if _provider_enabled(provider)]
     models = {provider: LLM_MODEL_REGISTRY.get(provider, []) for provider in providers}
     return {"providers": providers, "models": models}
 
 
-# cache instance per (provider, model)
-_instances: Dict[Tuple[str, str], BaseLLM] = {}
+# Keyed by provider, model and breaker call class (see breaker.call_class).
+_instances: Dict[Tuple[str, str, str], BaseLLM] = {}
 
 
 def _load_provider_class(provider: str):
@@ -173,28 +195,86 @@ def _resolve_api_key(provider: str) -> str:
     return ""
 
 
+def _group_config(config_group: str, key: str) -> str:
+    try:
+        from app.modules.admin.service import resolve_config
 
+        return str(resolve_config(config_group, key) or "").strip()
+    except Exception:
+        return ""
 
-def create_llm(
-    provider: str | None = None,
-    model: str | None = None,
-    api_key: str | None = None,
-    config_group: str = "llm",
-    use_cache: bool = True,
-) -> BaseLLM:
 
-    provider = provider or _resolve(config_group, "provider", "CHATBOT_DEFAULT_LLM")
-    provider = PROVIDER_ALIASES.get(provider, provider)
-    model = model or _resolve(config_group, "model", "CHATBOT_DEFAULT_MODEL")
-    api_key = api_key or _resolve_api_key(provider)
+def _response_cache_enabled(config_group: str) -> bool:
+    return _group_config(config_group, "response_cache").lower() in {"1", "true", "yes", "on"}
+
+
+def _with_hedging(instance: BaseLLM, provider: str, model: str, config_group: str, use_cache: bool) -> BaseLLM:
+    """Race *instance* against ``<group>.hedge_provider``/``hedge_model`` when configured."""
+    hedge_provider = _group_config(config_group, "hedge_provider")
+    if not hedge_provider:
+        return instance
+    hedge_provider = PROVIDER_ALIASES.get(hedge_provider, hedge_provider)
+    hedge_model = _group_config(config_group, "hedge_model") or model
+    if (hedge_provider, hedge_model) == (provider, model):
+        return instance
+    try:
+        secondary = _rate_limited(
+            _provider_instance(hedge_provider, hedge_model, _resolve_api_key(hedge_provider), use_cache, config_group),
+            hedge_provider,
+            hedge_model,
+            config_group,
+        )
+    except (ValueError, ImportError) as exc:
+        logger.warning("Hedging disabled for %s: %s", config_group, exc)
+        return instance
+    try:
+        max_delay = int(_group_config(config_group, "hedge_after_ms") or 3000) / 1000.0
+    except ValueError:
+        max_delay = 3.0
+    from app.core.llm.hedging import HedgedLLM
+
+    return HedgedLLM(
+        instance,
+        secondary,
+        primary_identity=(provider, model),
+        secondary_identity=(hedge_provider, hedge_model),
+        max_delay=max_delay,
+    )
+
 
+def _rate_limited(instance: BaseLLM, provider: str, model: str, config_group: str) -> BaseLLM:
+    """Queue calls on the provider/model rate limiter at the group's priority."""
+    from app.core.llm.ratelimit import GROUP_PRIORITIES, PRIORITY_POLISH, RateLimitedLLM, limiter_for
+
+    limiter = limiter_for(provider, model)
+    if limiter is None:
+        return instance
+    return RateLimitedLLM(instance, limiter, GROUP_PRIORITIES.get(config_group, PRIORITY_POLISH))
+
+
+def _with_response_cache(instance: BaseLLM, provider: str, model: str, config_group: str) -> BaseLLM:
+    if not _response_cache_enabled(config_group):
+        return instance
+    from app.core.llm.cache import CachedLLM
+
+    return CachedLLM(instance, provider=provider, model=model)
+
+
+def _provider_instance(
+    provider: str, model: str, api_key: str, use_cache: bool, config_group: str = "llm"
+) -> BaseLLM:
     if provider not in LLM_REGISTRY:
         raise ValueError(f"Unsupported LLM provider: {provider}")
-    if not api_key:
-        attr = PROVIDER_CONFIG.get(provider, {}).get("api_key_attr", "")
-        hint = f" Set {attr} in env." if attr else ""
-        raise ValueError(f"Missing API key for provider '{provider}'.{hint}")
-    key = (provider, model)
+    if not _provider_enabled(provider):
+        raise ValueError(f"LLM provider '{provider}' is only available with LLM_LOAD_TEST_MODE=true.")
+    attr = PROVIDER_CONFIG.get(provider, {}).get("api_key_attr", "")
+    if not api_key and attr:
+        raise ValueError(f"Missing API key for provider '{provider}'. Set {attr} in env.")
+
+    from app.core.llm.breaker import BreakerLLM, breaker_for, call_class
+
+    kind = call_class(config_group)
+    key = (provider, model, kind)
 
     if use_cache and key in _instances:
         return _instances[key]
@@ -205,6 +285,8 @@ def create_llm(
         api_key=api_key,
         model=model,
     )
+    if settings.LLM_BREAKER_ENABLED:
+        instance = BreakerLLM(instance, breaker_for(provider, model, kind))
 
     if use_cache:
         _instances[key] = instance
@@ -212,6 +294,25 @@ def create_llm(
     return instance
 
 
+def create_llm(
+    provider: str | None = None,
+    model: str | None = None,
+    api_key: str | None = None,
+    config_group: str = "llm",
+    use_cache: bool = True,
+) -> BaseLLM:
+
+    provider = provider or _resolve(config_group, "provider", "CHATBOT_DEFAULT_LLM")
+    provider = PROVIDER_ALIASES.get(provider, provider)
+    model = model or _resolve(config_group, "model", "CHATBOT_DEFAULT_MODEL")
+    api_key = api_key or _resolve_api_key(provider)
+
+    instance = _provider_instance(provider, model, api_key, use_cache, config_group)
+    instance = _rate_limited(instance, provider, model, config_group)
+    instance = _with_hedging(instance, provider, model, config_group, use_cache)
+    return _with_response_cache(instance, provider, model, config_group)
+
+
 def clear_llm_cache() -> None:
     """Clear cached LLM instances so next call picks up new config."""
     _instances.clear()
@@ -0,0 +1,65 @@
+"""Offline token counting and token-budgeted history windows.
+
+Counts use ``tiktoken`` (``o200k_base``) when it is installed and its
+encoding is available locally; otherwise a chars/4 estimate, the same
+heuristic ``PlannerAgent._normalize_usage`` falls back to. Counts only
+need to be stable and roughly proportional across providers: they bound
+prompt size, billing still uses provider-reported usage.
+"""
+
+import logging
+from functools import lru_cache
+
+logger = logging.getLogger(__name__)
+
+# Role/framing tokens each chat message adds on top of its content.
+MESSAGE_OVERHEAD_TOKENS = 4
+
+
+@lru_cache(maxsize=1)
+def _encoding():
+    try:
+        import tiktoken
+
+        return tiktoken.get_encoding("o200k_base")
+    except Exception as exc:  # noqa: BLE001
+        logger.info("tiktoken unavailable (%s); estimating tokens from length.", exc)
+        return None
+
+
+def count_tokens(text: str) -> int:
+    text = str(text or "")
+    if not text:
+        return 0
+    encoding = _encoding()
+    if encoding is not None:
+        return len(encoding.encode(text, disallowed_special=()))
+    return max(1, (len(text) + 3) // 4)
+
+
+def message_tokens(message: dict) -> int:
+    """Token cost of one chat message, preferring a precomputed ``token_count``."""
+    cached = message.get("token_count")
+    if cached is None:
+        cached = count_tokens(message.get("content", ""))
+    return int(cached) + MESSAGE_OVERHEAD_TOKENS
+
+
+def fit_history_to_budget(history: list[dict], budget_tokens: int) -> list[dict]:
+    """Keep the newest messages whose combined tokens fit *budget_tokens*.
+
+    The window stays contiguous: it stops at the first (newest-to-oldest)
+    message that does not fit rather than skipping over it.
+    """
+    if budget_tokens <= 0:
+        return list(history)
+    kept: list[dict] = []
+    used = 0
+    for message in reversed(history):
+        cost = message_tokens(message)
+        if used + cost > budget_tokens:
+            break
+        kept.append(message)
+        used += cost
+    kept.reverse()
+    return kept
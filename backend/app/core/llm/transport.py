@@ -0,0 +1,113 @@
+"""Shared, pooled HTTP transport for LLM provider SDK clients.
+
+Provider instances are cached per ``(provider, model)``, but models of the
+same provider talk to the same host. Handing every SDK client the pooled
+HTTP clients registered here for ``(provider, api_key)`` keeps one set of
+warm keep-alive (and, with ``h2`` installed, HTTP/2) connections per host
+instead of one per model.
+
+Clients are built from the SDK's own ``DefaultHttpxClient`` classes, since
+the SDKs reject HTTP clients from a different httpx build than their own.
+"""
+
+import hashlib
+import threading
+from types import ModuleType
+
+from app.core.config import settings
+from app.core.http import http2_enabled, pool_connection_stats
+
+_lock = threading.Lock()
+_pools: dict[tuple[str, str], "_ProviderPool"] = {}
+
+
+def http_timeout(sdk: ModuleType):
+    return sdk.Timeout(
+        settings.LLM_HTTP_READ_TIMEOUT,
+        connect=settings.LLM_HTTP_CONNECT_TIMEOUT,
+    )
+
+
+def _limits(sdk: ModuleType):
+    limits_cls = type(sdk.DEFAULT_CONNECTION_LIMITS)
+    return limits_cls(
+        max_connections=settings.LLM_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.LLM_HTTP_KEEPALIVE_EXPIRY_SECONDS,
+    )
+
+
+class _ProviderPool:
+    def __init__(self, provider: str, sdk: ModuleType):
+        self.provider = provider
+        self.http2 = http2_enabled(settings.LLM_HTTP2, "LLM_HTTP2")
+        self.counters = {"requests": 0, "responses": 0}
+        self.sync_client = sdk.DefaultHttpxClient(
+            http2=self.http2,
+            limits=_limits(sdk),
+            timeout=http_timeout(sdk),
+            event_hooks={"request": [self._on_request], "response": [self._on_response]},
+        )
+        self.async_client = sdk.DefaultAsyncHttpxClient(
+            http2=self.http2,
+            limits=_limits(sdk),
+            timeout=http_timeout(sdk),
+            event_hooks={"request": [self._aon_request], "response": [self._aon_response]},
+        )
+
+    def _on_request(self, _request) -> None:
+        self.counters["requests"] += 1
+
+    def _on_response(self, _response) -> None:
+        self.counters["responses"] += 1
+
+    async def _aon_request(self, request) -> None:
+        self._on_request(request)
+
+    async def _aon_response(self, response) -> None:
+        self._on_response(response)
+
+    def stats(self) -> dict:
+        return {
+            "provider": self.provider,
+            "http2": self.http2,
+            **pool_connection_stats(self.sync_client, self.async_client),
+            **self.counters,
+        }
+
+
+def _pool_key(provider: str, api_key: str) -> tuple[str, str]:
+    return provider, hashlib.sha256(api_key.encode("utf-8")).hexdigest()[:12]
+
+
+def shared_http_clients(provider: str, api_key: str, sdk: ModuleType) -> tuple:
+    """Return the pooled ``(sync, async)`` HTTP clients for *provider* and *api_key*.
+
+    *sdk* is the provider SDK module (``openai``, ``anthropic``); the pool is
+    built from its client classes the first time the pair is seen.
+    """
+    key = _pool_key(provider, api_key)
+    with _lock:
+        pool = _pools.get(key)
+        if pool is None:
+            pool = _pools[key] = _ProviderPool(provider, sdk)
+        return pool.sync_client, pool.async_client
+
+
+def http_pool_stats() -> list[dict]:
+    with _lock:
+        pools = list(_pools.values())
+    return [pool.stats() for pool in pools]
+
+
+async def close_http_clients() -> None:
+    from app.core.llm.service import clear_llm_cache
+
+    with _lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    # Cached provider instances hold the clients being closed.
+    clear_llm_cache()
+    for pool in pools:
+        pool.sync_client.close()
+        await pool.async_client.aclose()
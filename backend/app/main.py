@@ -4,12 +4,20 @@ from pathlib import Path
 from fastapi import FastAPI
 from fastapi.staticfiles import StaticFiles
 
+from app.agents.memory.worker import memory_summary_worker
+from app.channels.common import inbound_coalescer
+from app.channels.http import close_channel_http_clients
 from app.channels.telegram.router import router as telegram_channel_router
 from app.channels.whatsapp.router import router as whatsapp_channel_router
+from app.channels.whatsapp.service import whatsapp_dispatcher
 from app.core.database import close_app_database, init_app_database
+from app.core.llm.batch import llm_batch_queue
+from app.core.llm.transport import close_http_clients
 from app.core.logging import setup_logging
 from app.middleware.cors import setup_cors
+from app.modules.admin.listener import admin_change_listener
 from app.modules.admin.router import router as admin_router
+from app.modules.admin.service import warm_cache
 from app.modules.billing.router import router as billing_router
 from app.modules.chatbot.router import router as chatbot_router
 
@@ -19,10 +27,21 @@ setup_logging()
 @asynccontextmanager
 async def lifespan(_app: FastAPI):
     init_app_database()
+    warm_cache()
+    admin_change_listener.start()
+    memory_summary_worker.start()
+    llm_batch_queue.start()
     try:
         yield
     finally:
-        close_app_database()
+        inbound_coalescer.flush_all()
+        await whatsapp_dispatcher.stop()
+        await memory_summary_worker.stop()
+        await llm_batch_queue.stop()
+        await admin_change_listener.stop()
+        await close_http_clients()
+        await close_channel_http_clients()
+        await close_app_database()
 
 
 app = FastAPI(title="Sales Agent API", lifespan=lifespan)
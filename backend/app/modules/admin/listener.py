@@ -0,0 +1,116 @@
+"""Cross-process invalidation of admin config/prompt caches.
+
+Each worker process keeps one dedicated psycopg connection that LISTENs on
+``ADMIN_CHANGE_CHANNEL``. Admin writes in any process NOTIFY that channel
+in the same transaction, so every other process rebuilds its override
+snapshot and drops its LLM instances as soon as the write commits, without
+polling. The rebuild runs in a worker thread; lookups keep serving the
+previous snapshot until it swaps in. After a reconnect the caches are
+refreshed unconditionally, since notifications sent while disconnected are
+lost.
+"""
+
+import asyncio
+import contextlib
+import json
+import logging
+import time
+
+from sqlalchemy.engine import make_url
+
+from app.core.database import app_database_url
+from app.core.llm.service import clear_llm_cache
+from app.modules.admin.service import ADMIN_CHANGE_CHANNEL, PROCESS_TOKEN, refresh_cache
+
+logger = logging.getLogger(__name__)
+
+_MAX_RECONNECT_DELAY_SECONDS = 30.0
+
+
+def _libpq_conninfo(url: str) -> str | None:
+    parsed = make_url(url)
+    if parsed.get_backend_name() != "postgresql":
+        return None
+    return parsed.set(drivername="postgresql").render_as_string(hide_password=False)
+
+
+class AdminChangeListener:
+    def __init__(self, database_url: str = app_database_url):
+        self._conninfo = _libpq_conninfo(database_url)
+        self._task: asyncio.Task | None = None
+        self._connected = False
+        self._counters = {
+            "notifications": 0,
+            "ignored_own": 0,
+            "invalidations": 0,
+            "reconnects": 0,
+        }
+        self._last_invalidated_at: float | None = None
+
+    def start(self) -> None:
+        if self._task is not None or self._conninfo is None:
+            return
+        self._task = asyncio.create_task(self._run(), name="admin-change-listener")
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        with contextlib.suppress(asyncio.CancelledError):
+            await self._task
+        self._task = None
+        self._connected = False
+
+    def handle_payload(self, payload: str) -> bool:
+        """Count a notification; True when it came from another process."""
+        self._counters["notifications"] += 1
+        try:
+            origin = json.loads(payload or "{}").get("origin")
+        except ValueError:
+            origin = None
+        if origin == PROCESS_TOKEN:
+            # The writing process already invalidated its own caches.
+            self._counters["ignored_own"] += 1
+            return False
+        return True
+
+    async def _invalidate(self) -> None:
+        await asyncio.to_thread(refresh_cache)
+        clear_llm_cache()
+        self._counters["invalidations"] += 1
+        self._last_invalidated_at = time.time()
+
+    async def _run(self) -> None:
+        import psycopg
+
+        delay = 1.0
+        while True:
+            try:
+                async with await psycopg.AsyncConnection.connect(self._conninfo, autocommit=True) as conn:
+                    await conn.execute(f"LISTEN {ADMIN_CHANGE_CHANNEL}")
+                    self._connected = True
+                    delay = 1.0
+                    if self._counters["reconnects"]:
+                        await self._invalidate()
+                    async for notify in conn.notifies():
+                        if self.handle_payload(notify.payload):
+                            await self._invalidate()
+            except asyncio.CancelledError:
+                raise
+            except Exception as exc:  # noqa: BLE001
+                logger.warning("Admin change listener disconnected: %s", exc)
+            self._connected = False
+            self._counters["reconnects"] += 1
+            await asyncio.sleep(delay)
+            delay = min(delay * 2, _MAX_RECONNECT_DELAY_SECONDS)
+
+    def stats(self) -> dict:
+        return {
+            "enabled": self._conninfo is not None,
+            "connected": self._connected,
+            "last_invalidated_at": self._last_invalidated_at,
+            **self._counters,
+        }
+
+
+admin_change_listener = AdminChangeListener()
@@ -1,8 +1,25 @@
+import asyncio
+
 from fastapi import APIRouter, HTTPException
 from pydantic import BaseModel
 
+from app.agents.memory.worker import memory_summary_worker
+from app.agents.planner.fast_answers import fast_answer_stats
+from app.channels.common import inbound_coalescer
+from app.channels.http import channel_http_stats
+from app.channels.idempotency import inbound_idempotency
+from app.channels.typing import typing_scheduler
+from app.channels.whatsapp.service import whatsapp_dispatcher
+from app.core.llm.batch import llm_batch_queue
+from app.core.llm.breaker import breaker_stats, reset_breaker
+from app.core.llm.cache import response_cache
+from app.core.llm.hedging import hedging_stats
+from app.core.llm.ratelimit import rate_limit_stats
 from app.core.llm.service import list_llm_options
+from app.core.llm.transport import http_pool_stats
+from app.modules.admin.listener import admin_change_listener
 from app.modules.admin.service import (
+    cache_version,
     list_configs,
     list_prompts,
     reset_prompt,
@@ -31,7 +48,7 @@ async def get_configs():
 @router.put("/configs")
 async def put_configs(request: UpdateConfigsRequest):
     try:
-        update_configs(request.configs)
+        await asyncio.to_thread(update_configs, request.configs)
     except ValueError as exc:
         raise HTTPException(status_code=400, detail=str(exc)) from exc
     return {"status": "updated"}
@@ -47,6 +64,40 @@ async def get_llm_options():
     return list_llm_options()
 
 
+@router.get("/llm/breakers")
+async def get_llm_breakers():
+    return breaker_stats()
+
+
+@router.post("/llm/breakers/{provider}/{model}/reset")
+async def reset_llm_breaker(provider: str, model: str):
+    if not reset_breaker(provider, model):
+        raise HTTPException(status_code=404, detail="Breaker not found")
+    return {"status": "reset", "provider": provider, "model": model}
+
+
+@router.get("/metrics")
+async def get_runtime_metrics():
+    return {
+        "memory_summary_queue": memory_summary_worker.stats(),
+        "llm_http_pools": http_pool_stats(),
+        "llm_response_cache": response_cache.stats(),
+        "llm_hedging": hedging_stats(),
+        "llm_rate_limits": rate_limit_stats(),
+        "llm_batch_queue": llm_batch_queue.stats(),
+        "fast_answers": fast_answer_stats(),
+        "inbound_coalescing": inbound_coalescer.stats(),
+        "inbound_idempotency": inbound_idempotency.stats(),
+        "whatsapp_dispatch": whatsapp_dispatcher.stats(),
+        "channel_http_pools": channel_http_stats(),
+        "typing_indicators": typing_scheduler.stats(),
+        "admin_cache": {
+            "version": cache_version(),
+            "listener": admin_change_listener.stats(),
+        },
+    }
+
+
 @router.put("/prompts/{slug}")
 async def put_prompt(slug: str, request: UpdatePromptRequest):
     data = {"content": request.content}
@@ -55,7 +106,7 @@ async def put_prompt(slug: str, request: UpdatePromptRequest):
     if request.description is not None:
         data["description"] = request.description
 
-    ok = update_prompt(slug, data)
+    ok = await asyncio.to_thread(update_prompt, slug, data)
     if not ok:
         raise HTTPException(status_code=404, detail="Prompt not found")
     return {"status": "updated"}
@@ -63,7 +114,7 @@ async def put_prompt(slug: str, request: UpdatePromptRequest):
 
 @router.delete("/prompts/{slug}/reset")
 async def reset_prompt_to_default(slug: str):
-    ok = reset_prompt(slug)
+    ok = await asyncio.to_thread(reset_prompt, slug)
     if not ok:
         raise HTTPException(status_code=404, detail="Prompt not found")
     return {"status": "reset", "slug": slug}
@@ -7,11 +7,32 @@ DEFAULT_CONFIGS: dict[str, str] = {
     "config:llm:default_model": str(settings.CHATBOT_DEFAULT_MODEL),
     "config:llm_planner:provider": str(settings.CHATBOT_DEFAULT_LLM),
     "config:llm_planner:model": str(settings.CHATBOT_DEFAULT_MODEL),
+    # Max tokens of chat history sent to the planner model per turn (0 = no limit).
+    "config:llm_planner:history_token_budget": "2000",
+    # Per-model overrides as JSON, e.g. {"openai:gpt-5-mini": 4000, "anthropic": 3000}.
+    "config:llm_planner:history_token_budgets": "",
+    # Reuse identical blocking LLM calls from the response cache (see app/core/llm/cache.py).
+    # Opt-in per group: set <group>.response_cache to "true" in the admin config editor.
+    "config:llm_planner:response_cache": "false",
+    # Secondary provider/model raced against the planner model once it is slower
+    # than its live p95, capped at hedge_after_ms (empty provider = off).
+    "config:llm_planner:hedge_provider": "",
+    "config:llm_planner:hedge_model": "",
+    "config:llm_planner:hedge_after_ms": "3000",
     "config:llm_memory:provider": str(settings.CHATBOT_DEFAULT_LLM),
     "config:llm_memory:model": str(settings.CHATBOT_DEFAULT_MODEL),
+    "config:llm_memory:response_cache": "false",
     "config:llm_whatsapp:provider": str(settings.CHATBOT_DEFAULT_LLM),
     "config:llm_whatsapp:model": str(settings.CHATBOT_DEFAULT_MODEL),
+    "config:llm_whatsapp:response_cache": "false",
+    # Vetted answers for early, single-intent questions (``fast_answers`` prompt).
+    "config:fast_answer:enabled": "true",
+    "config:fast_answer:max_words": "8",
+    "config:fast_answer:max_turn": "3",
     "config:agents:memory": "true",
+    "config:agents:memory_mode": "incremental",
+    # Send memory summaries through the provider batch API (OpenAI only; cheaper, slower).
+    "config:agents:memory_batch": "false",
     "config:app_db:url": str(settings.app_database_url),
 }
 
@@ -118,6 +139,27 @@ DEFAULT_PROMPTS: list[dict[str, str]] = [
         ),
         "variables": "",
     },
+    {
+        "slug": "fast_answers",
+        "agent": "planner",
+        "name": "Fast Answers",
+        "description": (
+            "Jawaban siap pakai tanpa LLM untuk pertanyaan awal yang umum. "
+            "Satu baris per intent: intent | kata kunci, dipisah koma | jawaban. "
+            "Fakta produk ditulis sebagai {placeholder} dari Product Knowledge, mis. {harga}, {bpom}."
+        ),
+        "content": (
+            "harga | harga, harganya, berapaan, price | Harganya {harga} untuk kemasan {kemasan} kak. "
+            "Scrub-nya lembut, jadi awet dipakai rutin 😊\n"
+            "cara_pakai | cara pakai, cara pakainya, cara pemakaian, gimana pakainya | "
+            "Gampang kok kak: {cara_pakai} ya.\n"
+            "bpom | bpom, izin edar | Sudah terdaftar BPOM kak, nomornya {bpom}.\n"
+            "halal | halal, mui | Sudah bersertifikat Halal MUI kak, nomornya {halal_mui}.\n"
+            "ongkir | ongkir, ongkos kirim, biaya kirim | Ongkirnya tergantung alamat tujuan kak. "
+            "Boleh kabari kota/kecamatannya biar aku cekin?"
+        ),
+        "variables": "product_knowledge",
+    },
     {
         "slug": "memory_summarize_system",
         "agent": "memory",
@@ -169,4 +211,20 @@ DEFAULT_PROMPTS: list[dict[str, str]] = [
         ),
         "variables": "messages",
     },
+    {
+        "slug": "memory_update_user",
+        "agent": "memory",
+        "name": "Memory Update User",
+        "description": "Template prompt user untuk memperbarui memori dengan pesan baru saja (mode inkremental).",
+        "content": (
+            "Memori saat ini:\n"
+            "{summary}\n\n"
+            "Pesan baru sejak memori terakhir (JSON):\n"
+            "{messages}\n\n"
+            "Perbarui memori: tambahkan fakta baru, koreksi yang sudah berubah, "
+            "dan buang yang tidak relevan lagi.\n"
+            "Kembalikan hanya poin-poin memori dalam bahasa Indonesia."
+        ),
+        "variables": "summary, messages",
+    },
 ]
@@ -1,9 +1,24 @@
-"""Admin service — DB-backed config/prompt overrides with default fallback."""
+"""Admin service — DB-backed config/prompt overrides with default fallback.
 
-from sqlmodel import Session, delete, select
+Overrides are read through an in-process snapshot of both override tables,
+so ``resolve_config``/``resolve_prompt`` are dict lookups on the hot path
+and never touch the database once the snapshot is warm. ``update_configs``,
+``update_prompt`` and ``reset_prompt`` rebuild the snapshot right after they
+commit, and publish a Postgres NOTIFY on ``ADMIN_CHANGE_CHANNEL`` so the
+listener in every other worker process rebuilds its snapshot off the event
+loop (see ``listener.py``). Lookups keep serving the previous snapshot until
+the new one swaps in.
+"""
+
+import json
+import threading
+import uuid
+
+from sqlmodel import Session, delete, select, text
 
 from app.core.config import settings
 from app.core.database import app_engine
+from app.core.llm.service import clear_llm_cache
 from app.modules.admin.models import AdminConfig, PromptOverride
 from app.modules.admin.seed import DEFAULT_CONFIGS, DEFAULT_PROMPTS
 
@@ -19,6 +34,76 @@ SECRET_FIELDS = {"api_key", "password"}
 BLOCKED_CONFIG_GROUPS: set[str] = set()
 
 
+ADMIN_CHANGE_CHANNEL = "admin_cache_invalidate"
+# Identifies this process in NOTIFY payloads so it can skip its own echoes.
+PROCESS_TOKEN = uuid.uuid4().hex
+
+_cache_lock = threading.Lock()
+_cache_version = 0
+_config_overrides: dict[tuple[str, str], str] | None = None
+_prompt_overrides: dict[str, str] | None = None
+
+
+def cache_version() -> int:
+    return _cache_version
+
+
+def refresh_cache() -> int:
+    """Reload the override snapshot and swap it in. Returns the new cache version.
+
+    Blocking: call it from a worker thread (``asyncio.to_thread``) when on
+    the event loop. The version is bumped only when the new snapshot is in
+    place, so anything memoized per version never pairs a new version with
+    stale overrides.
+    """
+    global _cache_version, _config_overrides, _prompt_overrides
+    # Held across the read so a slow reload cannot overwrite a newer one.
+    with _cache_lock:
+        configs, prompts = _read_overrides()
+        _cache_version += 1
+        _config_overrides, _prompt_overrides = configs, prompts
+        return _cache_version
+
+
+def _publish_change(session: Session, kind: str) -> None:
+    """Queue a NOTIFY in the session's transaction; it is delivered on commit."""
+    if session.get_bind().dialect.name != "postgresql":
+        return
+    payload = json.dumps({"origin": PROCESS_TOKEN, "kind": kind})
+    session.exec(
+        text("SELECT pg_notify(:channel, :payload)"),
+        params={"channel": ADMIN_CHANGE_CHANNEL, "payload": payload},
+    )
+
+
+def warm_cache() -> None:
+    refresh_cache()
+
+
+def _read_overrides() -> tuple[dict[tuple[str, str], str], dict[str, str]]:
+    with Session(app_engine) as session:
+        configs = {
+            (item.config_group, item.config_key): item.value
+            for item in session.exec(select(AdminConfig)).all()
+        }
+        prompts = {
+            item.slug: item.content
+            for item in session.exec(select(PromptOverride)).all()
+            if item.content is not None
+        }
+    return configs, prompts
+
+
+def _load_overrides() -> tuple[dict[tuple[str, str], str], dict[str, str]]:
+    configs, prompts = _config_overrides, _prompt_overrides
+    if configs is not None and prompts is not None:
+        return configs, prompts
+    # Only reached before warm_cache() ran (scripts, tests); the app warms
+    # the snapshot at startup, so request paths never load here.
+    refresh_cache()
+    return _config_overrides or {}, _prompt_overrides or {}
+
+
 def _is_secret(field: str) -> bool:
     return field in SECRET_FIELDS
 
@@ -92,7 +177,10 @@ def update_configs(updates: dict[str, dict[str, str]]) -> None:
                     existing.value = value
 
                 session.add(existing)
+        _publish_change(session, "configs")
         session.commit()
+    refresh_cache()
+    clear_llm_cache()
 
 
 def resolve_config(group: str, key: str) -> str:
@@ -104,14 +192,10 @@ def resolve_config(group: str, key: str) -> str:
             return str(getattr(settings, attr, ""))
         return ""
 
-    with Session(app_engine) as session:
-        existing = session.exec(
-            select(AdminConfig)
-            .where(AdminConfig.config_group == group)
-            .where(AdminConfig.config_key == key)
-        ).first()
-        if existing:
-            return existing.value
+    configs, _ = _load_overrides()
+    existing = configs.get((group, key))
+    if existing is not None:
+        return existing
 
     full_key = f"config:{group}:{key}"
     if full_key in DEFAULT_CONFIGS:
@@ -172,8 +256,10 @@ def update_prompt(slug: str, data: dict[str, str]) -> bool:
             existing.content = data["content"]
 
         session.add(existing)
+        _publish_change(session, "prompts")
         session.commit()
-        return True
+    refresh_cache()
+    return True
 
 
 def reset_prompt(slug: str) -> bool:
@@ -184,15 +270,17 @@ def reset_prompt(slug: str) -> bool:
         existing = session.get(PromptOverride, slug)
         if existing:
             session.delete(existing)
+            _publish_change(session, "prompts")
             session.commit()
+    refresh_cache()
     return True
 
 
 def resolve_prompt(slug: str) -> str:
-    with Session(app_engine) as session:
-        existing = session.get(PromptOverride, slug)
-        if existing and existing.content is not None:
-            return existing.content
+    _, prompts = _load_overrides()
+    existing = prompts.get(slug)
+    if existing is not None:
+        return existing
 
     fallback = _PROMPT_FALLBACK.get(slug, {})
     return fallback.get("content", "")
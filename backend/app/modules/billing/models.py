@@ -12,14 +12,22 @@ class LLMUsageEvent(SQLModel, table=True):
     conversation_id: str = Field(index=True)
     provider: str = Field(index=True)
     model: str = Field(index=True)
+    # Agent that produced the turn ("sales" = planner); fast-answer hit rate is per planner turn.
+    agent: str = Field(default="", index=True)
 
     input_tokens: int = 0
     output_tokens: int = 0
     total_tokens: int = 0
+    # Subsets of input_tokens served from / written to the provider prompt cache.
+    cached_input_tokens: int = 0
+    cache_write_tokens: int = 0
 
     input_cost_usd: float = 0.0
     output_cost_usd: float = 0.0
     total_cost_usd: float = 0.0
+    cache_savings_usd: float = 0.0
+    # Estimated cost of the planner call a fast answer replaced (provider "fast_answer").
+    fast_answer_savings_usd: float = 0.0
     pricing_source: str = "provider_default"
 
     created_at: float = Field(default_factory=time.time, index=True)
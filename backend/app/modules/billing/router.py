@@ -12,7 +12,7 @@ async def get_summary_endpoint(
     days: int = 30,
     recent_limit: int = 50,
 ):
-    return get_billing_summary(user_id=user_id, days=days, recent_limit=recent_limit)
+    return await get_billing_summary(user_id=user_id, days=days, recent_limit=recent_limit)
 
 
 @router.get("/events/{user_id}", response_model=list[BillingUsageEventItem])
@@ -21,5 +21,5 @@ async def list_events_endpoint(
     days: int = 30,
     limit: int = 200,
 ):
-    return list_usage_events(user_id=user_id, days=days, limit=limit)
+    return await list_usage_events(user_id=user_id, days=days, limit=limit)
 
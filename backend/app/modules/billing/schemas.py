@@ -6,14 +6,20 @@ class BillingTotals(BaseModel):
     input_tokens: int
     output_tokens: int
     total_tokens: int
+    cached_input_tokens: int = 0
     input_cost_usd: float
     output_cost_usd: float
     total_cost_usd: float
+    cache_savings_usd: float = 0.0
+    fast_answer_hits: int = 0
+    fast_answer_hit_rate: float = 0.0
+    fast_answer_savings_usd: float = 0.0
 
 
 class BillingDailyPoint(BaseModel):
     date: str
     requests: int
+    fast_answer_hits: int = 0
     input_tokens: int
     output_tokens: int
     total_tokens: int
@@ -24,12 +30,15 @@ class BillingModelBreakdown(BaseModel):
     provider: str
     model: str
     requests: int
+    fast_answer_hits: int = 0
     input_tokens: int
     output_tokens: int
     total_tokens: int
+    cached_input_tokens: int = 0
     input_cost_usd: float
     output_cost_usd: float
     total_cost_usd: float
+    cache_savings_usd: float = 0.0
     pricing_source: str
 
 
@@ -39,12 +48,17 @@ class BillingUsageEventItem(BaseModel):
     conversation_id: str
     provider: str
     model: str
+    agent: str = ""
     input_tokens: int
     output_tokens: int
     total_tokens: int
+    cached_input_tokens: int = 0
+    cache_write_tokens: int = 0
     input_cost_usd: float
     output_cost_usd: float
     total_cost_usd: float
+    cache_savings_usd: float = 0.0
+    fast_answer_savings_usd: float = 0.0
     pricing_source: str
     created_at: float
 
@@ -1,10 +1,11 @@
 import time
 from datetime import datetime, timedelta, timezone
 
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from app.core.config import settings
-from app.core.database import app_engine
+from app.core.database import app_async_engine
 from app.modules.billing.models import LLMUsageEvent
 
 # USD pricing per 1M tokens. Values are estimated and can be overridden in future.
@@ -62,8 +63,26 @@ _PROVIDER_DEFAULT_PRICING_PER_1M: dict[str, tuple[float, float]] = {
     "xai": (3.0, 12.0),
 }
 
+# Price of a prompt-cache read / write relative to the model's input rate.
+_CACHED_INPUT_RATE_MULTIPLIER: dict[str, float] = {
+    "openai": 0.1,
+    "anthropic": 0.1,
+    "google": 0.25,
+    "xai": 0.25,
+}
+_CACHE_WRITE_RATE_MULTIPLIER: dict[str, float] = {
+    "anthropic": 1.25,
+}
+
 _CHANNEL_SCOPES = {"web", "whatsapp", "telegram"}
 
+# Pseudo-provider of replies served from the planner's fast-answer index.
+FAST_ANSWER_PROVIDER = "fast_answer"
+# Pricing source of turns answered from the LLM response cache (zero cost).
+RESPONSE_CACHE_PRICING = "response_cache"
+# Agent tag of planner turns, answered by the LLM or the fast-answer index.
+PLANNER_AGENT = "sales"
+
 
 def _to_int(value, default: int = 0) -> int:
     try:
@@ -107,12 +126,17 @@ def _usage_event_to_dict(event: LLMUsageEvent) -> dict:
         "conversation_id": event.conversation_id,
         "provider": event.provider,
         "model": event.model,
+        "agent": event.agent or "",
         "input_tokens": int(event.input_tokens),
         "output_tokens": int(event.output_tokens),
         "total_tokens": int(event.total_tokens),
+        "cached_input_tokens": int(event.cached_input_tokens or 0),
+        "cache_write_tokens": int(event.cache_write_tokens or 0),
         "input_cost_usd": float(event.input_cost_usd),
         "output_cost_usd": float(event.output_cost_usd),
         "total_cost_usd": float(event.total_cost_usd),
+        "cache_savings_usd": float(event.cache_savings_usd or 0.0),
+        "fast_answer_savings_usd": float(event.fast_answer_savings_usd or 0.0),
         "pricing_source": event.pricing_source,
         "created_at": float(event.created_at),
     }
@@ -131,7 +155,7 @@ def _resolve_user_scope(user_id: str) -> tuple[str, str]:
 
 def _extract_usage_payload(
     assistant_metadata: dict | None,
-) -> tuple[str, str, int, int, int] | None:
+) -> tuple[str, str, int, int, int, int, int] | None:
     if not isinstance(assistant_metadata, dict):
         return None
 
@@ -147,72 +171,188 @@ def _extract_usage_payload(
     total_tokens = _to_int(usage.get("total_tokens"))
     if total_tokens <= 0:
         total_tokens = input_tokens + output_tokens
-    if input_tokens <= 0 and output_tokens <= 0 and total_tokens <= 0:
+    if input_tokens <= 0 and output_tokens <= 0 and total_tokens <= 0 and not usage.get("cache_hit"):
         return None
     if input_tokens <= 0 and total_tokens > 0:
         input_tokens = max(0, total_tokens - max(0, output_tokens))
     if output_tokens <= 0 and total_tokens > 0:
         output_tokens = max(0, total_tokens - max(0, input_tokens))
 
-    return provider, model, input_tokens, output_tokens, total_tokens
+    # Cached reads/writes are a subset of input_tokens.
+    cached_input_tokens = min(max(0, _to_int(usage.get("cached_input_tokens"))), input_tokens)
+    cache_write_tokens = min(
+        max(0, _to_int(usage.get("cache_write_tokens"))),
+        input_tokens - cached_input_tokens,
+    )
+
+    return (
+        provider,
+        model,
+        input_tokens,
+        output_tokens,
+        total_tokens,
+        cached_input_tokens,
+        cache_write_tokens,
+    )
+
+
+def _price_usage(
+    provider: str,
+    model: str,
+    input_tokens: int,
+    output_tokens: int,
+    cached_input_tokens: int,
+    cache_write_tokens: int,
+) -> dict:
+    input_rate, output_rate, pricing_source = _resolve_pricing(provider, model)
+    read_rate = input_rate * _CACHED_INPUT_RATE_MULTIPLIER.get(provider, 1.0)
+    write_rate = input_rate * _CACHE_WRITE_RATE_MULTIPLIER.get(provider, 1.0)
+    uncached_tokens = input_tokens - cached_input_tokens - cache_write_tokens
+
+    input_cost = (
+        uncached_tokens * input_rate + cached_input_tokens * read_rate + cache_write_tokens * write_rate
+    ) / 1_000_000.0
+    output_cost = (output_tokens / 1_000_000.0) * output_rate
+    full_price_input_cost = (input_tokens / 1_000_000.0) * input_rate
+    return {
+        "input_cost_usd": input_cost,
+        "output_cost_usd": output_cost,
+        "total_cost_usd": input_cost + output_cost,
+        "cache_savings_usd": full_price_input_cost - input_cost,
+        "pricing_source": pricing_source,
+    }
+
+
+def _is_response_cache_hit(assistant_metadata: dict | None) -> bool:
+    usage = assistant_metadata.get("usage") if isinstance(assistant_metadata, dict) else None
+    return isinstance(usage, dict) and bool(usage.get("cache_hit"))
+
+
+def _price_payload(assistant_metadata: dict | None, payload: tuple) -> dict:
+    provider, model, input_tokens, output_tokens, _, cached_input_tokens, cache_write_tokens = payload
+    cost = _price_usage(provider, model, input_tokens, output_tokens, cached_input_tokens, cache_write_tokens)
+    if _is_response_cache_hit(assistant_metadata):
+        cost["pricing_source"] = RESPONSE_CACHE_PRICING
+    return cost
+
+
+def _extract_agent(assistant_metadata: dict | None) -> str:
+    if not isinstance(assistant_metadata, dict):
+        return ""
+    return str(assistant_metadata.get("agent") or "")
+
+
+def _extract_fast_answer(assistant_metadata: dict | None) -> tuple[str, dict] | None:
+    """Intent and avoided-call pricing of a fast-answer reply, else None."""
+    if not isinstance(assistant_metadata, dict):
+        return None
+    fast = assistant_metadata.get("fast_answer")
+    if not isinstance(fast, dict):
+        return None
+    provider, model = _normalize_identity(fast.get("provider"), fast.get("model"))
+    avoided = _price_usage(
+        provider,
+        model,
+        max(0, _to_int(fast.get("avoided_input_tokens"))),
+        max(0, _to_int(fast.get("avoided_output_tokens"))),
+        0,
+        0,
+    )
+    return str(fast.get("intent") or "unknown"), avoided
 
 
 def compute_usage_cost(assistant_metadata: dict | None) -> dict | None:
     """Return cost breakdown to enrich stream meta events. None if no usage data."""
+    fast = _extract_fast_answer(assistant_metadata)
+    if fast is not None:
+        return {
+            "input_cost_usd": 0.0,
+            "output_cost_usd": 0.0,
+            "total_cost_usd": 0.0,
+            "cache_savings_usd": 0.0,
+            "fast_answer_savings_usd": round(fast[1]["total_cost_usd"], 8),
+            "pricing_source": fast[1]["pricing_source"],
+        }
+
     payload = _extract_usage_payload(assistant_metadata)
     if payload is None:
         return None
-    provider, model, input_tokens, output_tokens, total_tokens = payload
-    input_rate, output_rate, pricing_source = _resolve_pricing(provider, model)
-    input_cost = round((input_tokens / 1_000_000.0) * input_rate, 8)
-    output_cost = round((output_tokens / 1_000_000.0) * output_rate, 8)
-    total_cost = round(input_cost + output_cost, 8)
+    cost = _price_payload(assistant_metadata, payload)
     return {
-        "input_cost_usd": input_cost,
-        "output_cost_usd": output_cost,
-        "total_cost_usd": total_cost,
-        "pricing_source": pricing_source,
+        "input_cost_usd": round(cost["input_cost_usd"], 8),
+        "output_cost_usd": round(cost["output_cost_usd"], 8),
+        "total_cost_usd": round(cost["total_cost_usd"], 8),
+        "cache_savings_usd": round(cost["cache_savings_usd"], 8),
+        "pricing_source": cost["pricing_source"],
     }
 
 
-def record_usage_event(
+async def record_usage_event(
     user_id: str,
     conversation_id: str,
     assistant_metadata: dict | None,
     created_at: float | None = None,
 ) -> bool:
+    fast = _extract_fast_answer(assistant_metadata)
+    if fast is not None:
+        intent, avoided = fast
+        async with AsyncSession(app_async_engine) as session:
+            session.add(
+                LLMUsageEvent(
+                    user_id=user_id,
+                    conversation_id=conversation_id,
+                    provider=FAST_ANSWER_PROVIDER,
+                    model=intent,
+                    agent=_extract_agent(assistant_metadata),
+                    fast_answer_savings_usd=avoided["total_cost_usd"],
+                    pricing_source=avoided["pricing_source"],
+                    created_at=created_at or time.time(),
+                )
+            )
+            await session.commit()
+        return True
+
     payload = _extract_usage_payload(assistant_metadata)
     if payload is None:
         return False
 
-    provider, model, input_tokens, output_tokens, total_tokens = payload
-    input_rate, output_rate, pricing_source = _resolve_pricing(provider, model)
-    input_cost = (input_tokens / 1_000_000.0) * input_rate
-    output_cost = (output_tokens / 1_000_000.0) * output_rate
-    total_cost = input_cost + output_cost
-
-    with Session(app_engine) as session:
+    (
+        provider,
+        model,
+        input_tokens,
+        output_tokens,
+        total_tokens,
+        cached_input_tokens,
+        cache_write_tokens,
+    ) = payload
+    cost = _price_payload(assistant_metadata, payload)
+
+    async with AsyncSession(app_async_engine) as session:
         session.add(
             LLMUsageEvent(
                 user_id=user_id,
                 conversation_id=conversation_id,
                 provider=provider,
                 model=model,
+                agent=_extract_agent(assistant_metadata),
                 input_tokens=input_tokens,
                 output_tokens=output_tokens,
                 total_tokens=total_tokens,
-                input_cost_usd=input_cost,
-                output_cost_usd=output_cost,
-                total_cost_usd=total_cost,
-                pricing_source=pricing_source,
+                cached_input_tokens=cached_input_tokens,
+                cache_write_tokens=cache_write_tokens,
+                input_cost_usd=cost["input_cost_usd"],
+                output_cost_usd=cost["output_cost_usd"],
+                total_cost_usd=cost["total_cost_usd"],
+                cache_savings_usd=cost["cache_savings_usd"],
+                pricing_source=cost["pricing_source"],
                 created_at=created_at or time.time(),
             )
         )
-        session.commit()
+        await session.commit()
     return True
 
 
-def list_usage_events(
+async def list_usage_events(
     user_id: str,
     days: int = 30,
     limit: int = 500,
@@ -234,12 +374,12 @@ def list_usage_events(
     elif scope_type == "channel":
         query = query.where(LLMUsageEvent.user_id.like(f"{scope_value}:%"))
 
-    with Session(app_engine) as session:
-        events = session.exec(query).all()
+    async with AsyncSession(app_async_engine) as session:
+        events = (await session.exec(query)).all()
     return [_usage_event_to_dict(event) for event in events]
 
 
-def get_billing_summary(
+async def get_billing_summary(
     user_id: str,
     days: int = 30,
     recent_limit: int = 50,
@@ -260,17 +400,22 @@ def get_billing_summary(
     elif scope_type == "channel":
         query = query.where(LLMUsageEvent.user_id.like(f"{scope_value}:%"))
 
-    with Session(app_engine) as session:
-        events = session.exec(query).all()
+    async with AsyncSession(app_async_engine) as session:
+        events = (await session.exec(query)).all()
 
     totals = {
         "requests": 0,
         "input_tokens": 0,
         "output_tokens": 0,
         "total_tokens": 0,
+        "cached_input_tokens": 0,
         "input_cost_usd": 0.0,
         "output_cost_usd": 0.0,
         "total_cost_usd": 0.0,
+        "cache_savings_usd": 0.0,
+        "fast_answer_hits": 0,
+        "fast_answer_savings_usd": 0.0,
+        "planner_turns": 0,
     }
 
     end_date = datetime.now(timezone.utc).date()
@@ -282,6 +427,7 @@ def get_billing_summary(
         daily_map[key] = {
             "date": key,
             "requests": 0,
+            "fast_answer_hits": 0,
             "input_tokens": 0,
             "output_tokens": 0,
             "total_tokens": 0,
@@ -294,18 +440,31 @@ def get_billing_summary(
 
     for event in events:
         item = _usage_event_to_dict(event)
-        totals["requests"] += 1
+        # Fast answers never reach a model, so they are counted apart from
+        # requests and stay out of the per-request averages.
+        is_fast_answer = item["provider"] == FAST_ANSWER_PROVIDER
+        request_count = 0 if is_fast_answer else 1
+        fast_answer_count = 1 if is_fast_answer else 0
+        totals["requests"] += request_count
         totals["input_tokens"] += item["input_tokens"]
         totals["output_tokens"] += item["output_tokens"]
         totals["total_tokens"] += item["total_tokens"]
+        totals["cached_input_tokens"] += item["cached_input_tokens"]
         totals["input_cost_usd"] += item["input_cost_usd"]
         totals["output_cost_usd"] += item["output_cost_usd"]
         totals["total_cost_usd"] += item["total_cost_usd"]
+        totals["cache_savings_usd"] += item["cache_savings_usd"]
+        if item["agent"] == PLANNER_AGENT:
+            totals["planner_turns"] += 1
+        if is_fast_answer:
+            totals["fast_answer_hits"] += 1
+            totals["fast_answer_savings_usd"] += item["fast_answer_savings_usd"]
 
         day_key = datetime.fromtimestamp(item["created_at"], tz=timezone.utc).date().isoformat()
         if day_key in daily_map:
             point = daily_map[day_key]
-            point["requests"] += 1
+            point["requests"] += request_count
+            point["fast_answer_hits"] += fast_answer_count
             point["input_tokens"] += item["input_tokens"]
             point["output_tokens"] += item["output_tokens"]
             point["total_tokens"] += item["total_tokens"]
@@ -317,22 +476,28 @@ def get_billing_summary(
                 "provider": item["provider"],
                 "model": item["model"],
                 "requests": 0,
+                "fast_answer_hits": 0,
                 "input_tokens": 0,
                 "output_tokens": 0,
                 "total_tokens": 0,
+                "cached_input_tokens": 0,
                 "input_cost_usd": 0.0,
                 "output_cost_usd": 0.0,
                 "total_cost_usd": 0.0,
+                "cache_savings_usd": 0.0,
                 "pricing_source": item["pricing_source"],
             }
         row = by_model[model_key]
-        row["requests"] += 1
+        row["requests"] += request_count
+        row["fast_answer_hits"] += fast_answer_count
         row["input_tokens"] += item["input_tokens"]
         row["output_tokens"] += item["output_tokens"]
         row["total_tokens"] += item["total_tokens"]
+        row["cached_input_tokens"] += item["cached_input_tokens"]
         row["input_cost_usd"] += item["input_cost_usd"]
         row["output_cost_usd"] += item["output_cost_usd"]
         row["total_cost_usd"] += item["total_cost_usd"]
+        row["cache_savings_usd"] += item["cache_savings_usd"]
 
         recent_items.append(item)
 
@@ -354,9 +519,16 @@ def get_billing_summary(
             "input_tokens": int(totals["input_tokens"]),
             "output_tokens": int(totals["output_tokens"]),
             "total_tokens": int(totals["total_tokens"]),
+            "cached_input_tokens": int(totals["cached_input_tokens"]),
             "input_cost_usd": _to_float(round(totals["input_cost_usd"], 6)),
             "output_cost_usd": _to_float(round(totals["output_cost_usd"], 6)),
             "total_cost_usd": _to_float(round(totals["total_cost_usd"], 6)),
+            "cache_savings_usd": _to_float(round(totals["cache_savings_usd"], 6)),
+            "fast_answer_hits": int(totals["fast_answer_hits"]),
+            "fast_answer_hit_rate": (
+                round(totals["fast_answer_hits"] / totals["planner_turns"], 4) if totals["planner_turns"] else 0.0
+            ),
+            "fast_answer_savings_usd": _to_float(round(totals["fast_answer_savings_usd"], 6)),
         },
         "by_model": [
             {
@@ -364,6 +536,7 @@ def get_billing_summary(
                 "input_cost_usd": _to_float(round(row["input_cost_usd"], 6)),
                 "output_cost_usd": _to_float(round(row["output_cost_usd"], 6)),
                 "total_cost_usd": _to_float(round(row["total_cost_usd"], 6)),
+                "cache_savings_usd": _to_float(round(row["cache_savings_usd"], 6)),
             }
             for row in by_model_list
         ],
@@ -29,6 +29,7 @@ class ConversationMessage(SQLModel, table=True):
     content: str
     thinking: Optional[str] = None
     llm_metadata: Optional[str] = None  # JSON-encoded assistant metadata (tokens, cost, model)
+    token_count: Optional[int] = None  # content tokens, computed once on save
     created_at: float = Field(default_factory=time.time)
 
     conversation: Optional[Conversation] = Relationship(back_populates="messages")
@@ -1,9 +1,11 @@
 import json
 import time
 
-from sqlmodel import Session, delete, select
+from sqlmodel import delete, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from app.core.database import app_engine
+from app.core.database import app_async_engine
+from app.core.llm.tokens import count_tokens
 from app.modules.chatbot.models import (
     Conversation,
     ConversationHistory,
@@ -14,7 +16,7 @@ MAX_CONVERSATIONS = 20
 
 
 class ChatRepository:
-    def __init__(self, engine=app_engine):
+    def __init__(self, engine=app_async_engine):
         self.engine = engine
 
     @staticmethod
@@ -39,7 +41,7 @@ class ChatRepository:
             "created_at": float(entry.created_at),
         }
 
-    def create_conversation(self, user_id: str, title: str = "New Chat") -> dict:
+    async def create_conversation(self, user_id: str, title: str = "New Chat") -> dict:
         now = time.time()
         conversation = Conversation(
             user_id=user_id,
@@ -48,31 +50,36 @@ class ChatRepository:
             updated_at=now,
         )
 
-        with Session(self.engine) as session:
+        async with AsyncSession(self.engine) as session:
             session.add(conversation)
-            session.commit()
-            session.refresh(conversation)
-            self._enforce_max_conversations(session, user_id)
-
-            return self._conversation_to_dict(conversation)
-
-    def list_conversations(self, user_id: str) -> list[dict]:
-        with Session(self.engine) as session:
-            conversations = session.exec(
-                select(Conversation)
-                .where(Conversation.user_id == user_id)
-                .order_by(Conversation.updated_at.desc())
+            await session.commit()
+            await session.refresh(conversation)
+            data = self._conversation_to_dict(conversation)
+            await self._enforce_max_conversations(session, user_id)
+
+            return data
+
+    async def list_conversations(self, user_id: str) -> list[dict]:
+        async with AsyncSession(self.engine) as session:
+            conversations = (
+                await session.exec(
+                    select(Conversation)
+                    .where(Conversation.user_id == user_id)
+                    .order_by(Conversation.updated_at.desc())
+                )
             ).all()
             return [self._conversation_to_dict(conv) for conv in conversations]
 
     @staticmethod
-    def _conversation_detail_payload(
-        session: Session, conversation: Conversation
+    async def _conversation_detail_payload(
+        session: AsyncSession, conversation: Conversation
     ) -> dict:
-        messages = session.exec(
-            select(ConversationMessage)
-            .where(ConversationMessage.conversation_id == conversation.id)
-            .order_by(ConversationMessage.created_at.asc(), ConversationMessage.id.asc())
+        messages = (
+            await session.exec(
+                select(ConversationMessage)
+                .where(ConversationMessage.conversation_id == conversation.id)
+                .order_by(ConversationMessage.created_at.asc(), ConversationMessage.id.asc())
+            )
         ).all()
 
         data = ChatRepository._conversation_to_dict(conversation)
@@ -83,6 +90,8 @@ class ChatRepository:
                 "content": message.content,
                 "created_at": float(message.created_at),
             }
+            if message.token_count is not None:
+                payload["token_count"] = int(message.token_count)
             if message.thinking:
                 payload["thinking"] = message.thinking
             if message.role == "assistant" and message.llm_metadata:
@@ -93,71 +102,81 @@ class ChatRepository:
             data["messages"].append(payload)
         return data
 
-    def get_conversation(self, user_id: str, conversation_id: str) -> dict | None:
-        with Session(self.engine) as session:
-            conversation = session.exec(
-                select(Conversation)
-                .where(Conversation.id == conversation_id)
-                .where(Conversation.user_id == user_id)
+    async def get_conversation(self, user_id: str, conversation_id: str) -> dict | None:
+        async with AsyncSession(self.engine) as session:
+            conversation = (
+                await session.exec(
+                    select(Conversation)
+                    .where(Conversation.id == conversation_id)
+                    .where(Conversation.user_id == user_id)
+                )
             ).first()
             if not conversation:
                 return None
 
-            return self._conversation_detail_payload(session, conversation)
+            return await self._conversation_detail_payload(session, conversation)
 
-    def get_conversation_by_id(self, conversation_id: str) -> dict | None:
-        with Session(self.engine) as session:
-            conversation = session.exec(
-                select(Conversation).where(Conversation.id == conversation_id)
+    async def get_conversation_by_id(self, conversation_id: str) -> dict | None:
+        async with AsyncSession(self.engine) as session:
+            conversation = (
+                await session.exec(
+                    select(Conversation).where(Conversation.id == conversation_id)
+                )
             ).first()
             if not conversation:
                 return None
-            return self._conversation_detail_payload(session, conversation)
+            return await self._conversation_detail_payload(session, conversation)
 
-    def list_conversations_global(
+    async def list_conversations_global(
         self,
         limit: int = 100,
         offset: int = 0,
     ) -> list[dict]:
-        with Session(self.engine) as session:
-            conversations = session.exec(
-                select(Conversation)
-                .order_by(Conversation.updated_at.desc(), Conversation.id.desc())
-                .offset(offset)
-                .limit(limit)
+        async with AsyncSession(self.engine) as session:
+            conversations = (
+                await session.exec(
+                    select(Conversation)
+                    .order_by(Conversation.updated_at.desc(), Conversation.id.desc())
+                    .offset(offset)
+                    .limit(limit)
+                )
             ).all()
             return [self._conversation_to_dict(conv) for conv in conversations]
 
-    def delete_conversation(self, user_id: str, conversation_id: str) -> bool:
-        with Session(self.engine) as session:
-            conversation = session.exec(
-                select(Conversation)
-                .where(Conversation.id == conversation_id)
-                .where(Conversation.user_id == user_id)
+    async def delete_conversation(self, user_id: str, conversation_id: str) -> bool:
+        async with AsyncSession(self.engine) as session:
+            conversation = (
+                await session.exec(
+                    select(Conversation)
+                    .where(Conversation.id == conversation_id)
+                    .where(Conversation.user_id == user_id)
+                )
             ).first()
             if not conversation:
                 return False
 
-            session.exec(
+            await session.exec(
                 delete(ConversationMessage).where(
                     ConversationMessage.conversation_id == conversation_id
                 )
             )
-            session.exec(
+            await session.exec(
                 delete(ConversationHistory).where(
                     ConversationHistory.conversation_id == conversation_id
                 )
             )
-            session.delete(conversation)
-            session.commit()
+            await session.delete(conversation)
+            await session.commit()
             return True
 
-    def update_conversation_title(self, user_id: str, conversation_id: str, title: str) -> bool:
-        with Session(self.engine) as session:
-            conversation = session.exec(
-                select(Conversation)
-                .where(Conversation.id == conversation_id)
-                .where(Conversation.user_id == user_id)
+    async def update_conversation_title(self, user_id: str, conversation_id: str, title: str) -> bool:
+        async with AsyncSession(self.engine) as session:
+            conversation = (
+                await session.exec(
+                    select(Conversation)
+                    .where(Conversation.id == conversation_id)
+                    .where(Conversation.user_id == user_id)
+                )
             ).first()
             if not conversation:
                 return False
@@ -165,10 +184,10 @@ class ChatRepository:
             conversation.title = title
             conversation.updated_at = time.time()
             session.add(conversation)
-            session.commit()
+            await session.commit()
             return True
 
-    def save_messages(
+    async def save_messages(
         self,
         user_id: str,
         conversation_id: str,
@@ -176,30 +195,37 @@ class ChatRepository:
         assistant_content: str,
         assistant_thinking: str | None = None,
         assistant_metadata: dict | None = None,
+        user_messages: list[str] | None = None,
     ) -> bool:
-        with Session(self.engine) as session:
-            conversation = session.exec(
-                select(Conversation)
-                .where(Conversation.id == conversation_id)
-                .where(Conversation.user_id == user_id)
+        """Persist one turn; ``user_messages`` stores a merged turn's messages one row each."""
+        async with AsyncSession(self.engine) as session:
+            conversation = (
+                await session.exec(
+                    select(Conversation)
+                    .where(Conversation.id == conversation_id)
+                    .where(Conversation.user_id == user_id)
+                )
             ).first()
             if not conversation:
                 return False
 
             now = time.time()
-            session.add(
-                ConversationMessage(
-                    conversation_id=conversation_id,
-                    role="user",
-                    content=user_message,
-                    created_at=now,
+            for content in user_messages or [user_message]:
+                session.add(
+                    ConversationMessage(
+                        conversation_id=conversation_id,
+                        role="user",
+                        content=content,
+                        token_count=count_tokens(content),
+                        created_at=now,
+                    )
                 )
-            )
             session.add(
                 ConversationMessage(
                     conversation_id=conversation_id,
                     role="assistant",
                     content=assistant_content,
+                    token_count=count_tokens(assistant_content),
                     thinking=assistant_thinking,
                     llm_metadata=json.dumps(assistant_metadata) if assistant_metadata else None,
                     created_at=now,
@@ -217,16 +243,16 @@ class ChatRepository:
             )
             conversation.updated_at = now
             session.add(conversation)
-            session.commit()
+            await session.commit()
             return True
 
-    def list_history(
+    async def list_history(
         self,
         user_id: str,
         conversation_id: str | None = None,
         limit: int = 100,
     ) -> list[dict]:
-        with Session(self.engine) as session:
+        async with AsyncSession(self.engine) as session:
             query = (
                 select(ConversationHistory)
                 .where(ConversationHistory.user_id == user_id)
@@ -236,16 +262,16 @@ class ChatRepository:
             if conversation_id:
                 query = query.where(ConversationHistory.conversation_id == conversation_id)
 
-            entries = session.exec(query).all()
+            entries = (await session.exec(query)).all()
             return [self._history_to_dict(entry) for entry in entries]
 
-    def clear_history(self, user_id: str, conversation_id: str | None = None) -> int:
-        with Session(self.engine) as session:
+    async def clear_history(self, user_id: str, conversation_id: str | None = None) -> int:
+        async with AsyncSession(self.engine) as session:
             query = select(ConversationHistory.id).where(ConversationHistory.user_id == user_id)
             if conversation_id:
                 query = query.where(ConversationHistory.conversation_id == conversation_id)
 
-            ids = session.exec(query).all()
+            ids = (await session.exec(query)).all()
             if not ids:
                 return 0
 
@@ -254,15 +280,17 @@ class ChatRepository:
                 delete_query = delete_query.where(
                     ConversationHistory.conversation_id == conversation_id
                 )
-            session.exec(delete_query)
-            session.commit()
+            await session.exec(delete_query)
+            await session.commit()
             return len(ids)
 
-    def _enforce_max_conversations(self, session: Session, user_id: str) -> None:
-        conversations = session.exec(
-            select(Conversation)
-            .where(Conversation.user_id == user_id)
-            .order_by(Conversation.updated_at.desc())
+    async def _enforce_max_conversations(self, session: AsyncSession, user_id: str) -> None:
+        conversations = (
+            await session.exec(
+                select(Conversation)
+                .where(Conversation.user_id == user_id)
+                .order_by(Conversation.updated_at.desc())
+            )
         ).all()
 
         if len(conversations) <= MAX_CONVERSATIONS:
@@ -271,17 +299,17 @@ class ChatRepository:
         stale_conversations = conversations[MAX_CONVERSATIONS:]
         stale_ids = [conv.id for conv in stale_conversations]
 
-        session.exec(
+        await session.exec(
             delete(ConversationMessage).where(
                 ConversationMessage.conversation_id.in_(stale_ids)
             )
         )
-        session.exec(
+        await session.exec(
             delete(ConversationHistory).where(
                 ConversationHistory.conversation_id.in_(stale_ids)
             )
         )
         for conversation in stale_conversations:
-            session.delete(conversation)
+            await session.delete(conversation)
 
-        session.commit()
+        await session.commit()
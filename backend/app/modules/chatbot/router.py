@@ -33,7 +33,7 @@ router = APIRouter(tags=["Chatbot"], prefix="/v1/chatbot")
 
 @router.post("/chat", response_model=ChatResponse)
 async def chat_endpoint(request: ChatRequest):
-    return chat(request=request)
+    return await chat(request=request)
 
 
 @router.post("/chat/stream")
@@ -46,17 +46,17 @@ async def chat_stream_endpoint(request: ChatRequest):
 
 @router.get("/conversations/{user_id}", response_model=list[ConversationSummary])
 async def list_conversations_endpoint(user_id: str):
-    return list_conversations(user_id)
+    return await list_conversations(user_id)
 
 
 @router.post("/conversations/{user_id}", response_model=ConversationSummary)
 async def create_conversation_endpoint(user_id: str, request: CreateConversationRequest):
-    return create_conversation(user_id, request.title)
+    return await create_conversation(user_id, request.title)
 
 
 @router.get("/conversations/{user_id}/{conversation_id}", response_model=ConversationDetail)
 async def get_conversation_endpoint(user_id: str, conversation_id: str):
-    conv = get_conversation(user_id, conversation_id)
+    conv = await get_conversation(user_id, conversation_id)
     if not conv:
         raise HTTPException(status_code=404, detail="Conversation not found")
     return conv
@@ -64,7 +64,7 @@ async def get_conversation_endpoint(user_id: str, conversation_id: str):
 
 @router.delete("/conversations/{user_id}/{conversation_id}")
 async def delete_conversation_endpoint(user_id: str, conversation_id: str):
-    deleted = delete_conversation(user_id, conversation_id)
+    deleted = await delete_conversation(user_id, conversation_id)
     if not deleted:
         raise HTTPException(status_code=404, detail="Conversation not found")
     return {"status": "deleted"}
@@ -74,7 +74,7 @@ async def delete_conversation_endpoint(user_id: str, conversation_id: str):
 async def update_title_endpoint(
     user_id: str, conversation_id: str, request: UpdateConversationTitleRequest
 ):
-    updated = update_conversation_title(user_id, conversation_id, request.title)
+    updated = await update_conversation_title(user_id, conversation_id, request.title)
     if not updated:
         raise HTTPException(status_code=404, detail="Conversation not found")
     return {"status": "updated"}
@@ -84,7 +84,7 @@ async def update_title_endpoint(
 async def save_messages_endpoint(
     user_id: str, conversation_id: str, request: SaveMessagesRequest
 ):
-    saved = save_messages(
+    saved = await save_messages(
         user_id,
         conversation_id,
         request.user_message,
@@ -104,12 +104,12 @@ async def list_history_endpoint(
     limit: int = 100,
 ):
     safe_limit = max(1, min(limit, 500))
-    return list_history(user_id, conversation_id=conversation_id, limit=safe_limit)
+    return await list_history(user_id, conversation_id=conversation_id, limit=safe_limit)
 
 
 @router.delete("/history/{user_id}")
 async def clear_history_endpoint(user_id: str, conversation_id: str | None = None):
-    deleted_count = clear_history(user_id, conversation_id=conversation_id)
+    deleted_count = await clear_history(user_id, conversation_id=conversation_id)
     return {"status": "deleted", "deleted_count": deleted_count}
 
 
@@ -121,7 +121,7 @@ async def monitor_conversations_endpoint(
     lead_status: str | None = None,
     query: str | None = None,
 ):
-    return list_monitor_conversations(
+    return await list_monitor_conversations(
         limit=limit,
         offset=offset,
         channel=channel,
@@ -135,7 +135,7 @@ async def monitor_conversations_endpoint(
     response_model=MonitorConversationDetail,
 )
 async def monitor_conversation_detail_endpoint(conversation_id: str):
-    detail = get_monitor_conversation(conversation_id)
+    detail = await get_monitor_conversation(conversation_id)
     if not detail:
         raise HTTPException(status_code=404, detail="Conversation not found")
     return detail
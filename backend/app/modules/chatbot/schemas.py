@@ -27,6 +27,7 @@ class MessageSchema(BaseModel):
     content: str
     thinking: Optional[str] = None
     metadata: Optional[dict[str, Any]] = None
+    token_count: Optional[int] = None
     created_at: Optional[float] = None
 
 
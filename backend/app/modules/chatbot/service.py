@@ -1,9 +1,9 @@
 import json
 import re
-from collections.abc import Generator
+from collections.abc import AsyncGenerator
 
-from app.agents.memory import create_memory_agent
 from app.agents.memory.store import get_memory_summary
+from app.agents.memory.worker import enqueue_memory_summary
 from app.agents.planner import create_planner_agent
 from app.channels.media import build_testimony_markdown_images, looks_like_testimony_reply
 from app.modules.billing.service import compute_usage_cost, record_usage_event
@@ -74,15 +74,36 @@ def _maybe_append_testimony_images(text: str, stage: str) -> str:
 
 
 def _build_history(request: ChatRequest) -> list[dict]:
+    # Client-sent history is recounted by the planner; only stored counts are trusted.
     return [{"role": m.role, "content": m.content} for m in request.history]
 
 
-def chat(request: ChatRequest) -> ChatResponse:
+def _queue_memory_summary(request: ChatRequest, history: list[dict], reply: str) -> None:
+    """Hand the updated window to the background summarizer; never blocks the reply."""
+    messages = [{"role": m["role"], "content": m["content"]} for m in history] + [
+        {"role": "user", "content": request.message},
+        {"role": "assistant", "content": reply},
+    ]
+    try:
+        enqueue_memory_summary(
+            {
+                "action": "summarize",
+                "user_id": request.user_id,
+                "conversation_id": request.conversation_id,
+                "agent": "planner",
+                "messages": messages,
+            }
+        )
+    except Exception:
+        pass
+
+
+async def chat(request: ChatRequest) -> ChatResponse:
     planner = create_planner_agent()
     history = _build_history(request)
     memory_summary = None
     if request.user_id:
-        memory_summary = get_memory_summary(
+        memory_summary = await get_memory_summary(
             user_id=request.user_id,
             agent="planner",
             conversation_id=request.conversation_id,
@@ -93,7 +114,7 @@ def chat(request: ChatRequest) -> ChatResponse:
         "conversation_id": request.conversation_id,
         "memory_summary": memory_summary,
     }
-    result = planner.execute(request.message, history=history, context=context)
+    result = await planner.execute(request.message, history=history, context=context)
 
     # Inject cost into metadata (same as chat_stream path).
     meta = dict(result.metadata or {})
@@ -107,22 +128,7 @@ def chat(request: ChatRequest) -> ChatResponse:
     result.output = _maybe_append_testimony_images(result.output, stage)
 
     if request.user_id:
-        try:
-            memory_agent = create_memory_agent()
-            messages = history + [
-                {"role": "user", "content": request.message},
-                {"role": "assistant", "content": result.output},
-            ]
-            payload = {
-                "action": "summarize",
-                "user_id": request.user_id,
-                "conversation_id": request.conversation_id,
-                "agent": "planner",
-                "messages": messages,
-            }
-            memory_agent.execute(json.dumps(payload, ensure_ascii=True))
-        except Exception:
-            pass
+        _queue_memory_summary(request, history, result.output)
 
     return ChatResponse(
         status="success",
@@ -131,12 +137,12 @@ def chat(request: ChatRequest) -> ChatResponse:
     )
 
 
-def chat_stream(request: ChatRequest) -> Generator[str, None, None]:
+async def chat_stream(request: ChatRequest) -> AsyncGenerator[str, None]:
     planner = create_planner_agent()
     history = _build_history(request)
     memory_summary = None
     if request.user_id:
-        memory_summary = get_memory_summary(
+        memory_summary = await get_memory_summary(
             user_id=request.user_id,
             agent="planner",
             conversation_id=request.conversation_id,
@@ -150,7 +156,7 @@ def chat_stream(request: ChatRequest) -> Generator[str, None, None]:
     full_content = ""
     last_metadata = None
 
-    for event in planner.execute_stream(request.message, history=history, context=context):
+    async for event in planner.execute_stream(request.message, history=history, context=context):
         if event.get("type") == "content":
             full_content += event.get("content", "")
         if event.get("type") == "meta":
@@ -176,7 +182,7 @@ def chat_stream(request: ChatRequest) -> Generator[str, None, None]:
     # Record billing for streaming path
     if request.user_id and last_metadata:
         try:
-            record_usage_event(
+            await record_usage_event(
                 user_id=request.user_id,
                 conversation_id=request.conversation_id,
                 assistant_metadata=last_metadata,
@@ -185,64 +191,51 @@ def chat_stream(request: ChatRequest) -> Generator[str, None, None]:
             pass
 
     if request.user_id and full_content:
-        try:
-            memory_agent = create_memory_agent()
-            messages = history + [
-                {"role": "user", "content": request.message},
-                {"role": "assistant", "content": full_content},
-            ]
-            payload = {
-                "action": "summarize",
-                "user_id": request.user_id,
-                "conversation_id": request.conversation_id,
-                "agent": "planner",
-                "messages": messages,
-            }
-            memory_agent.execute(json.dumps(payload, ensure_ascii=True))
-        except Exception:
-            pass
+        _queue_memory_summary(request, history, full_content)
 
 
 # Conversation services.
-def create_conversation(user_id: str, title: str = "New Chat") -> dict:
-    return ChatRepository().create_conversation(user_id, title)
+async def create_conversation(user_id: str, title: str = "New Chat") -> dict:
+    return await ChatRepository().create_conversation(user_id, title)
 
 
-def list_conversations(user_id: str) -> list[dict]:
-    return ChatRepository().list_conversations(user_id)
+async def list_conversations(user_id: str) -> list[dict]:
+    return await ChatRepository().list_conversations(user_id)
 
 
-def get_conversation(user_id: str, conversation_id: str) -> dict | None:
-    return ChatRepository().get_conversation(user_id, conversation_id)
+async def get_conversation(user_id: str, conversation_id: str) -> dict | None:
+    return await ChatRepository().get_conversation(user_id, conversation_id)
 
 
-def delete_conversation(user_id: str, conversation_id: str) -> bool:
-    return ChatRepository().delete_conversation(user_id, conversation_id)
+async def delete_conversation(user_id: str, conversation_id: str) -> bool:
+    return await ChatRepository().delete_conversation(user_id, conversation_id)
 
 
-def update_conversation_title(user_id: str, conversation_id: str, title: str) -> bool:
-    return ChatRepository().update_conversation_title(user_id, conversation_id, title)
+async def update_conversation_title(user_id: str, conversation_id: str, title: str) -> bool:
+    return await ChatRepository().update_conversation_title(user_id, conversation_id, title)
 
 
-def save_messages(
+async def save_messages(
     user_id: str,
     conversation_id: str,
     user_message: str,
     assistant_content: str,
     assistant_thinking: str | None = None,
     assistant_metadata: dict | None = None,
+    user_messages: list[str] | None = None,
 ) -> bool:
-    saved = ChatRepository().save_messages(
+    saved = await ChatRepository().save_messages(
         user_id,
         conversation_id,
         user_message,
         assistant_content,
         assistant_thinking,
         assistant_metadata,
+        user_messages,
     )
     if saved and assistant_metadata:
         try:
-            record_usage_event(
+            await record_usage_event(
                 user_id=user_id,
                 conversation_id=conversation_id,
                 assistant_metadata=assistant_metadata,
@@ -252,20 +245,20 @@ def save_messages(
     return saved
 
 
-def list_history(
+async def list_history(
     user_id: str,
     conversation_id: str | None = None,
     limit: int = 100,
 ) -> list[dict]:
-    return ChatRepository().list_history(
+    return await ChatRepository().list_history(
         user_id=user_id,
         conversation_id=conversation_id,
         limit=limit,
     )
 
 
-def clear_history(user_id: str, conversation_id: str | None = None) -> int:
-    return ChatRepository().clear_history(
+async def clear_history(user_id: str, conversation_id: str | None = None) -> int:
+    return await ChatRepository().clear_history(
         user_id=user_id,
         conversation_id=conversation_id,
     )
@@ -376,7 +369,7 @@ def _build_monitor_payload(conversation: dict) -> dict:
     }
 
 
-def list_monitor_conversations(
+async def list_monitor_conversations(
     limit: int = 50,
     offset: int = 0,
     channel: str | None = None,
@@ -391,11 +384,11 @@ def list_monitor_conversations(
 
     repository = ChatRepository()
     # Pull a wider window then filter in memory.
-    base_rows = repository.list_conversations_global(limit=500, offset=0)
+    base_rows = await repository.list_conversations_global(limit=500, offset=0)
 
     monitored_rows = []
     for row in base_rows:
-        detail = repository.get_conversation_by_id(row["id"])
+        detail = await repository.get_conversation_by_id(row["id"])
         if not detail:
             continue
         monitored = _build_monitor_payload(detail)
@@ -425,9 +418,9 @@ def list_monitor_conversations(
     return monitored_rows[safe_offset : safe_offset + safe_limit]
 
 
-def get_monitor_conversation(conversation_id: str) -> dict | None:
+async def get_monitor_conversation(conversation_id: str) -> dict | None:
     repository = ChatRepository()
-    detail = repository.get_conversation_by_id(conversation_id)
+    detail = await repository.get_conversation_by_id(conversation_id)
     if not detail:
         return None
     monitored = _build_monitor_payload(detail)
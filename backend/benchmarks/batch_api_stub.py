@@ -0,0 +1,154 @@
+"""Local stand-in for the OpenAI files + batches API.
+
+Implements just enough of the API for ``app/core/llm/batch.py``:
+uploading a JSONL batch file, creating a batch, polling it and downloading
+the output file. Batches complete ``--complete-after`` seconds after they
+are created; each request is answered with a deterministic bullet list
+built from the last message, so the full defer -> submit -> poll -> write
+back cycle runs without network access or API keys.
+
+Usage (from backend/):
+
+    python -m benchmarks.batch_api_stub --port 8090
+    LLM_BATCH_BASE_URL=http://127.0.0.1:8090/v1 OPENAI_API_KEY=stub uvicorn app.main:app
+"""
+
+import argparse
+import json
+import time
+import uuid
+from email.parser import BytesParser
+from email.policy import HTTP
+
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import PlainTextResponse
+
+
+def _uploaded_file(body: bytes, content_type: str) -> tuple[bytes, str]:
+    """The ``file`` part and ``purpose`` field of a multipart upload."""
+    message = BytesParser(policy=HTTP).parsebytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("utf-8") + body
+    )
+    data, purpose = b"", "batch"
+    for part in message.iter_parts():
+        name = part.get_param("name", header="content-disposition")
+        if name == "file":
+            data = part.get_payload(decode=True) or b""
+        elif name == "purpose":
+            purpose = part.get_content().strip()
+    return data, purpose
+
+
+def _answer(body: dict) -> dict:
+    messages = body.get("messages") or []
+    last = str(messages[-1].get("content", "")) if messages else ""
+    text = f"- Ringkasan stub ({len(last)} karakter masukan)"
+    prompt_tokens = max(1, len(last) // 4)
+    return {
+        "id": f"chatcmpl-{uuid.uuid4().hex[:12]}",
+        "object": "chat.completion",
+        "created": int(time.time()),
+        "model": body.get("model", "stub"),
+        "choices": [{"index": 0, "message": {"role": "assistant", "content": text}, "finish_reason": "stop"}],
+        "usage": {"prompt_tokens": prompt_tokens, "completion_tokens": 8, "total_tokens": prompt_tokens + 8},
+    }
+
+
+def create_app(complete_after: float = 0.0) -> FastAPI:
+    app = FastAPI(title="Batch API stub")
+    files: dict[str, bytes] = {}
+    batches: dict[str, dict] = {}
+
+    def _file_object(file_id: str, purpose: str) -> dict:
+        return {
+            "id": file_id,
+            "object": "file",
+            "bytes": len(files[file_id]),
+            "created_at": int(time.time()),
+            "filename": f"{file_id}.jsonl",
+            "purpose": purpose,
+            "status": "processed",
+        }
+
+    def _batch_object(batch: dict) -> dict:
+        if batch["status"] == "in_progress" and time.time() - batch["created_at"] >= complete_after:
+            output_id = f"file-{uuid.uuid4().hex[:12]}"
+            lines = []
+            for line in files[batch["input_file_id"]].decode("utf-8").splitlines():
+                if not line.strip():
+                    continue
+                request = json.loads(line)
+                lines.append(
+                    json.dumps(
+                        {
+                            "id": uuid.uuid4().hex,
+                            "custom_id": request["custom_id"],
+                            "response": {"status_code": 200, "body": _answer(request["body"])},
+                        }
+                    )
+                )
+            files[output_id] = "\n".join(lines).encode("utf-8")
+            batch.update(status="completed", output_file_id=output_id, completed_at=int(time.time()))
+        return {
+            "id": batch["id"],
+            "object": "batch",
+            "endpoint": batch["endpoint"],
+            "input_file_id": batch["input_file_id"],
+            "completion_window": "24h",
+            "status": batch["status"],
+            "output_file_id": batch.get("output_file_id"),
+            "created_at": int(batch["created_at"]),
+            "completed_at": batch.get("completed_at"),
+        }
+
+    @app.post("/v1/files")
+    async def upload_file(request: Request):
+        # Parsed by hand so the stub does not need python-multipart.
+        data, purpose = _uploaded_file(await request.body(), request.headers.get("content-type", ""))
+        file_id = f"file-{uuid.uuid4().hex[:12]}"
+        files[file_id] = data
+        return _file_object(file_id, purpose)
+
+    @app.get("/v1/files/{file_id}/content")
+    async def file_content(file_id: str):
+        if file_id not in files:
+            raise HTTPException(status_code=404, detail="No such file")
+        return PlainTextResponse(files[file_id].decode("utf-8"))
+
+    @app.post("/v1/batches")
+    async def create_batch(request: Request):
+        payload = await request.json()
+        if payload.get("input_file_id") not in files:
+            raise HTTPException(status_code=400, detail="Unknown input_file_id")
+        batch_id = f"batch_{uuid.uuid4().hex[:12]}"
+        batches[batch_id] = {
+            "id": batch_id,
+            "endpoint": payload.get("endpoint"),
+            "input_file_id": payload["input_file_id"],
+            "status": "in_progress",
+            "created_at": time.time(),
+        }
+        return _batch_object(batches[batch_id])
+
+    @app.get("/v1/batches/{batch_id}")
+    async def retrieve_batch(batch_id: str):
+        if batch_id not in batches:
+            raise HTTPException(status_code=404, detail="No such batch")
+        return _batch_object(batches[batch_id])
+
+    return app
+
+
+def main() -> None:
+    import uvicorn
+
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8090)
+    parser.add_argument("--complete-after", type=float, default=5.0, help="seconds until a batch completes")
+    args = parser.parse_args()
+    uvicorn.run(create_app(args.complete_after), host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
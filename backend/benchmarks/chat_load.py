@@ -0,0 +1,193 @@
+"""Concurrent chat-turn load benchmark.
+
+Drives N simultaneous conversations against a running backend and reports
+turn latency plus the latency of a cheap "probe" endpoint sampled while the
+load is in flight. If the event loop is blocked by a turn, probe latency
+climbs to the turn latency; with the async pipeline it stays flat.
+
+Usage (from backend/):
+
+    python -m benchmarks.chat_load --base-url http://localhost:8002 \\
+        --conversations 300 --turns 3 --endpoint stream
+
+Run against a single uvicorn worker (no --workers) to measure per-worker
+concurrency.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+
+import httpx
+
+_MESSAGES = [
+    "Halo kak",
+    "Jerawatku lagi meradang di pipi, kulitnya berminyak",
+    "Sudah sekitar 3 bulan, pernah coba sabun biasa aja",
+    "Harganya berapa ya?",
+    "Ada testimoni yang real gak?",
+]
+
+
+def _percentile(values: list[float], pct: float) -> float:
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, int(round(pct / 100.0 * (len(ordered) - 1)))))
+    return ordered[index]
+
+
+def _summarize(label: str, values: list[float]) -> str:
+    if not values:
+        return f"{label}: no samples"
+    return (
+        f"{label}: n={len(values)} "
+        f"p50={_percentile(values, 50) * 1000:.0f}ms "
+        f"p95={_percentile(values, 95) * 1000:.0f}ms "
+        f"p99={_percentile(values, 99) * 1000:.0f}ms "
+        f"max={max(values) * 1000:.0f}ms "
+        f"mean={statistics.fmean(values) * 1000:.0f}ms"
+    )
+
+
+class _Stats:
+    def __init__(self):
+        self.turn_latencies: list[float] = []
+        self.first_token_latencies: list[float] = []
+        self.probe_latencies: list[float] = []
+        self.errors = 0
+
+
+async def _run_turn_blocking(client: httpx.AsyncClient, payload: dict, stats: _Stats) -> str:
+    started = time.perf_counter()
+    response = await client.post("/v1/chatbot/chat", json=payload)
+    response.raise_for_status()
+    stats.turn_latencies.append(time.perf_counter() - started)
+    return str(response.json().get("response") or "")
+
+
+async def _run_turn_stream(client: httpx.AsyncClient, payload: dict, stats: _Stats) -> str:
+    started = time.perf_counter()
+    first_token_at: float | None = None
+    content = ""
+    async with client.stream("POST", "/v1/chatbot/chat/stream", json=payload) as response:
+        response.raise_for_status()
+        async for line in response.aiter_lines():
+            if not line.startswith("data: "):
+                continue
+            event = json.loads(line[len("data: "):])
+            if event.get("type") == "content":
+                if first_token_at is None:
+                    first_token_at = time.perf_counter()
+                content += str(event.get("content") or "")
+    finished = time.perf_counter()
+    stats.turn_latencies.append(finished - started)
+    if first_token_at is not None:
+        stats.first_token_latencies.append(first_token_at - started)
+    return content
+
+
+async def _run_conversation(
+    client: httpx.AsyncClient,
+    index: int,
+    run_id: str,
+    turns: int,
+    endpoint: str,
+    stats: _Stats,
+) -> None:
+    user_id = f"bench-{run_id}-{index}"
+    try:
+        created = await client.post(f"/v1/chatbot/conversations/{user_id}", json={"title": "Benchmark"})
+        created.raise_for_status()
+        conversation_id = created.json()["id"]
+    except Exception:  # noqa: BLE001
+        stats.errors += 1
+        return
+
+    history: list[dict] = []
+    for turn in range(turns):
+        message = _MESSAGES[turn % len(_MESSAGES)]
+        payload = {
+            "message": message,
+            "history": history,
+            "user_id": user_id,
+            "conversation_id": conversation_id,
+        }
+        try:
+            if endpoint == "stream":
+                reply = await _run_turn_stream(client, payload, stats)
+            else:
+                reply = await _run_turn_blocking(client, payload, stats)
+        except Exception:  # noqa: BLE001
+            stats.errors += 1
+            return
+        history = history + [
+            {"role": "user", "content": message},
+            {"role": "assistant", "content": reply},
+        ]
+
+
+async def _probe(client: httpx.AsyncClient, interval: float, stop: asyncio.Event, stats: _Stats) -> None:
+    while not stop.is_set():
+        started = time.perf_counter()
+        try:
+            response = await client.get("/v1/admin/llm/options")
+            response.raise_for_status()
+            stats.probe_latencies.append(time.perf_counter() - started)
+        except Exception:  # noqa: BLE001
+            pass
+        try:
+            await asyncio.wait_for(stop.wait(), timeout=interval)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def run(args: argparse.Namespace) -> _Stats:
+    stats = _Stats()
+    run_id = uuid.uuid4().hex[:8]
+    limits = httpx.Limits(
+        max_connections=args.conversations + 8,
+        max_keepalive_connections=args.conversations + 8,
+    )
+    timeout = httpx.Timeout(args.timeout)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=timeout) as client:
+        stop = asyncio.Event()
+        probe_task = asyncio.create_task(_probe(client, args.probe_interval, stop, stats))
+        started = time.perf_counter()
+        await asyncio.gather(
+            *(
+                _run_conversation(client, index, run_id, args.turns, args.endpoint, stats)
+                for index in range(args.conversations)
+            )
+        )
+        elapsed = time.perf_counter() - started
+        stop.set()
+        await probe_task
+
+    completed = len(stats.turn_latencies)
+    print(f"run_id={run_id} endpoint={args.endpoint} conversations={args.conversations} turns={args.turns}")
+    print(f"completed_turns={completed} errors={stats.errors} wall={elapsed:.1f}s "
+          f"throughput={completed / elapsed if elapsed else 0.0:.1f} turns/s")
+    print(_summarize("turn latency", stats.turn_latencies))
+    if stats.first_token_latencies:
+        print(_summarize("time to first token", stats.first_token_latencies))
+    print(_summarize("event-loop probe", stats.probe_latencies))
+    return stats
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Concurrent chat-turn load benchmark.")
+    parser.add_argument("--base-url", default="http://localhost:8002")
+    parser.add_argument("--conversations", type=int, default=200)
+    parser.add_argument("--turns", type=int, default=3)
+    parser.add_argument("--endpoint", choices=("chat", "stream"), default="chat")
+    parser.add_argument("--probe-interval", type=float, default=0.25)
+    parser.add_argument("--timeout", type=float, default=120.0)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    asyncio.run(run(_parse_args()))
@@ -0,0 +1,124 @@
+"""Replay conversations through the memory summary policy.
+
+Counts how many memory-summary LLM calls a set of conversations would cost
+when summarizing after every exchange (the old behaviour) versus under a
+``SummaryPolicy``. The replay runs in virtual time from the user message
+timestamps, so it needs no LLM and no running server.
+
+Usage (from backend/):
+
+    # conversations stored in the app database
+    python -m benchmarks.memory_policy_replay --source db --limit 500
+
+    # a JSON file: [{"id": "...", "timestamps": [1700000000.0, ...]}, ...]
+    python -m benchmarks.memory_policy_replay --source file --path turns.json
+
+    # synthetic traffic (default)
+    python -m benchmarks.memory_policy_replay --conversations 1000
+"""
+
+import argparse
+import json
+import random
+
+from app.agents.memory.policy import SummaryPolicy
+from app.agents.planner.agent import PlannerAgent
+from app.core.config import settings
+
+
+def _load_db(limit: int) -> list[list[float]]:
+    from sqlmodel import Session, select
+
+    from app.core.database import app_engine
+    from app.modules.chatbot.models import ConversationMessage
+
+    conversations: dict[str, list[float]] = {}
+    with Session(app_engine) as session:
+        rows = session.exec(
+            select(ConversationMessage.conversation_id, ConversationMessage.created_at)
+            .where(ConversationMessage.role == "user")
+            .order_by(ConversationMessage.conversation_id, ConversationMessage.created_at)
+        ).all()
+    for conversation_id, created_at in rows:
+        if conversation_id not in conversations and len(conversations) >= limit:
+            continue
+        conversations.setdefault(conversation_id, []).append(float(created_at))
+    return list(conversations.values())
+
+
+def _load_file(path: str) -> list[list[float]]:
+    with open(path, encoding="utf-8") as handle:
+        data = json.load(handle)
+    return [sorted(float(ts) for ts in item.get("timestamps") or []) for item in data]
+
+
+def _synthetic(count: int, seed: int) -> list[list[float]]:
+    rng = random.Random(seed)
+    conversations = []
+    for _ in range(count):
+        turns = max(1, int(rng.expovariate(1 / 7)))
+        now = 0.0
+        timestamps = []
+        for _ in range(turns):
+            # Mostly quick back-and-forth, occasionally the user walks away.
+            now += rng.uniform(5, 40) if rng.random() < 0.85 else rng.uniform(180, 3600)
+            timestamps.append(now)
+        conversations.append(timestamps)
+    return conversations
+
+
+def replay(conversations: list[list[float]], policy: SummaryPolicy) -> dict:
+    triggers = {"turns": 0, "window": 0, "idle": 0}
+    turns_total = 0
+    for timestamps in conversations:
+        pending = 0
+        for index, ts in enumerate(timestamps):
+            turns_total += 1
+            pending += 1
+            trigger = policy.decide(pending)
+            if trigger is None:
+                next_ts = timestamps[index + 1] if index + 1 < len(timestamps) else None
+                # The idle timer fires before the next message, or after the last one.
+                if next_ts is None or next_ts - ts >= policy.idle_seconds:
+                    trigger = "idle"
+            if trigger is not None:
+                triggers[trigger] += 1
+                pending = 0
+    calls = sum(triggers.values())
+    saved = turns_total - calls
+    return {
+        "conversations": len(conversations),
+        "baseline_calls": turns_total,
+        "policy_calls": calls,
+        "saved_calls": saved,
+        "saved_pct": round(100.0 * saved / turns_total, 1) if turns_total else 0.0,
+        "triggers": triggers,
+    }
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Replay conversations through the memory summary policy.")
+    parser.add_argument("--source", choices=("synthetic", "file", "db"), default="synthetic")
+    parser.add_argument("--path", default="")
+    parser.add_argument("--limit", type=int, default=1000)
+    parser.add_argument("--conversations", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--every-n-turns", type=int, default=settings.MEMORY_SUMMARY_EVERY_N_TURNS)
+    parser.add_argument("--idle-seconds", type=float, default=settings.MEMORY_SUMMARY_IDLE_SECONDS)
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = _parse_args()
+    if args.source == "db":
+        data = _load_db(args.limit)
+    elif args.source == "file":
+        data = _load_file(args.path)
+    else:
+        data = _synthetic(args.conversations, args.seed)
+    policy = SummaryPolicy(
+        every_n_turns=args.every_n_turns,
+        idle_seconds=args.idle_seconds,
+        history_limit=PlannerAgent._MAX_HISTORY,
+    )
+    print(json.dumps(replay(data, policy), indent=2))
@@ -0,0 +1,61 @@
+"""Per-turn system prompt assembly microbenchmark.
+
+Compares rendering the planner system prompt from scratch on every turn
+(resolve both prompts, substitute ``{product_knowledge}``) with the
+memoized path that reuses the rendered prompt until an admin edit bumps
+the cache version, and only appends the memory section per turn.
+
+Usage (from backend/):
+
+    python -m benchmarks.prompt_assembly --iterations 20000
+    python -m benchmarks.prompt_assembly --offline   # seeded defaults, no DB
+"""
+
+import argparse
+import timeit
+
+from app.agents.planner.agent import PlannerAgent
+from app.modules.admin import service as admin_service
+
+_MEMORY = "User berjerawat meradang di pipi, kulit berminyak, sudah 3 bulan, tertarik promo."
+
+
+def _per_call_us(fn, iterations: int) -> float:
+    timer = timeit.Timer(fn)
+    best = min(timer.repeat(repeat=5, number=iterations))
+    return best / iterations * 1e6
+
+
+def run(args: argparse.Namespace) -> None:
+    if args.offline:
+        admin_service._load_overrides = lambda: ({}, {})
+
+    planner = PlannerAgent.__new__(PlannerAgent)
+
+    def uncached() -> list[dict]:
+        return [
+            {"role": "system", "content": PlannerAgent._render_static_prompt()},
+            {"role": "system", "content": f"## Konteks Sesi Sebelumnya\n{_MEMORY}"},
+        ]
+
+    def memoized() -> list[dict]:
+        return planner._build_system_messages(_MEMORY)
+
+    assert uncached() == memoized()
+    prompt_chars = sum(len(message["content"]) for message in memoized())
+    render_us = _per_call_us(uncached, args.iterations)
+    cached_us = _per_call_us(memoized, args.iterations)
+    print(f"system prompt: {prompt_chars} chars")
+    print(f"render every turn: {render_us:.2f} us/turn")
+    print(f"memoized:          {cached_us:.2f} us/turn ({render_us / cached_us:.1f}x faster)")
+
+
+def _parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="System prompt assembly microbenchmark.")
+    parser.add_argument("--iterations", type=int, default=20000)
+    parser.add_argument("--offline", action="store_true", help="Use seeded prompt defaults instead of the DB.")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    run(_parse_args())
@@ -0,0 +1,89 @@
+import asyncio
+import json
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.agents.memory.agent import MemoryAgent
+from app.core.llm.schemas import LLMResponse
+
+_PROMPTS = {
+    "memory_summarize_system": "system",
+    "memory_summarize_user": "FULL {messages}",
+    "memory_update_user": "UPDATE {summary} || {messages}",
+}
+
+
+class _RecordingLLM:
+    def __init__(self):
+        self.prompts: list[str] = []
+
+    async def agenerate(self, messages, config=None):
+        self.prompts.append(messages[-1]["content"])
+        return LLMResponse(text=f"summary-{len(self.prompts)}", usage={})
+
+
+class _MemoryTable:
+    def __init__(self):
+        self.row = None
+
+    async def get(self, **kwargs):
+        return self.row
+
+    async def upsert(self, user_id, summary, agent, conversation_id, watermark, summarized_messages):
+        self.row = SimpleNamespace(
+            summary=summary,
+            summary_watermark=watermark,
+            summarized_messages=summarized_messages,
+        )
+        return self.row
+
+
+def _turns(count: int) -> list[dict]:
+    messages = []
+    for index in range(count):
+        messages.append({"role": "user", "content": f"pesan {index}"})
+        messages.append({"role": "assistant", "content": f"balasan {index}"})
+    return messages
+
+
+def _summarize(agent: MemoryAgent, messages: list[dict]):
+    payload = {"action": "summarize", "user_id": "u1", "conversation_id": "c1", "messages": messages}
+    return asyncio.run(agent.execute(json.dumps(payload)))
+
+
+def test_second_turn_sends_only_new_messages_with_previous_summary():
+    llm = _RecordingLLM()
+    table = _MemoryTable()
+    agent = MemoryAgent(llm=llm)
+
+    with patch("app.agents.memory.agent.resolve_prompt", side_effect=_PROMPTS.get), \
+            patch("app.agents.memory.agent.resolve_config", return_value="incremental"), \
+            patch("app.agents.memory.agent.get_memory", side_effect=table.get), \
+            patch("app.agents.memory.agent.upsert_memory_summary", side_effect=table.upsert):
+        first = _summarize(agent, _turns(3))
+        second = _summarize(agent, _turns(4))
+        unchanged = _summarize(agent, _turns(4))
+
+    assert first.metadata["mode"] == "full"
+    assert second.metadata["mode"] == "incremental"
+    assert llm.prompts[1].startswith("UPDATE summary-1 || ")
+    assert json.loads(llm.prompts[1].split(" || ", 1)[1]) == _turns(4)[-2:]
+    assert table.row.summarized_messages == 8
+    assert unchanged.metadata["mode"] == "unchanged"
+    assert len(llm.prompts) == 2
+
+
+def test_falls_back_to_full_summary_when_watermark_left_the_window():
+    llm = _RecordingLLM()
+    table = _MemoryTable()
+    table.row = SimpleNamespace(summary="old", summary_watermark="not-in-window", summarized_messages=4)
+    agent = MemoryAgent(llm=llm)
+
+    with patch("app.agents.memory.agent.resolve_prompt", side_effect=_PROMPTS.get), \
+            patch("app.agents.memory.agent.resolve_config", return_value="incremental"), \
+            patch("app.agents.memory.agent.get_memory", side_effect=table.get), \
+            patch("app.agents.memory.agent.upsert_memory_summary", side_effect=table.upsert):
+        result = _summarize(agent, _turns(2))
+
+    assert result.metadata["mode"] == "full"
+    assert llm.prompts[0].startswith("FULL ")
@@ -0,0 +1,51 @@
+import asyncio
+
+from app.agents.base import AgentResult
+from app.agents.memory.policy import SummaryPolicy
+from app.agents.memory.worker import MemorySummaryWorker
+
+
+def _payload(text: str) -> dict:
+    return {
+        "action": "summarize",
+        "user_id": "web-user",
+        "conversation_id": "c1",
+        "agent": "planner",
+        "messages": [{"role": "user", "content": text}],
+    }
+
+
+def test_policy_triggers_on_turns_and_window():
+    policy = SummaryPolicy(every_n_turns=4, history_limit=15)
+    assert [policy.decide(turns) for turns in range(1, 5)] == [None, None, None, "turns"]
+
+    narrow = SummaryPolicy(every_n_turns=10, history_limit=6)
+    assert narrow.decide(2) is None
+    assert narrow.decide(3) == "window"
+
+
+def test_worker_defers_until_turn_threshold_then_flushes_idle():
+    seen: list[str] = []
+
+    async def runner(payload: dict) -> AgentResult:
+        seen.append(payload["messages"][0]["content"])
+        return AgentResult(output="ok")
+
+    async def scenario():
+        worker = MemorySummaryWorker(
+            concurrency=1,
+            policy=SummaryPolicy(every_n_turns=3, idle_seconds=0.05),
+            runner=runner,
+        )
+        for text in ("t1", "t2", "t3", "t4"):
+            worker.submit(_payload(text))
+        await asyncio.sleep(0.1)
+        await worker.stop()
+        return worker.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert seen == ["t3", "t4"]
+    assert stats["trigger_turns"] == 1
+    assert stats["trigger_idle"] == 1
+    assert stats["deferred"] == 3
@@ -0,0 +1,73 @@
+import asyncio
+
+from app.agents.base import AgentResult
+from app.agents.memory.worker import MemorySummaryWorker
+
+
+def _payload(conversation_id: str, text: str) -> dict:
+    return {
+        "action": "summarize",
+        "user_id": "web-user",
+        "conversation_id": conversation_id,
+        "agent": "planner",
+        "messages": [{"role": "user", "content": text}],
+    }
+
+
+def test_newer_window_replaces_queued_job_for_same_conversation():
+    seen: list[str] = []
+
+    async def runner(payload: dict) -> AgentResult:
+        seen.append(payload["messages"][0]["content"])
+        return AgentResult(output="ok")
+
+    async def scenario():
+        worker = MemorySummaryWorker(concurrency=1, runner=runner)
+        worker.submit(_payload("c1", "first"))
+        worker.submit(_payload("c1", "second"))
+        worker.submit(_payload("c2", "other"))
+        await worker.stop()
+        return worker.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert seen == ["second", "other"]
+    assert stats["coalesced"] == 1
+    assert stats["completed"] == 2
+
+
+def test_retries_then_counts_failure():
+    attempts = 0
+
+    async def runner(payload: dict) -> AgentResult:
+        nonlocal attempts
+        attempts += 1
+        raise RuntimeError("provider down")
+
+    async def scenario():
+        worker = MemorySummaryWorker(concurrency=1, max_attempts=3, retry_backoff_seconds=0, runner=runner)
+        worker.submit(_payload("c1", "hi"))
+        await worker.stop()
+        return worker.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert attempts == 3
+    assert stats["retried"] == 2
+    assert stats["failed"] == 1
+
+
+def test_full_queue_drops_new_conversations():
+    async def runner(payload: dict) -> AgentResult:
+        return AgentResult(output="ok")
+
+    async def scenario():
+        worker = MemorySummaryWorker(concurrency=1, max_queue_size=1, runner=runner)
+        accepted = [worker.submit(_payload(f"c{i}", "hi")) for i in range(3)]
+        await worker.stop()
+        return accepted, worker.stats()
+
+    accepted, stats = asyncio.run(scenario())
+
+    assert accepted == [True, False, False]
+    assert stats["dropped"] == 2
@@ -0,0 +1,65 @@
+import asyncio
+
+from app.agents.planner import fast_answers
+from app.agents.planner.agent import PlannerAgent
+from app.agents.planner.fast_answers import (
+    FastAnswerIndex,
+    parse_fast_answers,
+    parse_product_facts,
+    render_fast_answers,
+)
+from app.modules.admin.seed import DEFAULT_PROMPTS
+from app.modules.billing.service import compute_usage_cost
+
+_SEEDED = next(p["content"] for p in DEFAULT_PROMPTS if p["slug"] == "fast_answers")
+
+
+def test_only_short_single_intent_early_questions_match():
+    index = FastAnswerIndex(parse_fast_answers(_SEEDED), max_words=8, max_turn=3)
+
+    assert index.match("Kak, harganya berapa?").intent == "harga"
+    assert index.match("ini udah BPOM belum").intent == "bpom"
+    assert index.match("cara pakainya gimana kak").intent == "cara_pakai"
+    # Two intents, a keyword inside another word, a long story, a late turn.
+    assert index.match("harga sama ongkir ke bandung berapa") is None
+    assert index.match("pricey banget ga") is None
+    assert index.match("aku udah coba banyak sabun tapi jerawatnya makin parah, harganya berapa") is None
+    late = [{"role": "user", "content": "hai"}, {"role": "assistant", "content": "haii"}] * 3
+    assert index.match("halal gak?", late) is None
+
+
+def test_planner_serves_fast_answer_without_calling_the_llm(monkeypatch):
+    class FailingLLM:
+        async def agenerate(self, *args, **kwargs):
+            raise AssertionError("LLM must not be called")
+
+    index = FastAnswerIndex(parse_fast_answers("halal | halal | Sudah Halal MUI kak."))
+    monkeypatch.setattr(fast_answers, "fast_answer_index", lambda: index)
+    monkeypatch.setattr(PlannerAgent, "_static_system_prompt", classmethod(lambda cls: "Jual serum."))
+    monkeypatch.setattr(PlannerAgent, "_history_token_budget", staticmethod(lambda *_: 0))
+    monkeypatch.setattr(
+        PlannerAgent, "_resolve_llm_identity", staticmethod(lambda: ("openai", "gpt-4o-mini"))
+    )
+
+    result = asyncio.run(PlannerAgent(FailingLLM()).execute("halal?"))
+
+    assert result.output == "Sudah Halal MUI kak."
+    assert result.metadata["model"] == {"provider": "fast_answer", "name": "halal"}
+    assert result.metadata["usage"]["total_tokens"] == 0
+    cost = compute_usage_cost(result.metadata)
+    assert cost["total_cost_usd"] == 0
+    assert cost["fast_answer_savings_usd"] > 0
+
+
+def test_answers_quote_the_current_product_knowledge():
+    entries = parse_fast_answers(_SEEDED)
+    edited = "Nama: Serum\nHarga: Rp99.000 | Kemasan: 50 g\nBPOM: NA1 | Halal MUI: H1\n\nCara pakai:\nPakai pagi"
+
+    answers = {entry.intent: entry.answer for entry in render_fast_answers(entries, parse_product_facts(edited))}
+
+    assert "Rp99.000" in answers["harga"] and "50 g" in answers["harga"]
+    assert answers["bpom"].endswith("NA1.")
+    assert "Pakai pagi" in answers["cara_pakai"]
+    # Facts the product data no longer has send the question to the LLM instead.
+    without_halal = render_fast_answers(entries, parse_product_facts("Harga: Rp99.000 | Kemasan: 50 g"))
+    assert "halal" not in {entry.intent for entry in without_halal}
@@ -0,0 +1,50 @@
+from app.agents.planner import agent as planner_module
+from app.agents.planner.agent import PlannerAgent
+from app.modules.admin import service as admin_service
+
+
+def test_static_prompt_is_rendered_once_per_cache_version(monkeypatch):
+    calls: list[str] = []
+    prompts = {"product_knowledge": "Serum A", "sales_system": "Jual: {product_knowledge}"}
+
+    def fake_resolve_prompt(slug: str) -> str:
+        calls.append(slug)
+        return prompts[slug]
+
+    monkeypatch.setattr(planner_module, "resolve_prompt", fake_resolve_prompt)
+    monkeypatch.setattr(PlannerAgent, "_static_prompt", None)
+    planner = PlannerAgent.__new__(PlannerAgent)
+
+    first = planner._build_system_messages("suka promo")
+    second = planner._build_system_messages(None)
+    assert first[0] == {"role": "system", "content": "Jual: Serum A"}
+    assert "suka promo" in first[1]["content"]
+    assert second == [first[0]]
+    assert len(calls) == 2
+
+    prompts["product_knowledge"] = "Serum B"
+    monkeypatch.setattr(admin_service, "_read_overrides", lambda: ({}, {}))
+    monkeypatch.setattr(admin_service, "_config_overrides", None)
+    monkeypatch.setattr(admin_service, "_prompt_overrides", None)
+    admin_service.refresh_cache()
+    assert planner._build_system_messages(None)[0]["content"] == "Jual: Serum B"
+    assert len(calls) == 4
+
+
+def test_history_budget_falls_back_to_default_unless_explicitly_zero(monkeypatch):
+    default = PlannerAgent._DEFAULT_HISTORY_TOKEN_BUDGET
+    for raw, expected in [("", default), ("abc", default), ("0", 0), ("500", 500)]:
+        monkeypatch.setattr(planner_module, "resolve_config", lambda group, key, raw=raw: raw)
+        assert PlannerAgent._history_token_budget() == expected
+
+
+def test_history_budget_prefers_the_planner_model_entry(monkeypatch):
+    configs = {
+        "history_token_budget": "2000",
+        "history_token_budgets": '{"openai:gpt-5-mini": 4000, "anthropic": 3000}',
+    }
+    monkeypatch.setattr(planner_module, "resolve_config", lambda group, key: configs.get(key, ""))
+
+    assert PlannerAgent._history_token_budget("openai", "gpt-5-mini") == 4000
+    assert PlannerAgent._history_token_budget("anthropic", "claude-sonnet-4-0") == 3000
+    assert PlannerAgent._history_token_budget("openai", "gpt-5.2") == 2000
@@ -0,0 +1,31 @@
+from app.agents.planner.agent import PlannerAgent, ThinkTagStreamFilter
+
+
+def _run(chunks: list[str]) -> str:
+    think_filter = ThinkTagStreamFilter()
+    output = "".join(think_filter.feed(chunk) for chunk in chunks)
+    return output + think_filter.flush()
+
+
+def test_matches_blocking_strip_for_tags_split_across_chunks():
+    text = "  <think>menimbang kondisi kulit</think>\n\nHaii! Ada yang bisa aku bantu?  \n"
+    chunks = [text[i: i + 3] for i in range(0, len(text), 3)]
+
+    assert _run(chunks) == PlannerAgent._strip_think_tags(text).strip()
+
+
+def test_emits_visible_text_before_stream_ends():
+    think_filter = ThinkTagStreamFilter()
+
+    assert think_filter.feed("<think>x</think>Halo ") == "Halo"
+    assert think_filter.feed("kak") == " kak"
+    assert think_filter.feed("!  ") == "!"
+    assert think_filter.flush() == ""
+
+
+def test_keeps_text_that_only_looks_like_a_tag_prefix():
+    assert _run(["harga <", "b>promo</b>"]) == "harga <b>promo</b>"
+
+
+def test_drops_unterminated_think_block():
+    assert _run(["Halo", "<think>masih mikir"]) == "Halo"
@@ -0,0 +1,81 @@
+import asyncio
+
+from app.channels.dispatcher import SenderDispatcher
+
+
+def test_keeps_order_per_sender_and_runs_senders_in_parallel():
+    events: list[tuple[str, str]] = []
+
+    async def handler(item: dict) -> None:
+        events.append(("start", item["text"]))
+        await asyncio.sleep(item["delay"])
+        events.append(("end", item["text"]))
+
+    async def scenario():
+        dispatcher = SenderDispatcher("test", handler, concurrency=4)
+        dispatcher.submit("slow", {"text": "a1", "delay": 0.05})
+        dispatcher.submit("slow", {"text": "a2", "delay": 0})
+        dispatcher.submit("fast", {"text": "b1", "delay": 0})
+        await dispatcher.stop()
+        return dispatcher.stats()
+
+    stats = asyncio.run(scenario())
+
+    finished = [text for kind, text in events if kind == "end"]
+    # The fast sender is not held up behind the slow one...
+    assert finished.index("b1") < finished.index("a1")
+    # ...while the slow sender's messages stay in order.
+    assert finished.index("a1") < finished.index("a2")
+    assert events.index(("end", "a1")) < events.index(("start", "a2"))
+    assert stats["completed"] == 3
+
+
+def test_concurrency_bounds_parallel_senders():
+    running = 0
+    peak = 0
+
+    async def handler(item: dict) -> None:
+        nonlocal running, peak
+        running += 1
+        peak = max(peak, running)
+        await asyncio.sleep(0.01)
+        running -= 1
+
+    async def scenario():
+        dispatcher = SenderDispatcher("test", handler, concurrency=2)
+        for index in range(6):
+            dispatcher.submit(f"sender-{index}", {})
+        await dispatcher.stop()
+        return dispatcher.stats()
+
+    stats = asyncio.run(scenario())
+
+    assert peak == 2
+    assert stats["peak_running"] == 2
+    assert stats["completed"] == 6
+
+
+def test_rejects_past_sender_and_queue_limits():
+    async def handler(item: dict) -> None:
+        if item.get("fail"):
+            raise RuntimeError("boom")
+
+    async def scenario():
+        dispatcher = SenderDispatcher("test", handler, max_per_sender=2, max_pending=3)
+        accepted = [
+            dispatcher.submit("a", {"fail": True}),
+            dispatcher.submit("a", {}),
+            dispatcher.submit("a", {}),
+            dispatcher.submit("b", {}),
+            dispatcher.submit("c", {}),
+        ]
+        await dispatcher.stop()
+        return accepted, dispatcher.stats()
+
+    accepted, stats = asyncio.run(scenario())
+
+    assert accepted == [True, True, False, True, False]
+    assert stats["rejected_sender_full"] == 1
+    assert stats["rejected_queue_full"] == 1
+    assert stats["failed"] == 1
+    assert stats["completed"] == 2
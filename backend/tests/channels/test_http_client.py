@@ -0,0 +1,47 @@
+import asyncio
+
+from app.channels.http import ChannelHttpClient
+
+
+async def _serve_keepalive(reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+    # Minimal HTTP/1.1 server that keeps the connection open between requests.
+    while True:
+        try:
+            head = await reader.readuntil(b"\r\n\r\n")
+        except (asyncio.IncompleteReadError, ConnectionError):
+            break
+        length = 0
+        for line in head.decode("latin-1").split("\r\n"):
+            if line.lower().startswith("content-length:"):
+                length = int(line.split(":", 1)[1])
+        await reader.readexactly(length)
+        body = b'{"ok": true}'
+        writer.write(
+            b"HTTP/1.1 200 OK\r\nContent-Type: application/json\r\n"
+            + f"Content-Length: {len(body)}\r\n\r\n".encode("latin-1")
+            + body
+        )
+        await writer.drain()
+    writer.close()
+
+
+def test_requests_reuse_one_pooled_connection():
+    async def scenario():
+        server = await asyncio.start_server(_serve_keepalive, "127.0.0.1", 0)
+        port = server.sockets[0].getsockname()[1]
+        client = ChannelHttpClient("test")
+        try:
+            for _ in range(3):
+                response = await client.post(f"http://127.0.0.1:{port}/messages", json={"to": "62811"})
+                assert response.json() == {"ok": True}
+            return client.stats()
+        finally:
+            await client.aclose()
+            server.close()
+
+    stats = asyncio.run(scenario())
+
+    assert stats["requests"] == 3
+    assert stats["connections_opened"] == 1
+    assert stats["reused_requests"] == 2
+    assert stats["reuse_rate"] == 0.6667
@@ -0,0 +1,63 @@
+import asyncio
+
+from app.channels import idempotency
+from app.channels.idempotency import MemoryIdempotencyStore
+
+
+def test_memory_store_rejects_repeats_until_the_key_expires(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(idempotency.time, "time", lambda: now[0])
+
+    async def scenario():
+        store = MemoryIdempotencyStore(ttl_seconds=60)
+        results = [await store.claim("whatsapp:a"), await store.claim("whatsapp:a"), await store.claim("whatsapp:b")]
+        now[0] += 61
+        results.append(await store.claim("whatsapp:a"))
+        return results, store.stats()
+
+    results, stats = asyncio.run(scenario())
+
+    assert results == [True, False, True, True]
+    assert stats["duplicates"] == 1
+    # Both old keys expired from the front; only the re-claimed one is left.
+    assert stats["expired"] == 2
+    assert stats["entries"] == 1
+
+
+def test_memory_store_evicts_oldest_keys_past_capacity():
+    async def scenario():
+        store = MemoryIdempotencyStore(ttl_seconds=60, max_entries=2)
+        for key in ("a", "b", "c"):
+            await store.claim(key)
+        return await store.claim("a"), await store.claim("c"), store.stats()
+
+    first_again, last_again, stats = asyncio.run(scenario())
+
+    assert first_again is True
+    assert last_again is False
+    assert stats["evicted"] == 2
+
+
+def test_rejected_whatsapp_message_is_released_for_the_retry(monkeypatch):
+    from app.channels.common import InboundCoalescer
+    from app.channels.whatsapp import service as whatsapp_service
+
+    accept = [False]
+    monkeypatch.setattr(idempotency, "inbound_idempotency", MemoryIdempotencyStore(ttl_seconds=60))
+    monkeypatch.setattr(whatsapp_service, "inbound_coalescer", InboundCoalescer(window_seconds=0))
+    monkeypatch.setattr(whatsapp_service.whatsapp_dispatcher, "submit", lambda sender, item: accept[0])
+    message = {"from": "62811", "id": "wamid.r1", "type": "text", "text": {"body": "halo"}}
+    payload = {"entry": [{"changes": [{"value": {"messages": [message]}}]}]}
+
+    async def scenario():
+        rejected = await whatsapp_service.dispatch_webhook(payload)
+        await asyncio.sleep(0)  # let the claim release run
+        accept[0] = True
+        retried = await whatsapp_service.dispatch_webhook(payload)
+        return rejected, retried
+
+    rejected, retried = asyncio.run(scenario())
+
+    assert rejected["rejected"] == 1
+    assert retried["queued"] == 1
+    assert idempotency.inbound_idempotency.stats()["released"] == 1
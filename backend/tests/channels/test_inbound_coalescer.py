@@ -0,0 +1,86 @@
+import asyncio
+
+from app.channels.common import InboundCoalescer
+
+
+def test_quick_messages_become_one_turn():
+    async def scenario():
+        coalescer = InboundCoalescer(window_seconds=0.05, max_wait_seconds=1.0)
+
+        async def later(delay: float, text: str):
+            await asyncio.sleep(delay)
+            return await coalescer.collect("chat", text)
+
+        results = await asyncio.gather(
+            coalescer.collect("chat", "kak"),
+            later(0.02, "kulitku berminyak"),
+            later(0.04, "cocok ga ya?"),
+            coalescer.collect("other", "halo"),
+        )
+        return results, coalescer.stats()
+
+    results, stats = asyncio.run(scenario())
+
+    assert results == [["kak", "kulitku berminyak", "cocok ga ya?"], None, None, ["halo"]]
+    assert stats["turns"] == 2
+    assert stats["merged_messages"] == 2
+    assert stats["open_bursts"] == 0
+
+
+def test_burst_is_flushed_at_max_messages_and_zero_window_disables_merging():
+    flushed: list[list[str]] = []
+
+    async def scenario():
+        capped = InboundCoalescer(window_seconds=10.0, max_messages=2)
+        capped.add("chat", "a", flushed.append)
+        capped.add("chat", "b", flushed.append)
+        capped.add("chat", "c", flushed.append)
+        capped.flush_all()
+
+        disabled = InboundCoalescer(window_seconds=0)
+        return [await disabled.collect("chat", "x"), await disabled.collect("chat", "y")]
+
+    passthrough = asyncio.run(scenario())
+
+    assert flushed == [["a", "b"], ["c"]]
+    assert passthrough == [["x"], ["y"]]
+
+
+def test_rejected_bursts_are_counted():
+    coalescer = InboundCoalescer(window_seconds=0)
+
+    async def scenario():
+        coalescer.add("chat", "a", lambda items: False)
+        coalescer.add("chat", "b", lambda items: True)
+
+    asyncio.run(scenario())
+    stats = coalescer.stats()
+
+    assert stats["turns"] == 2
+    assert stats["rejected_turns"] == 1
+    assert stats["rejected_messages"] == 1
+
+
+def test_whatsapp_webhook_counts_only_queued_messages(monkeypatch):
+    from app.channels.whatsapp import service as whatsapp_service
+
+    submitted: list[dict] = []
+
+    def submit(sender: str, item: dict) -> bool:
+        submitted.append(item)
+        return len(submitted) == 1  # the lane is full after the first message
+
+    async def first_delivery(channel: str, message_key: str) -> bool:
+        return True
+
+    monkeypatch.setattr(whatsapp_service, "inbound_coalescer", InboundCoalescer(window_seconds=0))
+    monkeypatch.setattr(whatsapp_service, "claim_inbound", first_delivery)
+    monkeypatch.setattr(whatsapp_service.whatsapp_dispatcher, "submit", submit)
+
+    def message(message_id: str) -> dict:
+        return {"from": "62811", "id": message_id, "type": "text", "text": {"body": "halo"}}
+
+    payload = {"entry": [{"changes": [{"value": {"messages": [message("wamid.q1"), message("wamid.q2")]}}]}]}
+    counts = asyncio.run(whatsapp_service.dispatch_webhook(payload))
+
+    assert counts == {"queued": 1, "coalescing": 0, "rejected": 1}
@@ -0,0 +1,62 @@
+import asyncio
+
+from app.channels.typing import TypingHeartbeat, TypingScheduler
+
+
+def test_one_scheduler_task_refreshes_every_active_chat():
+    sent: list[str] = []
+
+    def sender(chat: str):
+        async def send():
+            sent.append(chat)
+
+        return send
+
+    async def scenario():
+        scheduler = TypingScheduler()
+        tasks_before = len(asyncio.all_tasks())
+
+        async def converse(chat: str):
+            async with TypingHeartbeat(chat, "test", sender(chat), 0.05, 0, scheduler=scheduler):
+                await asyncio.sleep(0.12)
+
+        conversations = [asyncio.create_task(converse(f"chat-{i}")) for i in range(20)]
+        await asyncio.sleep(0.01)
+        # 20 conversations, but only the scheduler loop (and its wake-up wait) on top of them.
+        extra_tasks = len(asyncio.all_tasks()) - tasks_before - len(conversations)
+        await asyncio.gather(*conversations)
+        await asyncio.sleep(0.01)
+        return extra_tasks, scheduler.stats()
+
+    extra_tasks, stats = asyncio.run(scenario())
+
+    assert extra_tasks <= 2
+    assert stats["active_chats"] == 0
+    assert not stats["running"]
+    for index in range(20):
+        # Immediately on enter, then roughly every 50ms for 120ms.
+        assert 2 <= sent.count(f"chat-{index}") <= 4
+
+
+def test_overlapping_heartbeats_for_one_chat_share_an_entry():
+    sent = 0
+
+    async def send():
+        nonlocal sent
+        sent += 1
+
+    async def scenario():
+        scheduler = TypingScheduler()
+        async with TypingHeartbeat("chat", "test", send, 10.0, 0, scheduler=scheduler):
+            async with TypingHeartbeat("chat", "test", send, 0.05, 0, scheduler=scheduler):
+                await asyncio.sleep(0.08)
+            inner_done = sent
+            await asyncio.sleep(0.1)
+        return inner_done, scheduler.stats()
+
+    inner_done, stats = asyncio.run(scenario())
+
+    # One send on enter plus the faster inner refresh; back to the slow interval afterwards.
+    assert inner_done == 2
+    assert sent == 2
+    assert stats["shared"] == 1
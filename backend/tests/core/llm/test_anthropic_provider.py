@@ -0,0 +1,40 @@
+from types import SimpleNamespace
+
+from app.core.llm.providers.anthropic import AnthropicProvider
+
+
+def test_static_system_prompt_is_a_cache_breakpoint():
+    provider = AnthropicProvider(api_key="test", model="claude-sonnet-4-20250514")
+
+    params = provider._request_params(
+        [
+            {"role": "system", "content": "sales prompt"},
+            {"role": "system", "content": "memory"},
+            {"role": "user", "content": "halo"},
+        ],
+        None,
+    )
+
+    assert params["system"] == [
+        {"type": "text", "text": "sales prompt", "cache_control": {"type": "ephemeral"}},
+        {"type": "text", "text": "memory"},
+    ]
+    assert params["messages"] == [{"role": "user", "content": "halo"}]
+
+
+def test_usage_folds_cache_reads_and_writes_into_prompt_tokens():
+    response = SimpleNamespace(
+        content=[SimpleNamespace(text="ok")],
+        usage=SimpleNamespace(
+            input_tokens=20,
+            output_tokens=5,
+            cache_read_input_tokens=900,
+            cache_creation_input_tokens=0,
+        ),
+    )
+
+    usage = AnthropicProvider._to_response(response).usage
+
+    assert usage["prompt_tokens"] == 920
+    assert usage["cached_input_tokens"] == 900
+    assert usage["total_tokens"] == 925
@@ -0,0 +1,71 @@
+import asyncio
+
+import httpx2
+import openai
+
+from app.agents.memory import agent as memory_agent_module
+from app.agents.memory.agent import MemoryAgent
+from app.core.llm.batch import LLMBatchQueue, OpenAIBatchBackend
+from app.core.llm.providers.openai import OpenAIProvider
+from app.modules.admin.seed import DEFAULT_PROMPTS
+from benchmarks.batch_api_stub import create_app
+
+_PROMPTS = {p["slug"]: p["content"] for p in DEFAULT_PROMPTS}
+
+
+def _stub_backend(provider: str, model: str) -> OpenAIBatchBackend:
+    llm = OpenAIProvider(api_key="stub", model=model)
+    llm._async_client = openai.AsyncOpenAI(
+        api_key="stub",
+        base_url="http://batch-stub/v1",
+        http_client=openai.DefaultAsyncHttpxClient(transport=httpx2.ASGITransport(app=create_app())),
+    )
+    return OpenAIBatchBackend(llm)
+
+
+def test_memory_summaries_round_trip_through_the_batch_api(monkeypatch):
+    queue = LLMBatchQueue(flush_seconds=3600, backend_factory=_stub_backend)
+    written: list[dict] = []
+
+    async def fake_get_memory(**_kwargs):
+        return None
+
+    async def fake_upsert(**kwargs):
+        written.append(kwargs)
+
+    monkeypatch.setattr(memory_agent_module, "resolve_prompt", _PROMPTS.get)
+    monkeypatch.setattr(memory_agent_module, "get_memory", fake_get_memory)
+    monkeypatch.setattr(memory_agent_module, "upsert_memory_summary", fake_upsert)
+    monkeypatch.setattr(MemoryAgent, "_batch_enabled", staticmethod(lambda: True))
+    monkeypatch.setattr(
+        memory_agent_module,
+        "defer_to_batch",
+        lambda group, kind, messages, config, context, dedupe_key: queue.submit(
+            kind, "openai", "gpt-5-mini", messages, config, context, dedupe_key
+        ),
+    )
+    agent = MemoryAgent(llm=None)
+
+    def payload(*contents: str) -> dict:
+        messages = [{"role": "user", "content": c} for c in contents]
+        return {"user_id": "web:1", "conversation_id": "c1", "messages": messages}
+
+    async def scenario():
+        first = await agent._handle_summarize(payload("jerawat di pipi"))
+        await queue.flush()
+        # A newer window for the same conversation supersedes the in-flight one.
+        await agent._handle_summarize(payload("jerawat di pipi", "kulit berminyak"))
+        await queue.flush()
+        applied = await queue.poll_once()
+        await queue.stop()
+        return first, applied
+
+    first, applied = asyncio.run(scenario())
+
+    assert first.output == "" and first.metadata["batch_request"]
+    assert applied == 1
+    assert len(written) == 1
+    assert written[0]["summary"].startswith("- Ringkasan stub")
+    assert written[0]["summarized_messages"] == 2
+    stats = queue.stats()
+    assert (stats["batches_submitted"], stats["completed"], stats["discarded"]) == (2, 1, 1)
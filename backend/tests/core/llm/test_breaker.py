@@ -0,0 +1,83 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.core.llm.base import BaseLLM
+from app.core.llm import breaker as breaker_module
+from app.core.llm.breaker import CLOSED, HALF_OPEN, OPEN, BreakerLLM, CircuitBreaker, CircuitOpenError
+from app.core.llm.schemas import LLMResponse
+
+
+class _FlakyLLM(BaseLLM):
+    def __init__(self):
+        self.fail = True
+        self.delay = 0.0
+        self.calls = 0
+
+    def generate(self, messages, config=None):
+        raise NotImplementedError
+
+    def generate_stream(self, messages, config=None, usage=None):
+        raise NotImplementedError
+
+    async def agenerate(self, messages, config=None):
+        self.calls += 1
+        await asyncio.sleep(self.delay)
+        if self.fail:
+            raise RuntimeError("503")
+        return LLMResponse(text="ok", usage={})
+
+    async def agenerate_stream(self, messages, config=None, usage=None):
+        yield (await self.agenerate(messages, config)).text
+
+
+def test_breaker_opens_fast_then_probes_half_open():
+    inner = _FlakyLLM()
+    breaker = CircuitBreaker("openai:gpt-5-mini", consecutive_failures=3, open_seconds=0.05)
+    llm = BreakerLLM(inner, breaker)
+    messages = [{"role": "user", "content": "hai"}]
+
+    async def call():
+        return await llm.agenerate(messages)
+
+    for _ in range(3):
+        with pytest.raises(RuntimeError, match="503"):
+            asyncio.run(call())
+    assert breaker.state == OPEN
+    with pytest.raises(CircuitOpenError):
+        asyncio.run(call())
+    assert inner.calls == 3
+
+    asyncio.run(asyncio.sleep(0.06))
+    assert breaker.state == HALF_OPEN
+    inner.fail = False
+    assert asyncio.run(call()).text == "ok"
+    assert breaker.state == CLOSED
+    assert breaker.stats()["rejected"] == 1
+
+
+def test_call_timeout_follows_observed_latency():
+    breaker = CircuitBreaker("xai:grok-3", min_calls=3)
+    for seconds in (1.0, 1.5, 2.0):
+        breaker.record_success(seconds)
+
+    # 3x the p99, within [LLM_MIN_CALL_TIMEOUT, LLM_HTTP_READ_TIMEOUT].
+    assert breaker.call_timeout() == pytest.approx(6.0)
+    assert breaker.call_timeout("stream") == settings.LLM_HTTP_READ_TIMEOUT
+
+
+def test_background_calls_have_their_own_breaker(monkeypatch):
+    monkeypatch.setattr(breaker_module, "_breakers", {})
+    interactive = breaker_module.breaker_for("openai", "gpt-5-mini", breaker_module.call_class("llm_planner"))
+    background = breaker_module.breaker_for("openai", "gpt-5-mini", breaker_module.call_class("llm_memory"))
+
+    assert breaker_module.call_class("llm_whatsapp") == breaker_module.INTERACTIVE
+    assert background is not interactive
+    for _ in range(settings.LLM_BREAKER_CONSECUTIVE_FAILURES):
+        background.record_failure(timed_out=True)
+    assert background.state == OPEN
+    assert interactive.state == CLOSED
+
+    assert breaker_module.reset_breaker("openai", "gpt-5-mini")
+    assert background.state == CLOSED
@@ -0,0 +1,66 @@
+import asyncio
+from types import SimpleNamespace
+
+from app.core.llm.providers import google as google_module
+from app.core.llm.providers.google import GoogleProvider
+
+
+class _FakeModel:
+    created = 0
+
+    def __init__(self, model_name, system_instruction=None):
+        _FakeModel.created += 1
+        self.system_instruction = system_instruction
+
+    async def generate_content_async(self, contents, generation_config=None, stream=False):
+        usage = SimpleNamespace(prompt_token_count=40, candidates_token_count=6, total_token_count=46)
+
+        async def chunks():
+            yield SimpleNamespace(text="Ha", usage_metadata=None)
+            yield SimpleNamespace(text="lo", usage_metadata=usage)
+
+        if stream:
+            return chunks()
+        return SimpleNamespace(text="Halo", usage_metadata=usage)
+
+
+def test_models_are_reused_and_usage_is_reported(monkeypatch):
+    monkeypatch.setattr(google_module.genai, "GenerativeModel", _FakeModel)
+    _FakeModel.created = 0
+    provider = GoogleProvider(api_key="test", model="gemini-2.5-flash")
+    messages = [{"role": "system", "content": "sales"}, {"role": "user", "content": "hi"}]
+
+    async def scenario():
+        response = await provider.agenerate(messages)
+        usage: dict = {}
+        chunks = [chunk async for chunk in provider.agenerate_stream(messages, usage=usage)]
+        return response, chunks, usage
+
+    response, chunks, usage = asyncio.run(scenario())
+
+    assert _FakeModel.created == 1
+    assert response.usage["prompt_tokens"] == 40
+    assert response.usage["completion_tokens"] == 6
+    assert chunks == ["Ha", "lo"]
+    assert usage["total_tokens"] == 46
+
+
+def test_memory_summary_is_sent_as_content_not_system_instruction(monkeypatch):
+    monkeypatch.setattr(google_module.genai, "GenerativeModel", _FakeModel)
+    _FakeModel.created = 0
+    provider = GoogleProvider(api_key="test", model="gemini-2.5-flash")
+
+    def turn(memory: str) -> list[dict]:
+        return [
+            {"role": "system", "content": "sales"},
+            {"role": "system", "content": memory},
+            {"role": "user", "content": "hi"},
+        ]
+
+    system_instruction, history = provider._split_messages(turn("## Konteks\nsuka serum"))
+    for memory in ("## Konteks\nA", "## Konteks\nB"):
+        asyncio.run(provider.agenerate(turn(memory)))
+
+    assert system_instruction == "sales"
+    assert history == [{"role": "user", "parts": ["## Konteks\nsuka serum", "hi"]}]
+    assert _FakeModel.created == 1
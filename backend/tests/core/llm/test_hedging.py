@@ -0,0 +1,107 @@
+import asyncio
+
+from app.core.llm.base import BaseLLM
+from app.core.llm.hedging import HedgedLLM, LatencyTracker
+from app.core.llm.schemas import LLMResponse
+
+
+class _ScriptedLLM(BaseLLM):
+    def __init__(self, name: str, delay: float = 0.0, fail: bool = False):
+        self.name = name
+        self.delay = delay
+        self.fail = fail
+        self.cancelled = False
+
+    def generate(self, messages, config=None):
+        raise NotImplementedError
+
+    def generate_stream(self, messages, config=None, usage=None):
+        raise NotImplementedError
+
+    async def agenerate(self, messages, config=None):
+        try:
+            await asyncio.sleep(self.delay)
+        except asyncio.CancelledError:
+            self.cancelled = True
+            raise
+        if self.fail:
+            raise RuntimeError(f"{self.name} down")
+        return LLMResponse(text=self.name, usage={"prompt_tokens": 5})
+
+    async def agenerate_stream(self, messages, config=None, usage=None):
+        response = await self.agenerate(messages, config)
+        for part in (response.text, "!"):
+            yield part
+        if usage is not None:
+            usage["prompt_tokens"] = 5
+
+
+def _hedged(primary: BaseLLM, secondary: BaseLLM) -> HedgedLLM:
+    return HedgedLLM(
+        primary,
+        secondary,
+        primary_identity=("openai", "gpt-5-mini"),
+        secondary_identity=("anthropic", "claude-3-5-haiku-20241022"),
+        max_delay=0.25,
+        tracker=LatencyTracker(min_samples=3),
+    )
+
+
+def test_slow_primary_is_hedged_and_cancelled():
+    primary, secondary = _ScriptedLLM("primary", delay=5), _ScriptedLLM("secondary", delay=0.01)
+    llm = _hedged(primary, secondary)
+
+    async def scenario():
+        started = asyncio.get_running_loop().time()
+        response = await llm.agenerate([{"role": "user", "content": "hai"}])
+        return response, asyncio.get_running_loop().time() - started
+
+    response, elapsed = asyncio.run(scenario())
+
+    assert response.text == "secondary"
+    assert response.usage["provider"] == "anthropic"
+    assert primary.cancelled
+    assert elapsed < 1.0
+    # The cancelled primary still counts, censored at its elapsed time.
+    samples = llm._tracker.stats()
+    assert samples["openai:gpt-5-mini"]["samples"] == 1
+    assert samples["anthropic:claude-3-5-haiku-20241022"]["samples"] == 1
+
+
+def test_cancelled_stream_loser_is_recorded_as_censored_sample():
+    primary, secondary = _ScriptedLLM("primary", delay=5), _ScriptedLLM("secondary", delay=0.01)
+    llm = _hedged(primary, secondary)
+
+    async def scenario():
+        return [chunk async for chunk in llm.agenerate_stream([{"role": "user", "content": "hai"}])]
+
+    assert asyncio.run(scenario()) == ["secondary", "!"]
+    assert primary.cancelled
+    with llm._tracker._lock:
+        (censored,) = llm._tracker._samples["openai:gpt-5-mini:stream"]
+    assert censored >= 0.25
+
+
+def test_primary_error_fails_over_without_waiting_and_streams_relay():
+    primary, secondary = _ScriptedLLM("primary", fail=True), _ScriptedLLM("secondary")
+    llm = _hedged(primary, secondary)
+    usage: dict = {}
+
+    async def scenario():
+        return [chunk async for chunk in llm.agenerate_stream([{"role": "user", "content": "hai"}], usage=usage)]
+
+    assert asyncio.run(scenario()) == ["secondary", "!"]
+    assert usage == {"prompt_tokens": 5, "provider": "anthropic", "model": "claude-3-5-haiku-20241022"}
+
+
+def test_hedge_delay_follows_live_p95_within_bounds():
+    tracker = LatencyTracker(min_samples=3)
+    llm = HedgedLLM(_ScriptedLLM("a"), _ScriptedLLM("b"), ("openai", "m"), ("xai", "m"), max_delay=2.0, tracker=tracker)
+
+    assert llm._hedge_delay("openai:m") == 2.0
+    for seconds in (0.4, 0.5, 0.6):
+        tracker.record("openai:m", seconds)
+    assert llm._hedge_delay("openai:m") == 0.6
+    for _ in range(20):
+        tracker.record("openai:m", 30.0)
+    assert llm._hedge_delay("openai:m") == 2.0
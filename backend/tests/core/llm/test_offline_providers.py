@@ -0,0 +1,78 @@
+import asyncio
+
+import pytest
+
+from app.core.config import settings
+from app.core.llm import service as llm_service
+from app.core.llm.providers.fake import FakeProvider, FakeProviderError, parse_profile
+from app.core.llm.providers.replay import ReplayMissError, ReplayProvider
+from app.core.llm.schemas import GenerateConfig, LLMResponse
+
+_MESSAGES = [{"role": "user", "content": "Harganya berapa ya?"}]
+
+
+async def _collect(stream) -> list[str]:
+    return [chunk async for chunk in stream]
+
+
+def test_fake_provider_is_deterministic_per_request():
+    llm = FakeProvider(model="ttft_ms=0,token_ms=0,tokens=12")
+    first = asyncio.run(_collect(llm.agenerate_stream(_MESSAGES)))
+    second = asyncio.run(llm.agenerate(_MESSAGES, GenerateConfig()))
+    other = asyncio.run(llm.agenerate([{"role": "user", "content": "Ada testimoni?"}]))
+
+    assert "".join(first) == second.text
+    assert len(first) == 12
+    assert other.text != second.text
+    assert second.usage["completion_tokens"] == 12
+    assert parse_profile("slow").ttft_ms == 2500
+    with pytest.raises(FakeProviderError):
+        asyncio.run(FakeProvider(model="ttft_ms=0,token_ms=0,error_rate=1").agenerate(_MESSAGES))
+
+
+def test_replay_provider_serves_recorded_stream_with_timing(tmp_path, monkeypatch):
+    monkeypatch.setattr(settings, "LLM_REPLAY_DIR", str(tmp_path))
+    monkeypatch.setattr(settings, "LLM_REPLAY_MODE", "record")
+
+    class _Real:
+        async def agenerate_stream(self, messages, config=None, usage=None):
+            for chunk in ("Harganya ", "Rp110.900"):
+                await asyncio.sleep(0.02)
+                yield chunk
+            usage["prompt_tokens"] = 7
+
+        async def agenerate(self, messages, config=None):
+            return LLMResponse(text="unused", usage={})
+
+    recorder = ReplayProvider(model="openai:gpt-5-mini")
+    recorder._inner = _Real()
+    assert asyncio.run(_collect(recorder.agenerate_stream(_MESSAGES, usage={}))) == ["Harganya ", "Rp110.900"]
+
+    monkeypatch.setattr(settings, "LLM_REPLAY_MODE", "replay")
+    player = ReplayProvider(model="openai:gpt-5-mini")
+    usage: dict = {}
+
+    async def timed():
+        started = asyncio.get_running_loop().time()
+        chunks = await _collect(player.agenerate_stream(_MESSAGES, usage=usage))
+        return chunks, asyncio.get_running_loop().time() - started
+
+    chunks, elapsed = asyncio.run(timed())
+    assert chunks == ["Harganya ", "Rp110.900"]
+    assert elapsed >= 0.035
+    assert usage == {"prompt_tokens": 7}
+    assert asyncio.run(player.agenerate(_MESSAGES)).text == "Harganya Rp110.900"
+    with pytest.raises(ReplayMissError):
+        asyncio.run(player.agenerate([{"role": "user", "content": "belum direkam"}]))
+
+
+def test_load_test_providers_are_hidden_and_refused_outside_load_test_mode(monkeypatch):
+    monkeypatch.setattr(settings, "LLM_LOAD_TEST_MODE", False)
+    assert "fake" not in llm_service.list_llm_options()["providers"]
+    with pytest.raises(ValueError, match="LLM_LOAD_TEST_MODE"):
+        llm_service.create_llm(provider="fake", model="instant", use_cache=False)
+
+    monkeypatch.setattr(settings, "LLM_LOAD_TEST_MODE", True)
+    assert {"fake", "replay"} <= set(llm_service.list_llm_options()["providers"])
+    llm = llm_service.create_llm(provider="fake", model="ttft_ms=0,token_ms=0,tokens=3", use_cache=False)
+    assert asyncio.run(llm.agenerate(_MESSAGES)).usage["completion_tokens"] == 3
@@ -25,3 +25,60 @@ def test_build_params_includes_optional_values_when_provided():
 
     assert params["max_tokens"] == 128
     assert params["stop"] == ["DONE"]
+
+
+def test_agenerate_stream_yields_deltas_and_fills_usage():
+    import asyncio
+    from types import SimpleNamespace
+
+    def chunk(content=None, usage=None):
+        choices = [] if content is None else [SimpleNamespace(delta=SimpleNamespace(content=content))]
+        return SimpleNamespace(choices=choices, usage=usage)
+
+    async def fake_stream():
+        yield chunk("Ha")
+        yield chunk("lo")
+        yield chunk(
+            usage=SimpleNamespace(
+                prompt_tokens=12,
+                completion_tokens=2,
+                total_tokens=14,
+                prompt_tokens_details=SimpleNamespace(cached_tokens=8),
+            )
+        )
+
+    async def fake_create(**params):
+        assert params["stream"] is True
+        assert params["stream_options"] == {"include_usage": True}
+        return fake_stream()
+
+    provider = OpenAIProvider(api_key="test", model="gpt-5.2")
+    provider._async_client = SimpleNamespace(
+        chat=SimpleNamespace(completions=SimpleNamespace(create=fake_create))
+    )
+
+    async def collect(usage):
+        return [delta async for delta in provider.agenerate_stream([{"role": "user", "content": "hi"}], usage=usage)]
+
+    usage: dict = {}
+    assert asyncio.run(collect(usage)) == ["Ha", "lo"]
+    assert usage == {
+        "prompt_tokens": 12,
+        "completion_tokens": 2,
+        "total_tokens": 14,
+        "cached_input_tokens": 8,
+    }
+
+
+def test_prompt_cache_key_follows_leading_system_prompt():
+    provider = OpenAIProvider(api_key="test", model="gpt-5.2")
+    static = {"role": "system", "content": "sales prompt"}
+
+    first = provider._build_params([static, {"role": "user", "content": "a"}], GenerateConfig())
+    second = provider._build_params(
+        [static, {"role": "system", "content": "memory"}, {"role": "user", "content": "b"}],
+        GenerateConfig(),
+    )
+
+    assert first["prompt_cache_key"] == second["prompt_cache_key"]
+    assert "prompt_cache_key" not in provider._build_params([{"role": "user", "content": "a"}], GenerateConfig())
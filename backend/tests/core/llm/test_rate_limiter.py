@@ -0,0 +1,80 @@
+import asyncio
+
+from app.core.llm.ratelimit import (
+    PRIORITY_BACKGROUND,
+    PRIORITY_POLISH,
+    PRIORITY_REPLY,
+    RateLimiter,
+)
+
+
+def test_queued_calls_are_granted_by_priority_then_arrival():
+    limiter = RateLimiter("openai:gpt-5-mini", rpm=600)  # one request per 0.1 s once drained
+    limiter._requests.level = 0
+    granted: list[str] = []
+
+    async def call(name: str, priority: int):
+        await limiter.acquire(10, priority)
+        granted.append(name)
+
+    async def scenario():
+        tasks = [asyncio.create_task(call("memory", PRIORITY_BACKGROUND))]
+        await asyncio.sleep(0)
+        tasks.append(asyncio.create_task(call("polish", PRIORITY_POLISH)))
+        tasks.append(asyncio.create_task(call("reply-1", PRIORITY_REPLY)))
+        tasks.append(asyncio.create_task(call("reply-2", PRIORITY_REPLY)))
+        await asyncio.gather(*tasks)
+
+    asyncio.run(scenario())
+
+    assert granted == ["reply-1", "reply-2", "polish", "memory"]
+    stats = limiter.stats()
+    assert stats["queued_now"] == 0
+    assert stats["by_priority"]["reply"]["queued"] == 2
+    assert stats["by_priority"]["background"]["wait_seconds_max"] > stats["by_priority"]["reply"]["wait_seconds_max"]
+
+
+def test_token_budget_is_corrected_from_reported_usage():
+    limiter = RateLimiter("anthropic:claude-3-5-haiku-20241022", tpm=1000)
+
+    assert asyncio.run(limiter.acquire(200)) == 0.0
+    limiter.settle(reserved_tokens=200, actual_tokens=900)
+
+    assert limiter.stats()["tokens_available"] < 150
+
+
+def test_failed_calls_give_their_token_reservation_back():
+    import pytest
+
+    from app.core.llm.base import BaseLLM
+    from app.core.llm.ratelimit import RateLimitedLLM
+    from app.core.llm.schemas import GenerateConfig
+
+    class FailingLLM(BaseLLM):
+        def generate(self, messages, config=None):
+            raise NotImplementedError
+
+        def generate_stream(self, messages, config=None, usage=None):
+            raise NotImplementedError
+
+        async def agenerate(self, messages, config=None):
+            raise RuntimeError("provider down")
+
+        async def agenerate_stream(self, messages, config=None, usage=None):
+            raise RuntimeError("provider down")
+            yield ""
+
+    limiter = RateLimiter("openai:gpt-5-mini", tpm=1000)
+    llm = RateLimitedLLM(FailingLLM(), limiter)
+    messages = [{"role": "user", "content": "halo"}]
+
+    async def scenario():
+        with pytest.raises(RuntimeError):
+            await llm.agenerate(messages, GenerateConfig(max_tokens=400))
+        with pytest.raises(RuntimeError):
+            async for _ in llm.agenerate_stream(messages, GenerateConfig(max_tokens=400)):
+                pass
+
+    asyncio.run(scenario())
+
+    assert limiter.stats()["tokens_available"] == 1000
@@ -0,0 +1,50 @@
+import asyncio
+
+from app.core.llm.base import BaseLLM
+from app.core.llm.cache import CachedLLM, ResponseCache
+from app.core.llm.schemas import GenerateConfig, LLMResponse
+
+
+class _CountingLLM(BaseLLM):
+    def __init__(self):
+        self.calls = 0
+
+    def generate(self, messages, config=None):
+        self.calls += 1
+        return LLMResponse(text=f"reply {self.calls}", usage={"prompt_tokens": 10})
+
+    def generate_stream(self, messages, config=None, usage=None):
+        yield "unused"
+
+    async def agenerate(self, messages, config=None):
+        return self.generate(messages, config)
+
+    async def agenerate_stream(self, messages, config=None, usage=None):
+        yield "unused"
+
+
+def test_identical_calls_are_served_from_cache_until_ttl():
+    inner = _CountingLLM()
+    cache = ResponseCache(max_entries=2, ttl_seconds=60)
+    llm = CachedLLM(inner, provider="openai", model="gpt-5-mini", cache=cache)
+    messages = [{"role": "user", "content": "draft"}]
+    polish = GenerateConfig(temperature=0.2)
+
+    async def scenario():
+        first = await llm.agenerate(messages, polish)
+        second = await llm.agenerate(messages, polish)
+        other = await llm.agenerate(messages, GenerateConfig(temperature=0.7))
+        return first, second, other
+
+    first, second, other = asyncio.run(scenario())
+
+    assert first.text == second.text == "reply 1"
+    assert second.usage["cache_hit"] is True
+    assert second.usage["prompt_tokens"] == second.usage["completion_tokens"] == 0
+    assert other.text == "reply 2"
+    assert inner.calls == 2
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"]) == (1, 2)
+
+    cache.put("expired", "old", expires_at=1.0)
+    assert cache.get("expired") is None
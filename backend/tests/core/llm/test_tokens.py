@@ -0,0 +1,20 @@
+from app.core.llm.tokens import MESSAGE_OVERHEAD_TOKENS, fit_history_to_budget
+
+
+def test_history_window_keeps_newest_messages_within_budget():
+    history = [
+        {"role": "user", "content": "old", "token_count": 500},
+        {"role": "assistant", "content": "long", "token_count": 900},
+        {"role": "user", "content": "recent", "token_count": 40},
+        {"role": "assistant", "content": "latest", "token_count": 60},
+    ]
+    per_message = MESSAGE_OVERHEAD_TOKENS
+
+    window = fit_history_to_budget(history, 100 + 2 * per_message)
+    assert [m["content"] for m in window] == ["recent", "latest"]
+
+    # Stops at the first message that does not fit instead of skipping it.
+    window = fit_history_to_budget(history, 600 + 3 * per_message)
+    assert [m["content"] for m in window] == ["recent", "latest"]
+
+    assert fit_history_to_budget(history, 0) == history
@@ -0,0 +1,24 @@
+from app.core.llm import transport
+from app.core.llm.providers.anthropic import AnthropicProvider
+from app.core.llm.providers.openai import OpenAIProvider
+from app.core.llm.providers.xai import XaiProvider
+
+
+def test_models_of_one_provider_and_key_share_a_connection_pool(monkeypatch):
+    monkeypatch.setattr(transport, "_pools", {})
+
+    planner = OpenAIProvider(api_key="key-a", model="gpt-5.2")
+    memory = OpenAIProvider(api_key="key-a", model="gpt-5-mini")
+    other_key = OpenAIProvider(api_key="key-b", model="gpt-5.2")
+    xai = XaiProvider(api_key="key-a", model="grok-4")
+    anthropic = AnthropicProvider(api_key="key-a", model="claude-sonnet-4-20250514")
+
+    assert planner._client._client is memory._client._client
+    assert planner._async_client._client is memory._async_client._client
+    assert planner._client._client is not other_key._client._client
+    assert planner._client._client is not xai._client._client
+    assert anthropic._async_client._client is transport._pools[transport._pool_key("anthropic", "key-a")].async_client
+
+    stats = transport.http_pool_stats()
+    assert sorted(entry["provider"] for entry in stats) == ["anthropic", "openai", "openai", "xai"]
+    assert all(entry["open_connections"] == 0 for entry in stats)
@@ -0,0 +1,34 @@
+import asyncio
+import json
+
+from app.core.llm import service as llm_service
+from app.modules.admin import listener as listener_module
+from app.modules.admin import service as admin_service
+from app.modules.admin.listener import AdminChangeListener
+from app.modules.admin.service import PROCESS_TOKEN, cache_version
+
+
+def test_foreign_notification_refreshes_local_caches(monkeypatch):
+    monkeypatch.setattr(admin_service, "_read_overrides", lambda: ({}, {"sales_system": "fresh"}))
+    monkeypatch.setattr(admin_service, "_config_overrides", None)
+    monkeypatch.setattr(admin_service, "_prompt_overrides", None)
+    monkeypatch.setitem(llm_service._instances, ("openai", "gpt-test", "interactive"), object())
+    listener = AdminChangeListener(database_url="postgresql+psycopg://u:p@db:5432/app")
+    version = cache_version()
+
+    assert not listener.handle_payload(json.dumps({"origin": PROCESS_TOKEN, "kind": "prompts"}))
+    assert cache_version() == version
+    assert ("openai", "gpt-test", "interactive") in llm_service._instances
+
+    assert listener.handle_payload(json.dumps({"origin": "other-worker", "kind": "prompts"}))
+    asyncio.run(listener._invalidate())
+    assert cache_version() == version + 1
+    assert admin_service.resolve_prompt("sales_system") == "fresh"
+    assert llm_service._instances == {}
+    assert listener.stats()["invalidations"] == 1
+    assert listener.stats()["ignored_own"] == 1
+
+
+def test_listener_is_disabled_for_non_postgres_urls():
+    assert listener_module._libpq_conninfo("sqlite://") is None
+    assert listener_module._libpq_conninfo("postgresql+psycopg://u:p@db:5432/app") == "postgresql://u:p@db:5432/app"
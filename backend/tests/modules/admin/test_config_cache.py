@@ -0,0 +1,55 @@
+import pytest
+from sqlalchemy import event
+from sqlmodel import SQLModel, create_engine
+
+from app.modules.admin import service
+
+
+@pytest.fixture()
+def engine(monkeypatch):
+    engine = create_engine("sqlite://")
+    SQLModel.metadata.create_all(
+        engine,
+        tables=[service.AdminConfig.__table__, service.PromptOverride.__table__],
+    )
+    monkeypatch.setattr(service, "app_engine", engine)
+    # Recorded so the snapshot built against this engine is undone afterwards.
+    monkeypatch.setattr(service, "_config_overrides", None)
+    monkeypatch.setattr(service, "_prompt_overrides", None)
+    service.refresh_cache()
+    return engine
+
+
+def test_lookups_are_served_from_cache_until_an_update(engine):
+    statements: list[str] = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    service.update_configs({"agents": {"memory_mode": "full"}})
+    statements.clear()
+
+    assert service.resolve_config("agents", "memory_mode") == "full"
+    loaded = len(statements)
+    for _ in range(5):
+        service.resolve_config("agents", "memory_mode")
+        service.resolve_prompt("memory_summarize_system")
+    assert len(statements) == loaded
+
+    version = service.cache_version()
+    service.update_prompt("memory_summarize_system", {"content": "custom"})
+    assert service.cache_version() == version + 1
+    assert service.resolve_prompt("memory_summarize_system") == "custom"
+
+    service.reset_prompt("memory_summarize_system")
+    assert service.resolve_prompt("memory_summarize_system") != "custom"
+
+
+def test_lookups_never_hit_the_database_once_warm(engine):
+    service.warm_cache()
+    statements: list[str] = []
+    event.listen(engine, "before_cursor_execute", lambda *args: statements.append(args[2]))
+
+    version = service.cache_version()
+    assert service.resolve_config("agents", "memory_mode")
+    assert service.resolve_prompt("memory_summarize_system")
+    assert statements == []
+    assert service.cache_version() == version
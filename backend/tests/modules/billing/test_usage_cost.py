@@ -0,0 +1,90 @@
+import pytest
+
+from app.modules.billing.service import compute_usage_cost
+
+
+def _metadata(usage: dict) -> dict:
+    return {"model": {"provider": "anthropic", "name": "claude-sonnet-4-20250514"}, "usage": usage}
+
+
+def test_cached_prompt_tokens_are_priced_at_the_cache_rate():
+    # 3.0 USD / 1M input, cache reads at 0.1x, writes at 1.25x.
+    uncached = compute_usage_cost(_metadata({"prompt_tokens": 10_000, "completion_tokens": 0, "total_tokens": 10_000}))
+    cached = compute_usage_cost(
+        _metadata(
+            {
+                "prompt_tokens": 10_000,
+                "completion_tokens": 0,
+                "total_tokens": 10_000,
+                "cached_input_tokens": 8_000,
+            }
+        )
+    )
+    written = compute_usage_cost(
+        _metadata({"prompt_tokens": 10_000, "completion_tokens": 0, "total_tokens": 10_000, "cache_write_tokens": 8_000})
+    )
+
+    assert uncached["input_cost_usd"] == pytest.approx(0.03)
+    assert uncached["cache_savings_usd"] == 0
+    assert cached["input_cost_usd"] == pytest.approx(0.0060 + 0.0024)
+    assert cached["cache_savings_usd"] == pytest.approx(0.03 - 0.0084)
+    assert written["input_cost_usd"] == pytest.approx(0.006 + 0.03)
+    assert written["cache_savings_usd"] == pytest.approx(-0.006)
+
+
+def test_response_cache_hits_are_recorded_at_zero_cost():
+    from app.agents.planner.agent import PlannerAgent
+    from app.core.llm.cache import cache_hit_usage
+
+    usage = PlannerAgent._normalize_usage(cache_hit_usage(), prompt="x" * 4000, output="y" * 400)
+    cost = compute_usage_cost(_metadata(usage))
+
+    assert usage["total_tokens"] == 0
+    assert cost["total_cost_usd"] == 0
+    assert cost["pricing_source"] == "response_cache"
+
+
+def test_fast_answers_are_counted_apart_from_requests(monkeypatch):
+    import asyncio
+    import time
+
+    from app.modules.billing import service
+    from app.modules.billing.models import LLMUsageEvent
+
+    now = time.time()
+    events = [
+        LLMUsageEvent(id=1, user_id="u", conversation_id="c", provider="openai", model="gpt-4o-mini",
+                      agent="sales", total_cost_usd=0.002, created_at=now),
+        LLMUsageEvent(id=2, user_id="u", conversation_id="c", provider="fast_answer", model="harga",
+                      agent="sales", fast_answer_savings_usd=0.002, pricing_source="fast_answer", created_at=now),
+    ]
+
+    class FakeSession:
+        def __init__(self, *_):
+            pass
+
+        async def __aenter__(self):
+            return self
+
+        async def __aexit__(self, *_):
+            return False
+
+        async def exec(self, _query):
+            class Result:
+                def all(self):
+                    return events
+
+            return Result()
+
+    monkeypatch.setattr(service, "AsyncSession", FakeSession)
+
+    summary = asyncio.run(service.get_billing_summary("u", days=1))
+
+    assert summary["totals"]["requests"] == 1
+    assert summary["totals"]["fast_answer_hits"] == 1
+    assert summary["totals"]["fast_answer_hit_rate"] == 0.5
+    assert summary["daily"][-1]["requests"] == 1
+    assert summary["daily"][-1]["fast_answer_hits"] == 1
+    rows = {row["provider"]: row for row in summary["by_model"]}
+    assert rows["fast_answer"]["requests"] == 0
+    assert rows["fast_answer"]["fast_answer_hits"] == 1
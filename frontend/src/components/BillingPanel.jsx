@@ -265,6 +265,11 @@ export default function BillingPanel({ userId = "all" }) {
     input_cost_usd: 0,
     output_cost_usd: 0,
     total_cost_usd: 0,
+    cached_input_tokens: 0,
+    cache_savings_usd: 0,
+    fast_answer_hits: 0,
+    fast_answer_hit_rate: 0,
+    fast_answer_savings_usd: 0,
   };
   const byModel = billing?.by_model || [];
   const daily = billing?.daily || [];
@@ -279,6 +284,14 @@ export default function BillingPanel({ userId = "all" }) {
   }, [byModel, totals.total_cost_usd]);
 
   const avgCostPerRequest = totals.requests > 0 ? totals.total_cost_usd / totals.requests : 0;
+  const cachedInputTokens = Number(totals.cached_input_tokens || 0);
+  const inputHint =
+    cachedInputTokens > 0
+      ? `${formatCostUsd(totals.input_cost_usd)} · ${formatTokenCount(cachedInputTokens)} cached, ${formatCostUsd(
+          totals.cache_savings_usd
+        )} saved`
+      : formatCostUsd(totals.input_cost_usd);
+  const fastAnswerHitRate = `${(Number(totals.fast_answer_hit_rate || 0) * 100).toFixed(1)}%`;
 
   return (
     <main className="billing-panel">
@@ -323,13 +336,20 @@ export default function BillingPanel({ userId = "all" }) {
         <MetricCard
           title="Input Tokens"
           value={formatTokenCount(totals.input_tokens)}
-          hint={formatCostUsd(totals.input_cost_usd)}
+          hint={inputHint}
         />
         <MetricCard
           title="Output Tokens"
           value={formatTokenCount(totals.output_tokens)}
           hint={formatCostUsd(totals.output_cost_usd)}
         />
+        <MetricCard
+          title="Fast Answers"
+          value={fastAnswerHitRate}
+          hint={`${formatTokenCount(totals.fast_answer_hits || 0)} replies · ${formatCostUsd(
+            totals.fast_answer_savings_usd
+          )} saved`}
+        />
       </section>
 
       <section className="billing-grid">
@@ -384,7 +404,7 @@ export default function BillingPanel({ userId = "all" }) {
                         <span className="model">{row.model}</span>
                       </div>
                     </td>
-                    <td>{formatTokenCount(row.requests)}</td>
+                    <td>{formatTokenCount(row.requests || row.fast_answer_hits || 0)}</td>
                     <td>{formatTokenCount(row.input_tokens)}</td>
                     <td>{formatTokenCount(row.output_tokens)}</td>
                     <td>{formatTokenCount(row.total_tokens)}</td>